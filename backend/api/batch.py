@@ -0,0 +1,43 @@
+import os
+from fastapi import APIRouter, HTTPException
+from models.schemas import BatchJobRequest, BatchJobResponse
+from services.batch_analysis import batch_jobs, RECORDINGS_DIR, BATCH_WORKERS
+
+router = APIRouter()
+
+def _recording_path(path):
+    # Jobs may only read below RECORDINGS_DIR
+    root = os.path.realpath(RECORDINGS_DIR)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise HTTPException(status_code=400, detail=f"Path outside the recordings directory: {path}")
+    if not os.path.exists(resolved):
+        raise HTTPException(status_code=404, detail=f"No recording at {path}")
+    return resolved
+
+# Re-analysis runs in the background on its own process pool; poll the job for progress and fps.
+# Results land in BATCH_OUTPUT_DIR as one {source}.npz per recording; resubmitting resumes.
+@router.post("/batch/jobs/", response_model=BatchJobResponse, status_code=202)
+def submit_batch_job(request: BatchJobRequest):
+    if request.stride < 1:
+        raise HTTPException(status_code=400, detail="stride must be at least 1")
+    if not request.fps > 0:
+        raise HTTPException(status_code=400, detail="fps must be positive")
+    if request.workers is not None and not 1 <= request.workers <= BATCH_WORKERS:
+        raise HTTPException(status_code=422, detail=f"workers must be between 1 and {BATCH_WORKERS}")
+    paths = [_recording_path(path) for path in request.paths]
+    return batch_jobs.submit(paths, workers=request.workers or BATCH_WORKERS, stride=request.stride, fps=request.fps)
+
+@router.get("/batch/jobs/{job_id}", response_model=BatchJobResponse)
+def get_batch_job(job_id: str):
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    return job
+
+@router.delete("/batch/jobs/{job_id}", response_model=BatchJobResponse)
+def cancel_batch_job(job_id: str):
+    job = batch_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    return job
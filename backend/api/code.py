@@ -0,0 +1,61 @@
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from models.schemas import CodeSubmission, CodeEvaluationResponse
+from services.code_problems import PROBLEMS, public_problem
+from services.code_sandbox import sandbox_pool
+from services.executor import PoolSaturated
+
+router = APIRouter()
+
+MAX_CODE_BYTES = 64 * 1024
+
+def _problem_or_404(submission):
+    problem = PROBLEMS.get(submission.problem_id)
+    if problem is None:
+        raise HTTPException(status_code=404, detail="Unknown problem")
+    if len(submission.code.encode("utf-8")) > MAX_CODE_BYTES:
+        raise HTTPException(status_code=413, detail="Submission too large")
+    return problem
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/code/problems/")
+def list_problems():
+    return [public_problem(problem_id) for problem_id in PROBLEMS]
+
+@router.get("/code/stats/")
+def sandbox_stats():
+    return sandbox_pool.stats()
+
+# Server-sent events: one "test" event per test case as it finishes, then "done" with the totals
+# (or "error" if the code didn't load or hit the sandbox's limits)
+@router.post("/code/evaluate/stream/")
+async def stream_code_evaluation(submission: CodeSubmission):
+    problem = _problem_or_404(submission)
+    # Checked up front: once streaming starts the status code can no longer become 503
+    sandbox_pool.start()
+    if sandbox_pool.saturated():
+        raise PoolSaturated("sandbox", sandbox_pool.max_pending)
+    events = sandbox_pool.run(submission.code, problem["entry_point"], problem["tests"])
+
+    async def body():
+        async for event, data in events:
+            yield _sse(event, data)
+
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/code/evaluate/", response_model=CodeEvaluationResponse)
+async def evaluate_code(submission: CodeSubmission):
+    problem = _problem_or_404(submission)
+    response = {"problem_id": submission.problem_id, "passed": 0, "total": len(problem["tests"]), "results": []}
+    async for event, data in sandbox_pool.run(submission.code, problem["entry_point"], problem["tests"]):
+        if event == "test":
+            response["results"].append(data)
+        elif event == "done":
+            response.update(passed=data["passed"], duration_ms=data["duration_ms"])
+        else:
+            response["error"] = data["error"]
+    return response
@@ -1,12 +1,62 @@
-from fastapi import APIRouter, HTTPException
-from models.schemas import FaceVerificationRequest, FaceVerificationResponse
-from services.face_verification import verify_faces
+import os
+from typing import Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from models.schemas import FaceEnrollmentRequest, FaceVerificationRequest, FaceVerificationResponse
+from models.schemas import FaceIdentificationResponse
+from services.face_verification import enroll_face, enroll_face_bytes, verify_faces, verify_face_bytes
+from services.face_verification import identify_face_bytes
+from services.face_index import face_index
+from services.executor import get_pool
 
 router = APIRouter()
 
-@router.post("/verify_face/", response_model=FaceVerificationResponse)
-def face_verify(request: FaceVerificationRequest):
-    result = verify_faces(request.user_id, request.registered_image, request.captured_image)
+# DeepFace calls run on a bounded pool; a full pool surfaces as 503 via the app's PoolSaturated handler
+face_pool = get_pool(os.getenv("FACE_VERIFY_POOL", "inference"))
+
+def _respond(result):
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
     return FaceVerificationResponse(**result)
+
+@router.post("/enroll_face/", response_model=FaceVerificationResponse)
+async def face_enroll(request: FaceEnrollmentRequest):
+    return _respond(await face_pool.run(enroll_face, request.user_id, request.registered_image))
+
+@router.post("/enroll_face/upload/", response_model=FaceVerificationResponse)
+async def face_enroll_upload(user_id: str = Form(...), registered: UploadFile = File(...)):
+    return _respond(await face_pool.run(enroll_face_bytes, user_id, await registered.read()))
+
+@router.post("/verify_face/", response_model=FaceVerificationResponse)
+async def face_verify(request: FaceVerificationRequest):
+    return _respond(await face_pool.run(
+        verify_faces, request.user_id, request.registered_image, request.captured_image))
+
+# Multipart variant: raw JPEG/PNG parts, no base64. Omit `registered` to use the enrolled face.
+@router.post("/verify_face/upload/", response_model=FaceVerificationResponse)
+async def face_verify_upload(user_id: str = Form(...), captured: UploadFile = File(...),
+                             registered: Optional[UploadFile] = File(None)):
+    registered_raw = await registered.read() if registered is not None else None
+    return _respond(await face_pool.run(verify_face_bytes, user_id, registered_raw, await captured.read()))
+
+# Binary body variant: the request body is the captured image, compared against the enrolled face.
+@router.post("/verify_face/raw/{user_id}", response_model=FaceVerificationResponse)
+async def face_verify_raw(user_id: str, request: Request):
+    captured_raw = await request.body()
+    if not captured_raw:
+        raise HTTPException(status_code=400, detail="Empty request body")
+    return _respond(await face_pool.run(verify_face_bytes, user_id, None, captured_raw))
+
+# 1:N: the closest enrolled identities to the captured face. Pass the candidate's user_id to
+# get proxy_suspected when someone else's enrollment matches.
+@router.post("/identify_face/", response_model=FaceIdentificationResponse)
+async def face_identify(captured: UploadFile = File(...), k: int = Form(5), user_id: Optional[str] = Form(None)):
+    if not 1 <= k <= 50:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 50")
+    result = await face_pool.run(identify_face_bytes, await captured.read(), k, user_id)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    return FaceIdentificationResponse(**result)
+
+@router.get("/identify_face/stats/")
+def face_index_stats():
+    return face_index.stats()
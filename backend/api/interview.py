@@ -0,0 +1,86 @@
+import json
+import threading
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool
+from models.schemas import QuestionSet, EvaluationRequest, EvaluationJobResponse
+from services.executor import inference_pool
+from services.question_bank import question_bank, DIFFICULTIES, TOPICS
+from services.evaluation_queue import evaluation_queue
+from services.interview_bot import stream_evaluate_answer, parse_score
+
+router = APIRouter()
+
+@router.get("/questions/", response_model=QuestionSet)
+async def get_questions(topic: str = "Python", count: int = 3, difficulty: str = "beginner"):
+    if topic not in TOPICS:
+        raise HTTPException(status_code=400, detail=f"topic must be one of {TOPICS}")
+    if difficulty not in DIFFICULTIES:
+        raise HTTPException(status_code=400, detail=f"difficulty must be one of {DIFFICULTIES}")
+    if not 1 <= count <= 20:
+        raise HTTPException(status_code=400, detail="count must be between 1 and 20")
+    # Usually a cache hit; an entry not banked yet generates inline on the inference pool
+    questions = await inference_pool.run(question_bank.get, topic, difficulty, count)
+    return QuestionSet(topic=topic, difficulty=difficulty, questions=questions)
+
+@router.get("/questions/stats/")
+def question_bank_stats():
+    return question_bank.stats()
+
+@router.post("/evaluate/", response_model=EvaluationJobResponse, status_code=202)
+async def submit_evaluation(request: EvaluationRequest):
+    job = await evaluation_queue.submit(request.question, request.answer)
+    return EvaluationJobResponse(**job.to_dict())
+
+@router.get("/evaluate/stats/")
+def evaluation_stats():
+    return evaluation_queue.stats()
+
+# Long-poll: returns as soon as the job finishes or after `wait` seconds with its current status
+@router.get("/evaluate/{job_id}", response_model=EvaluationJobResponse)
+async def get_evaluation(job_id: str, wait: float = 0.0):
+    job = await evaluation_queue.wait(job_id, min(max(wait, 0.0), 60.0))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown evaluation job")
+    return EvaluationJobResponse(**job.to_dict())
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _feedback_events(question, answer, cancelled):
+    parts = []
+    try:
+        for text in stream_evaluate_answer(question, answer, cancelled):
+            parts.append(text)
+            yield _sse("token", text)
+        feedback = "".join(parts)
+        yield _sse("done", {"feedback": feedback, "score": parse_score(feedback)})
+    except Exception as e:
+        yield _sse("error", {"error": str(e)})
+
+# Server-sent events: "token" events carry text as it is generated, a final "done" event has the score.
+# Each stream holds an inference pool slot until it ends (503 when the pool is full). The sync
+# generator is iterated on Starlette's threadpool, so generation never blocks the event loop, and
+# a client disconnect stops generation at the next token.
+@router.post("/evaluate/stream/")
+async def stream_evaluation(request: EvaluationRequest, http_request: Request):
+    release = inference_pool.reserve()
+    cancelled = threading.Event()
+
+    def finish():
+        cancelled.set()
+        release()
+
+    async def events():
+        try:
+            async for event in iterate_in_threadpool(_feedback_events(request.question, request.answer, cancelled)):
+                if await http_request.is_disconnected():
+                    break
+                yield event
+        finally:
+            finish()
+
+    # The background task also runs when the client disconnects before the first event
+    return StreamingResponse(events(), media_type="text/event-stream", background=BackgroundTask(finish),
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,37 +1,97 @@
-from fastapi import APIRouter, UploadFile, Form
+import os
+import asyncio
+from fastapi import APIRouter, UploadFile, Form, HTTPException, WebSocket, WebSocketDisconnect
 import cv2
 import numpy as np
-import datetime
+from services.executor import PoolSaturated, inference_pool
+from services.frame_analysis import frame_batcher
+from services.monitor_sessions import monitor_sessions
+from services.metrics import timed, record_error
 
 router = APIRouter()
 
+WS_MAX_IN_FLIGHT = int(os.getenv("WS_MAX_IN_FLIGHT", "2"))
+
+def decode_frame(contents):
+    with timed("decode"):
+        frame = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Could not decode frame")
+    return frame
+
+async def analyze_bytes(contents):
+    frame = await inference_pool.run(decode_frame, contents)
+    # Frames from concurrent sessions are grouped into one batched inference call
+    return await frame_batcher.submit(frame)
+
 @router.post("/analyze_frame/")
 async def analyze_frame(user_id: str = Form(...), file: UploadFile = Form(...)):
     try:
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        # Dummy logic — will replace with real detection
-        frame_height, frame_width = frame.shape[:2]
-        suspicious_flag = {
-            "flag": "multiple_faces",
-            "detected": False,
-            "confidence": 0.0,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-
-        # Example: if image width is too wide, we pretend it's suspicious
-        if frame_width > 800:
-            suspicious_flag["detected"] = True
-            suspicious_flag["confidence"] = 0.9
-
+        result = await analyze_bytes(await file.read())
         return {
             "status": "completed",
-            "result": {
-                "frame_count": 1,
-                "detections": [suspicious_flag]
-            }
+            "result": result
         }
+    except PoolSaturated:
+        raise
+    except ValueError as e:
+        record_error("analyze_frame", e)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        return {"error": str(e)}
+        record_error("analyze_frame", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/analyze_frame/stats/")
+def analyze_frame_stats():
+    return frame_batcher.stats()
+
+# One persistent connection per monitoring session: the client sends binary JPEG frames and
+# receives {"type": "result", "seq": n, "result": ...} messages as each frame finishes.
+@router.websocket("/ws/monitor/{user_id}")
+async def monitor_stream(websocket: WebSocket, user_id: str):
+    await websocket.accept()
+    session = await monitor_sessions.open(user_id, WS_MAX_IN_FLIGHT)
+    send_lock = asyncio.Lock()
+    tasks = set()
+
+    async def send(message):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def process(seq, contents):
+        result = None
+        try:
+            result = await analyze_bytes(contents)
+            await send({"type": "result", "seq": seq, "result": result})
+        except PoolSaturated as e:
+            await send({"type": "dropped", "seq": seq, "reason": str(e)})
+        except Exception as e:
+            record_error("ws_monitor", e)
+            await send({"type": "error", "seq": seq, "error": str(e)})
+        finally:
+            session.complete(result)
+            await monitor_sessions.publish(session)
+
+    try:
+        seq = 0
+        while True:
+            contents = await websocket.receive_bytes()
+            seq += 1
+            if not session.admit():
+                continue
+            task = asyncio.create_task(process(seq, contents))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await monitor_sessions.close(user_id)
+
+@router.get("/monitor/{user_id}/")
+def monitor_status(user_id: str):
+    summary = monitor_sessions.get(user_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No active monitoring session")
+    return summary
@@ -0,0 +1,25 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from services.report_service import report_service
+
+router = APIRouter()
+
+# Cohort and per-candidate routes come before /reports/{session_id} so they aren't taken as ids
+@router.get("/reports/cohort/")
+def cohort_report(topic: Optional[str] = None, limit: int = Query(20, ge=1, le=500), completed_only: bool = True):
+    return report_service.cohort_view(topic, limit=limit, completed_only=completed_only)
+
+@router.get("/reports/stats/")
+def report_stats():
+    return report_service.stats()
+
+@router.get("/reports/")
+def list_reports(user_id: str):
+    return report_service.sessions_for_user(user_id)
+
+@router.get("/reports/{session_id}")
+def get_report(session_id: str):
+    report = report_service.report(session_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return report
@@ -0,0 +1,90 @@
+from fastapi import APIRouter, HTTPException
+from models.schemas import SessionCreateRequest, AnswerRecord, LiveReading, SessionStateResponse
+from services.executor import inference_pool
+from services.interview_bot import evaluate_answer, parse_score
+from services.question_bank import question_bank
+from services.session_store import session_store, SessionConflict
+from services.emotion_timeline import FRAME_BYTES, probs_from_scores
+
+router = APIRouter()
+
+def _state_or_404(session_id):
+    state = session_store.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return state
+
+@router.post("/sessions/", response_model=SessionStateResponse)
+async def create_session(request: SessionCreateRequest):
+    try:
+        questions = await inference_pool.run(question_bank.get, request.topic, request.difficulty, request.count)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not questions:
+        raise HTTPException(status_code=502, detail="No questions available for this topic")
+    state = await inference_pool.run(session_store.create, request.user_id, request.topic, questions)
+    return state.to_dict()
+
+@router.get("/sessions/{session_id}", response_model=SessionStateResponse)
+def get_session(session_id: str):
+    return _state_or_404(session_id).to_dict()
+
+# The answer snapshot takes the latest live emotion and flags stored for the session, and the
+# store closes the aggregate over every frame analyzed while the question was open.
+# Feedback and score come from the server's own evaluation of the session's current question,
+# never from the client; after the page's streamed evaluation this is an evaluation cache hit.
+# record.q_index is the question the client answered: a double submit or a stale tab gets a
+# 409 instead of recording its answer against the next question. Store calls run in the pool,
+# never on the event loop.
+@router.post("/sessions/{session_id}/answers", response_model=SessionStateResponse)
+async def record_answer(session_id: str, record: AnswerRecord):
+    state = await inference_pool.run(_state_or_404, session_id)
+    if state.completed:
+        raise HTTPException(status_code=409, detail="Interview already completed")
+    if record.q_index != state.q_index:
+        raise HTTPException(status_code=409, detail=f"Session is at question {state.q_index}")
+    feedback = await inference_pool.run(evaluate_answer, state.questions[state.q_index], record.answer)
+    live = await inference_pool.run(session_store.latest_live, session_id)
+    try:
+        state = await inference_pool.run(session_store.append, session_id, "answer", {
+            "answer": record.answer,
+            "feedback": feedback,
+            "score": parse_score(feedback),
+            "emotion": live["emotion"],
+            "flags": live["flags"],
+        }, record.q_index)
+    except SessionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return state.to_dict()
+
+@router.post("/sessions/{session_id}/restart", response_model=SessionStateResponse)
+def restart_session(session_id: str):
+    _state_or_404(session_id)
+    return session_store.append(session_id, "restart", {}).to_dict()
+
+# Live data is only kept while the interview is in progress
+@router.post("/sessions/{session_id}/live")
+def push_live_reading(session_id: str, reading: LiveReading):
+    if _state_or_404(session_id).completed:
+        raise HTTPException(status_code=409, detail="Interview already completed")
+    session_store.push_live(session_id, {"emotion": reading.emotion, "confidence": reading.confidence},
+                            reading.flags, probs_from_scores(reading.scores) if reading.scores else None,
+                            reading.face_count)
+    return {"status": "ok"}
+
+@router.get("/sessions/{session_id}/live")
+def get_live_reading(session_id: str):
+    _state_or_404(session_id)
+    return session_store.latest_live(session_id)
+
+@router.get("/sessions/{session_id}/emotions")
+def get_emotion_timeline(session_id: str):
+    state = _state_or_404(session_id)
+    frames, retained = session_store.frame_stats(session_id)
+    return {
+        "frames": frames,
+        "retained_frames": retained,
+        "buffer_bytes": retained * FRAME_BYTES,
+        "questions": state.emotion_summaries,
+        "current": session_store.current_question(session_id),
+    }
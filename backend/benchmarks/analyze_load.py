@@ -0,0 +1,70 @@
+# Simulates N concurrent candidates, each posting a frame to /analyze_frame/ every --interval
+# seconds (the live monitoring page uses 3s), and reports client latency plus the server's
+# batching stats.
+#
+#   cd backend && uvicorn main:app &
+#   python -m benchmarks.analyze_load --image frame.jpg --candidates 64 --interval 0.5 --duration 30
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import multipart_body, percentiles, print_report
+
+
+def candidate(base_url, user_id, image, interval, stop_at, latencies, errors):
+    body, content_type = multipart_body({"user_id": user_id}, {"file": ("frame.jpg", image, "image/jpeg")})
+    next_send = time.perf_counter()
+    while time.perf_counter() < stop_at:
+        request = urllib.request.Request(f"{base_url}/analyze_frame/", data=body,
+                                         headers={"Content-Type": content_type})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                payload = json.loads(response.read())
+            if "error" in payload:
+                errors.append(payload["error"])
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors.append(str(e))
+        next_send += interval
+        time.sleep(max(0.0, next_send - time.perf_counter()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--candidates", type=int, default=32)
+    parser.add_argument("--interval", type=float, default=3.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    image = open(args.image, "rb").read()
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.candidates) as pool:
+        for i in range(args.candidates):
+            pool.submit(candidate, args.url, f"candidate-{i}", image, args.interval, stop_at, latencies, errors)
+            # Stagger start times so candidates don't post in lockstep
+            time.sleep(args.interval / args.candidates)
+    elapsed = time.perf_counter() - started
+
+    with urllib.request.urlopen(f"{args.url}/analyze_frame/stats/") as response:
+        server_stats = json.loads(response.read())
+
+    print_report({
+        "candidates": args.candidates,
+        "interval_s": args.interval,
+        "frames_per_s": round(len(latencies) / elapsed, 2),
+        "errors": len(errors),
+        "latency": percentiles(latencies),
+        "server_batching": server_stats,
+    })
+
+
+if __name__ == "__main__":
+    main()
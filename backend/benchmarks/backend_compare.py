@@ -0,0 +1,155 @@
+# Runs the same prompts and face images through the default backend and a converted one
+# (int8 / onnx), each in its own process so peak RSS is measured separately, then reports
+# score and verification-decision agreement alongside latency and memory. Every backend gets
+# the same preprocessed input: faces detected and aligned the way DeepFace does it for the
+# embedder, and the app's detected face crops for the emotion model.
+#
+#   cd backend && python -m services.inference_backends convert --backend onnx
+#   python -m benchmarks.backend_compare --backend onnx --images faces/ --score-tolerance 1
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+from benchmarks.common import percentiles, print_report
+from benchmarks.eval_throughput import submissions
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_worker(backend, image_dir, n_prompts, output):
+    from services.inference_backends import load_text2text, load_keras
+    from services.interview_bot import MODEL_ID, GENERATION_KWARGS, evaluation_prompt, parse_score
+    from services.face_verification import _vgg_input
+    from services.frame_analysis import detect_faces, crop
+    from services.emotion_analysis import preprocess_faces
+    from services.embedding_store import cosine_distance
+
+    report = {"backend": backend}
+
+    qa_pipeline = load_text2text(MODEL_ID, backend)
+    prompts = [evaluation_prompt(q, a) for q, a in submissions(n_prompts)]
+    qa_pipeline(prompts[0], **GENERATION_KWARGS)
+    scores, text_ms = [], []
+    for prompt in prompts:
+        result, ms = timed(lambda p: qa_pipeline(p, **GENERATION_KWARGS)[0]["generated_text"], prompt)
+        scores.append(parse_score(result))
+        text_ms.append(ms)
+    report["scores"] = scores
+    report["generate_ms"] = text_ms
+
+    paths = sorted(glob.glob(os.path.join(image_dir, "*.jpg")) + glob.glob(os.path.join(image_dir, "*.png")))
+    images = [cv2.imread(path) for path in paths]
+    # Preprocessing is the same code for every backend, so only the network is timed
+    embedder = load_keras("vgg_face", backend)
+    embeddings, embed_ms = [], []
+    for img in images:
+        try:
+            face = _vgg_input(img)
+        except ValueError:
+            embeddings.append(None)
+            continue
+        vector, ms = timed(embedder.predict_on_batch, face)
+        embeddings.append(np.asarray(vector, dtype=np.float32).ravel())
+        embed_ms.append(ms)
+    distances = {}
+    for i in range(len(images)):
+        for j in range(i + 1, len(images)):
+            if embeddings[i] is not None and embeddings[j] is not None:
+                distances[f"{os.path.basename(paths[i])}|{os.path.basename(paths[j])}"] = \
+                    cosine_distance(embeddings[i], embeddings[j])
+    report["distances"] = distances
+    report["embed_ms"] = embed_ms
+
+    emotion_model = load_keras("emotion", backend)
+    faces = []
+    for img in images:
+        boxes = detect_faces(img)
+        faces.append(crop(img, boxes[0]) if len(boxes) else img)
+    emotion_batch = preprocess_faces(faces) if faces else None
+    if emotion_batch is not None:
+        probs, ms = timed(emotion_model.predict_on_batch, emotion_batch)
+        report["emotions"] = np.argmax(np.asarray(probs), axis=1).tolist()
+        report["emotion_batch_ms"] = ms
+
+    report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    with open(output, "w") as f:
+        json.dump(report, f)
+
+
+def spawn(backend, args):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        output = f.name
+    subprocess.run([sys.executable, "-m", "benchmarks.backend_compare", "--worker", backend,
+                    "--images", args.images, "--prompts", str(args.prompts), "--output", output], check=True)
+    with open(output) as f:
+        result = json.load(f)
+    os.unlink(output)
+    return result
+
+
+def compare(base, candidate, score_tolerance, threshold):
+    score_diff = np.abs(np.asarray(base["scores"]) - np.asarray(candidate["scores"]))
+    shared = sorted(set(base["distances"]) & set(candidate["distances"]))
+    base_d = np.asarray([base["distances"][k] for k in shared])
+    cand_d = np.asarray([candidate["distances"][k] for k in shared])
+    report = {
+        "score_max_abs_diff": int(score_diff.max()) if score_diff.size else 0,
+        "scores_within_tolerance": float((score_diff <= score_tolerance).mean()) if score_diff.size else 1.0,
+        "verification_pairs": len(shared),
+        "verification_decision_agreement": float(((base_d <= threshold) == (cand_d <= threshold)).mean())
+        if shared else None,
+        "distance_max_abs_diff": float(np.abs(base_d - cand_d).max()) if shared else None,
+    }
+    if "emotions" in base and "emotions" in candidate:
+        report["emotion_argmax_agreement"] = float(
+            (np.asarray(base["emotions"]) == np.asarray(candidate["emotions"])).mean())
+    return report
+
+
+def summary(result):
+    return {
+        "generate": percentiles(result["generate_ms"]),
+        "embed": percentiles(result["embed_ms"]),
+        "emotion_batch_ms": round(result.get("emotion_batch_ms", 0.0), 3),
+        "peak_rss_mb": result["peak_rss_mb"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["int8", "onnx"], default="onnx")
+    parser.add_argument("--images", required=True, help="directory of face images (*.jpg, *.png)")
+    parser.add_argument("--prompts", type=int, default=20)
+    parser.add_argument("--score-tolerance", type=int, default=1)
+    parser.add_argument("--worker")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.images, args.prompts, args.output)
+        return
+
+    from services.face_verification import DISTANCE_THRESHOLD
+    base = spawn("default", args)
+    candidate = spawn(args.backend, args)
+    print_report({
+        "default": summary(base),
+        args.backend: summary(candidate),
+        "agreement": compare(base, candidate, args.score_tolerance, DISTANCE_THRESHOLD),
+    })
+
+
+if __name__ == "__main__":
+    main()
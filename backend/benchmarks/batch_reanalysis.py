@@ -0,0 +1,72 @@
+# Frames per second of offline re-analysis over synthetic recordings (frame directories), for
+# each worker count, plus a resume check: the first run is cancelled midway, the rerun must
+# finish only the remaining chunks and produce the same number of rows.
+#
+#   cd backend && MODEL_MODE=stub python -m benchmarks.batch_reanalysis --sessions 8 --frames 600
+#   python -m benchmarks.batch_reanalysis --workers 1 4 8
+
+import argparse
+import glob
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+from services.batch_analysis import BatchRunner
+from benchmarks.common import print_report
+from benchmarks.synthetic import SyntheticCandidate
+
+
+def write_recordings(root, sessions, frames):
+    for i in range(sessions):
+        folder = os.path.join(root, f"session-{i:03d}")
+        os.makedirs(folder)
+        for j, jpeg in enumerate(SyntheticCandidate(i).frames(frames)):
+            with open(os.path.join(folder, f"{j:06d}.jpg"), "wb") as f:
+                f.write(jpeg)
+
+
+def total_rows(output_dir):
+    return sum(int(np.load(path)["frame_index"].size) for path in glob.glob(os.path.join(output_dir, "*.npz")))
+
+
+def cancel_at(runner, frames):
+    # Simulates an interruption once about `frames` frames are written
+    while runner.frames_done < frames and not runner.cancelled.is_set():
+        time.sleep(0.05)
+    runner.cancelled.set()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=600, help="frames per session")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--chunk", type=int, default=64)
+    args = parser.parse_args()
+
+    expected = args.sessions * args.frames
+    report = {"sessions": args.sessions, "frames": expected, "runs": []}
+    with tempfile.TemporaryDirectory() as root:
+        recordings = os.path.join(root, "recordings")
+        write_recordings(recordings, args.sessions, args.frames)
+
+        for workers in args.workers:
+            output = os.path.join(root, f"out-{workers}")
+            summary = BatchRunner(output, workers=workers, chunk_size=args.chunk).run([recordings])
+            report["runs"].append({"workers": workers, "fps": summary["fps"], "seconds": summary["seconds"],
+                                   "rows": total_rows(output), "errors": summary["errors"]})
+
+        output = os.path.join(root, "out-resume")
+        first = BatchRunner(output, workers=args.workers[-1], chunk_size=args.chunk)
+        threading.Thread(target=cancel_at, args=(first, expected // 2), daemon=True).start()
+        first.run([recordings])
+        second = BatchRunner(output, workers=args.workers[-1], chunk_size=args.chunk).run([recordings])
+        report["resume"] = {"first_run_frames": first.frames_done, "resumed_frames": second["frames_resumed"],
+                            "second_run_frames": second["frames"], "rows": total_rows(output),
+                            "complete": total_rows(output) == expected}
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
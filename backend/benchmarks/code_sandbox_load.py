@@ -0,0 +1,99 @@
+# Hundreds of concurrent code submissions through the pre-forked sandbox pool, in process.
+# Reports per-test dispatch overhead (submission wall time minus the time the tests themselves
+# ran, divided by the number of tests), queue wait for a free slot, time to the first streamed
+# test result and end-to-end latency. --baseline also times a cold `python -c` subprocess per
+# submission, the cost the pool avoids.
+#
+#   cd backend && python -m benchmarks.code_sandbox_load --submissions 500 --tests 10
+#   python -m benchmarks.code_sandbox_load --pool-size 8 --max-running 8 --baseline 20
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from services.code_sandbox import SandboxPool
+from benchmarks.common import percentiles, print_report
+
+SOLUTION = "def add(a, b):\n    return a + b\n"
+
+
+async def submit(pool, tests, slots, samples):
+    queued = time.perf_counter()
+    first = None
+    test_ms = 0.0
+    # Mirrors the pool's own semaphore so the wait for a slot can be measured separately
+    async with slots:
+        started = time.perf_counter()
+        async for kind, payload in pool.run(SOLUTION, "add", tests):
+            if kind == "test":
+                first = first or time.perf_counter()
+                test_ms += payload["duration_ms"]
+            elif kind == "error":
+                samples["errors"] += 1
+    finished = time.perf_counter()
+    samples["queue_wait"].append((started - queued) * 1000)
+    samples["first_result"].append(((first or finished) - started) * 1000)
+    samples["latency"].append((finished - queued) * 1000)
+    samples["dispatch_per_test"].append(((finished - started) * 1000 - test_ms) / len(tests))
+
+
+async def run_load(pool, submissions, tests):
+    samples = {"queue_wait": [], "first_result": [], "latency": [], "dispatch_per_test": [], "errors": 0}
+    slots = asyncio.Semaphore(pool.max_running)
+    start = time.perf_counter()
+    await asyncio.gather(*(submit(pool, tests, slots, samples) for _ in range(submissions)))
+    return samples, time.perf_counter() - start
+
+
+def cold_subprocess_ms(tests, runs):
+    script = SOLUTION + "".join(f"assert add({t['args'][0]}, {t['args'][1]}) == {t['expected']}\n" for t in tests)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=300)
+    parser.add_argument("--tests", type=int, default=10, help="test cases per submission")
+    parser.add_argument("--pool-size", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--max-running", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--baseline", type=int, default=0, help="cold subprocess runs to compare against")
+    args = parser.parse_args()
+
+    tests = [{"args": [i, i + 1], "expected": 2 * i + 1} for i in range(args.tests)]
+    pool = SandboxPool(size=args.pool_size, max_running=args.max_running)
+    pool.start()
+    # Let the refillers pre-fork the pool before timing
+    deadline = time.time() + 30
+    while pool.stats()["idle"] < args.pool_size and time.time() < deadline:
+        time.sleep(0.05)
+    try:
+        samples, seconds = asyncio.run(run_load(pool, args.submissions, tests))
+    finally:
+        pool.shutdown()
+
+    report = {
+        "submissions": args.submissions,
+        "tests_per_submission": args.tests,
+        "pool": pool.stats(),
+        "errors": samples["errors"],
+        "seconds": round(seconds, 3),
+        "submissions_per_s": round(args.submissions / seconds, 1),
+        "dispatch_per_test": percentiles(samples["dispatch_per_test"]),
+        "queue_wait": percentiles(samples["queue_wait"]),
+        "first_result": percentiles(samples["first_result"]),
+        "latency": percentiles(samples["latency"]),
+    }
+    if args.baseline:
+        report["cold_subprocess"] = percentiles(cold_subprocess_ms(tests, args.baseline))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# End-to-end benchmark: starts the FastAPI app in a scratch directory, drives /verify_face/,
+# /analyze_frame/ and the interview-bot endpoints with synthetic candidates (or recorded frames),
+# and prints throughput, p50/p95/p99 latency and the server's peak RSS as JSON.
+#
+#   --mode stub   tiny local models (services/stub_models.py); runs offline anywhere
+#   --mode real   the real models; needs the DeepFace/HuggingFace weights already cached
+#
+#   cd backend && python -m benchmarks.e2e --mode stub --requests 400 --concurrency 16 --output run.json
+#   python -m benchmarks.e2e --mode stub --compare run.json   # exits 1 on regressions
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from services.question_bank import TOPICS
+from benchmarks.common import multipart_body, percentiles, print_report
+from benchmarks.synthetic import SyntheticCandidate, recorded_frames
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ["verify_face", "analyze_frame", "questions", "evaluate", "evaluate_stream"]
+ANSWERS = [
+    "A list is mutable while a tuple is immutable, so tuples can be dictionary keys.",
+    "I would add an index on the foreign key and check the query plan.",
+    "Gradient descent moves the weights against the gradient of the loss.",
+    "I don't know",
+]
+
+
+def post(url, body, content_type, timeout=60):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def get_json(url, timeout=60):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+# ---------------- SERVER ---------------- #
+
+class Server:
+    def __init__(self, mode, port, workdir, env_overrides):
+        env = dict(os.environ, MODEL_MODE=mode, QUESTION_BANK_PREFILL="0",
+                   QUESTION_BANK_PATH=os.path.join(workdir, "question_bank.json"),
+                   SESSION_STORE_PATH=os.path.join(workdir, "sessions.db"))
+        env.update(env_overrides)
+        self.url = f"http://127.0.0.1:{port}"
+        self.started = time.perf_counter()
+        # cwd is the scratch dir so user_data/, data/ and profiles/ never touch the real ones
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+             "--port", str(port), "--log-level", "warning"],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+        )
+
+    def wait_ready(self, timeout):
+        while time.perf_counter() - self.started < timeout:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited with code {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f"{self.url}/health/ready/", timeout=5) as response:
+                    if response.status == 200:
+                        return round(time.perf_counter() - self.started, 3)
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.1)
+        raise TimeoutError("server did not become ready")
+
+    def peak_rss_mb(self):
+        # High-water mark of the server process (Linux)
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+        return None
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+# ---------------- SCENARIOS ---------------- #
+
+def run_load(call, jobs, concurrency):
+    latencies, errors = [], []
+
+    def timed_call(job):
+        start = time.perf_counter()
+        try:
+            call(job)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed_call, jobs))
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "errors": len(errors),
+        "sample_errors": sorted(set(errors))[:3],
+        **percentiles(latencies),
+    }
+
+
+def verify_face_jobs(url, candidates, frames, requests):
+    # Enrollment is setup, not measured; each job verifies a later frame against the enrolled face
+    for i, candidate in enumerate(candidates):
+        body, content_type = multipart_body({"user_id": f"bench-{i}"},
+                                            {"registered": ("face.jpg", candidate.enrollment_image(), "image/jpeg")})
+        post(f"{url}/enroll_face/upload/", body, content_type)
+
+    def call(job):
+        index, image = job
+        body, content_type = multipart_body({"user_id": f"bench-{index}"},
+                                            {"captured": ("frame.jpg", image, "image/jpeg")})
+        post(f"{url}/verify_face/upload/", body, content_type)
+
+    return call, [(i % len(candidates), frames[i % len(candidates)][i % len(frames[0])]) for i in range(requests)]
+
+
+def analyze_frame_jobs(url, candidates, frames, requests):
+    def call(job):
+        index, image = job
+        body, content_type = multipart_body({"user_id": f"bench-{index}"},
+                                            {"file": ("frame.jpg", image, "image/jpeg")})
+        payload = json.loads(post(f"{url}/analyze_frame/", body, content_type))
+        if payload.get("status") != "completed":
+            raise RuntimeError(payload)
+
+    return call, [(i % len(candidates), frames[i % len(candidates)][(i // len(candidates)) % len(frames[0])])
+                  for i in range(requests)]
+
+
+def questions_jobs(url, candidates, frames, requests):
+    def call(job):
+        topic, difficulty = job
+        query = urllib.parse.urlencode({"topic": topic, "difficulty": difficulty, "count": 3})
+        get_json(f"{url}/questions/?{query}")
+
+    difficulties = ["beginner", "intermediate", "advanced"]
+    return call, [(TOPICS[i % len(TOPICS)], difficulties[(i // len(TOPICS)) % 3]) for i in range(requests)]
+
+
+def evaluate_jobs(url, candidates, frames, requests):
+    # Submit then long-poll until done: the latency a candidate waits for feedback
+    def call(job):
+        job_id = json.loads(post(f"{url}/evaluate/", json.dumps(job).encode(), "application/json"))["job_id"]
+        while True:
+            result = get_json(f"{url}/evaluate/{job_id}?wait=30")
+            if result["status"] == "done":
+                return
+            if result["status"] == "failed":
+                raise RuntimeError(result.get("error") or "evaluation failed")
+
+    return call, [{"question": f"Question {i % 50}", "answer": f"{ANSWERS[i % len(ANSWERS)]} ({i % 50})"}
+                  for i in range(requests)]
+
+
+def evaluate_stream_jobs(url, candidates, frames, requests):
+    def call(job):
+        body = post(f"{url}/evaluate/stream/", json.dumps(job).encode(), "application/json", timeout=120)
+        if b"event: done" not in body:
+            raise RuntimeError(body[-200:].decode("utf-8", "replace"))
+
+    return call, [{"question": f"Stream question {i}", "answer": ANSWERS[i % len(ANSWERS)]} for i in range(requests)]
+
+
+SCENARIO_JOBS = {
+    "verify_face": verify_face_jobs,
+    "analyze_frame": analyze_frame_jobs,
+    "questions": questions_jobs,
+    "evaluate": evaluate_jobs,
+    "evaluate_stream": evaluate_stream_jobs,
+}
+
+
+# ---------------- REPORT ---------------- #
+
+def compare(report, baseline, tolerance):
+    # Flags p95 latency or peak RSS growth and throughput drops beyond the tolerance
+    regressions = []
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or "p95_ms" not in before or "p95_ms" not in current:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+        if current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {current['throughput_rps']} rps")
+    rss, rss_before = report["server"].get("peak_rss_mb"), baseline.get("server", {}).get("peak_rss_mb")
+    if rss and rss_before and rss > rss_before * (1 + tolerance):
+        regressions.append(f"peak RSS {rss_before} -> {rss} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["stub", "real"], default="stub")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS,
+                        help="default: all (evaluate_stream only in real mode)")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--candidates", type=int, default=16)
+    parser.add_argument("--frames-per-candidate", type=int, default=20)
+    parser.add_argument("--frames", help="folder of recorded frames to use instead of synthetic ones")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra server environment, e.g. --env STUB_LATENCY_MS=20")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--compare", help="baseline report; exit 1 if any metric regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    scenarios = args.scenarios or [s for s in SCENARIOS if args.mode == "real" or s != "evaluate_stream"]
+    candidates = [SyntheticCandidate(i) for i in range(args.candidates)]
+    if args.frames:
+        recording = recorded_frames(args.frames)
+        frames = [recording[i:] + recording[:i] for i in range(args.candidates)]
+    else:
+        frames = [list(c.frames(args.frames_per_candidate)) for c in candidates]
+
+    env_overrides = dict(item.split("=", 1) for item in args.env)
+    report = {
+        "mode": args.mode,
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "candidates": args.candidates,
+                   "frames": args.frames or "synthetic", "env": env_overrides},
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        server = Server(args.mode, args.port, workdir, env_overrides)
+        try:
+            ready_seconds = server.wait_ready(args.startup_timeout)
+            for name in scenarios:
+                call, jobs = SCENARIO_JOBS[name](server.url, candidates, frames, args.requests + args.warmup)
+                run_load(call, jobs[:args.warmup], args.concurrency)
+                report["scenarios"][name] = run_load(call, jobs[args.warmup:], args.concurrency)
+            report["server"] = {"ready_seconds": ready_seconds, "peak_rss_mb": server.peak_rss_mb(),
+                                "health": get_json(f"{server.url}/health/")}
+        finally:
+            server.stop()
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
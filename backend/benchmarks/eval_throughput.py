@@ -0,0 +1,61 @@
+# Evaluations per second for one-at-a-time evaluate_answer calls versus batched
+# evaluate_answers calls at several batch sizes, on the same synthetic submissions.
+#
+#   cd backend && python -m benchmarks.eval_throughput --submissions 64 --batch-sizes 1 4 8 16
+
+import argparse
+import time
+from services.interview_bot import evaluate_answer, evaluate_answers
+from services.model_registry import registry
+from benchmarks.common import print_report
+
+QUESTIONS = [
+    "What is the difference between a list and a tuple in Python?",
+    "Explain what a SQL JOIN does.",
+    "What is overfitting in machine learning?",
+    "How does a hash table handle collisions?",
+]
+ANSWERS = [
+    "A list is mutable and a tuple is immutable, so tuples can be used as dictionary keys.",
+    "It combines rows from two tables based on a related column.",
+    "When the model memorizes training data and performs poorly on unseen data.",
+    "I don't know.",
+    "Using chaining with linked lists or open addressing such as linear probing.",
+]
+
+
+def submissions(n):
+    return [(QUESTIONS[i % len(QUESTIONS)], f"{ANSWERS[i % len(ANSWERS)]} (candidate {i})") for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    registry.get("qa_pipeline")
+    pairs = submissions(args.submissions)
+    evaluate_answer(*pairs[0])
+
+    start = time.perf_counter()
+    for question, answer in pairs:
+        evaluate_answer(question, answer)
+    sequential = args.submissions / (time.perf_counter() - start)
+
+    batched = {}
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        for offset in range(0, len(pairs), batch_size):
+            evaluate_answers(pairs[offset:offset + batch_size], batch_size=batch_size)
+        batched[str(batch_size)] = round(args.submissions / (time.perf_counter() - start), 3)
+
+    print_report({
+        "submissions": args.submissions,
+        "sequential_evals_per_s": round(sequential, 3),
+        "batched_evals_per_s": batched,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# 1:N lookup latency of the face index at --users enrolled identities. Builds a memory-mapped
+# index of random unit vectors (in chunks, so 100k x 4096 never sits in RAM twice), then
+# queries with noisy copies of enrolled vectors and reports latency percentiles, batched
+# throughput, top-1 recall and the exact brute-force latency for comparison.
+#
+#   cd backend && python -m benchmarks.face_index_search --users 100000 --dim 4096
+
+import argparse
+import tempfile
+import time
+import numpy as np
+from services.face_index import FaceIndex
+from benchmarks.common import percentiles, print_report
+
+
+def build(index, users, dim, chunk, rng):
+    started = time.perf_counter()
+    for start in range(0, users, chunk):
+        count = min(chunk, users - start)
+        index.add_many([f"user-{i}" for i in range(start, start + count)],
+                       rng.standard_normal((count, dim), dtype=np.float32))
+    return time.perf_counter() - started
+
+
+def queries_for(index, rng, count, noise):
+    rows = rng.integers(0, len(index), count)
+    vectors = np.asarray(index._full[rows])
+    vectors += noise * rng.standard_normal(vectors.shape, dtype=np.float32) / np.sqrt(vectors.shape[1])
+    return rows, vectors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=4096, help="VGG-Face embeddings from DeepFace are 4096-d")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--noise", type=float, default=0.5, help="query perturbation, relative to a unit vector")
+    parser.add_argument("--chunk", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as folder:
+        index = FaceIndex(folder)
+        build_seconds = build(index, args.users, args.dim, args.chunk, rng)
+
+        # A second instance over the same files: what another worker pays to open the index
+        started = time.perf_counter()
+        reopened = FaceIndex(folder)
+        open_ms = (time.perf_counter() - started) * 1000
+
+        rows, queries = queries_for(reopened, rng, args.queries, args.noise)
+        for query in queries[:10]:
+            reopened.search(query, args.k)
+
+        latencies, hits = [], 0
+        for row, query in zip(rows, queries):
+            start = time.perf_counter()
+            matches = reopened.search(query, args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += matches[0]["user_id"] == f"user-{row}"
+
+        started = time.perf_counter()
+        for start in range(0, len(queries), args.batch):
+            reopened.search_many(queries[start:start + args.batch], args.k)
+        batched_qps = len(queries) / (time.perf_counter() - started)
+
+        # Exact search over the full vectors (no projection), same data
+        exact = FaceIndex(folder, projection_dim=args.dim)
+        exact_latencies = []
+        for query in queries[:50]:
+            start = time.perf_counter()
+            exact.search(query, args.k)
+            exact_latencies.append((time.perf_counter() - start) * 1000)
+
+    print_report({
+        "users": args.users,
+        "dim": args.dim,
+        "projection_dim": reopened.stats()["projection_dim"],
+        "rerank": reopened.rerank,
+        "build_seconds": round(build_seconds, 2),
+        "open_ms": round(open_ms, 3),
+        "search": percentiles(latencies),
+        "batched_qps": round(batched_qps, 1),
+        "top1_recall": round(hits / len(queries), 4),
+        "exact_search": percentiles(exact_latencies),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Saturates /verify_face/ with concurrent requests and measures /health/ and /login/ latency
+# before and during the load, plus how many verification requests were shed with 503.
+#
+#   cd backend && uvicorn main:app &
+#   python -m benchmarks.health_under_load --image face.jpg --clients 64 --duration 20
+
+import argparse
+import base64
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from benchmarks.common import percentiles, print_report
+
+
+def probe(base_url, samples, stop):
+    login = json.dumps({"username": "bench"}).encode()
+    while not stop.is_set():
+        for request in (urllib.request.Request(f"{base_url}/health/"),
+                        urllib.request.Request(f"{base_url}/login/", data=login,
+                                               headers={"Content-Type": "application/json"})):
+            start = time.perf_counter()
+            try:
+                urllib.request.urlopen(request, timeout=30).read()
+                samples[request.full_url.rsplit("/", 2)[-2]].append((time.perf_counter() - start) * 1000)
+            except Exception:
+                pass
+        time.sleep(0.05)
+
+
+def hammer(base_url, payload, statuses, stop):
+    while not stop.is_set():
+        request = urllib.request.Request(f"{base_url}/verify_face/", data=payload,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                statuses[response.status] += 1
+        except urllib.error.HTTPError as e:
+            statuses[e.code] += 1
+            if e.code == 503:
+                time.sleep(0.05)
+        except Exception:
+            statuses["connection_error"] += 1
+
+
+def measure_probes(base_url, seconds):
+    samples = {"health": [], "login": []}
+    stop = threading.Event()
+    thread = threading.Thread(target=probe, args=(base_url, samples, stop))
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    image_b64 = base64.b64encode(open(args.image, "rb").read()).decode("utf-8")
+    payload = json.dumps({"user_id": "bench-load", "registered_image": image_b64,
+                          "captured_image": image_b64}).encode()
+
+    idle = measure_probes(args.url, 5)
+
+    statuses = Counter()
+    stop = threading.Event()
+    workers = [threading.Thread(target=hammer, args=(args.url, payload, statuses, stop))
+               for _ in range(args.clients)]
+    for worker in workers:
+        worker.start()
+    time.sleep(2)
+    loaded = measure_probes(args.url, args.duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    print_report({
+        "clients": args.clients,
+        "idle": {name: percentiles(values) for name, values in idle.items()},
+        "under_verify_load": {name: percentiles(values) for name, values in loaded.items()},
+        "verify_status_counts": {str(k): v for k, v in statuses.items()},
+    })
+
+
+if __name__ == "__main__":
+    main()
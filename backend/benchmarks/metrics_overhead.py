@@ -0,0 +1,84 @@
+# Cost of the instrumentation layer relative to a request. Measures a bare timed() block,
+# a histogram observe() and the ASGI middleware around a no-op app, then reports the
+# instrumentation time per /analyze_frame/ request (middleware + decode/detect/classify
+# stages + batch observations) as a share of --request-ms (default: a typical p50).
+#
+#   cd backend && python -m benchmarks.metrics_overhead --request-ms 25
+
+import argparse
+import asyncio
+import time
+from services.metrics import MetricsMiddleware, STAGE_SECONDS, timed
+from benchmarks.common import percentiles, print_report
+
+SCOPE = {"type": "http", "method": "POST", "path": "/analyze_frame/", "headers": []}
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def noop_send(message):
+    pass
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def middleware_us(iterations):
+    wrapped = MetricsMiddleware(noop_app)
+
+    async def run(app):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await app(dict(SCOPE), None, noop_send)
+        return time.perf_counter() - start
+
+    bare = asyncio.run(run(noop_app))
+    instrumented = asyncio.run(run(wrapped))
+    return max(instrumented - bare, 0.0) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--request-ms", type=float, default=25.0)
+    parser.add_argument("--stages", type=int, default=5, help="timed()/observe() calls per request")
+    args = parser.parse_args()
+
+    def timed_block():
+        with timed("bench"):
+            pass
+
+    timed_us = per_call_us(timed_block, args.iterations)
+    observe_us = per_call_us(lambda: STAGE_SECONDS.observe(0.004, stage="bench"), args.iterations)
+    mw_us = middleware_us(args.iterations // 10)
+    per_request_us = mw_us + args.stages * timed_us
+
+    # Spread of single timed() calls, to show the tail stays in the microsecond range
+    samples = []
+    for _ in range(10000):
+        start = time.perf_counter()
+        timed_block()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    overhead_pct = per_request_us / (args.request_ms * 1000) * 100
+    print_report({
+        "timed_us": round(timed_us, 3),
+        "observe_us": round(observe_us, 3),
+        "middleware_us": round(mw_us, 3),
+        "timed_latency": percentiles(samples),
+        "per_request_us": round(per_request_us, 3),
+        "request_ms": args.request_ms,
+        "overhead_pct": round(overhead_pct, 4),
+        "within_budget": overhead_pct < 1.0,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Report and cohort latency as the interview history grows. Fills a temporary session store
+# with --sessions interviews, then times: the extra cost the report service adds to each
+# recorded answer, rendering a report (first open vs cached), cohort views (percentiles plus
+# leaderboard) against a baseline that rebuilds them from every stored session the way the
+# completion screen used to, and a cold start that loads the stored aggregates.
+#
+#   cd backend && python -m benchmarks.report_cohort --sessions 5000
+#   python -m benchmarks.report_cohort --sessions 20000 --iterations 200
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from services.session_store import SQLiteSessionStore
+from services.report_service import ReportService
+from services.question_bank import TOPICS
+from benchmarks.common import percentiles, print_report, time_calls
+
+
+def answer(rng):
+    score = rng.randint(0, 10)
+    return {"answer": "answer", "feedback": f"Score: {score}/10.", "score": score,
+            "emotion": {"emotion": rng.choice(["neutral", "happy", "fear"]), "confidence": 80.0},
+            "emotion_summary": None, "flags": ["⚠️ Multiple faces detected"] if rng.random() < 0.1 else []}
+
+
+def fill(store, sessions, questions, rng):
+    ids = []
+    for i in range(sessions):
+        state = store.create(f"candidate-{i % (sessions // 3 + 1)}", rng.choice(TOPICS),
+                             [f"Question {q}" for q in range(questions)])
+        # Most interviews finish; some are abandoned midway
+        for _ in range(questions if rng.random() < 0.85 else rng.randint(0, questions - 1)):
+            store.append(state.session_id, "answer", answer(rng))
+        ids.append(state.session_id)
+    return ids
+
+
+def naive_cohort(store, ids, topic, limit):
+    # Replays every session and loops over Python objects, as rebuilding from state used to
+    rows = []
+    for session_id in ids:
+        state = store._load(session_id)
+        if state.completed and state.scores and (topic is None or state.topic == topic):
+            rows.append((sum(state.scores) / len(state.scores), state.created_at, session_id))
+    rows.sort(key=lambda r: (-r[0], r[1]))
+    scores = sorted(r[0] for r in rows)
+    return {"percentiles": [scores[int(p / 100 * (len(scores) - 1))] for p in (10, 25, 50, 75, 90)],
+            "sessions": len(rows), "leaderboard": rows[:limit]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--baseline-iterations", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "sessions.db")
+        store = SQLiteSessionStore(path)
+        service = ReportService(store, path)
+        start = time.perf_counter()
+        ids = fill(store, args.sessions, args.questions, rng)
+        fill_seconds = time.perf_counter() - start
+
+        # Answer write cost with and without the report service listening
+        plain = SQLiteSessionStore(os.path.join(folder, "plain.db"))
+        plain_ids = fill(plain, 50, 1, rng)
+        listened_ids = fill(store, 50, 1, rng)
+        samples = {"plain": [], "with_reports": []}
+        for which, target, targets in (("plain", plain, plain_ids), ("with_reports", store, listened_ids)):
+            for session_id in targets * (args.iterations // 50 + 1):
+                t = time.perf_counter()
+                target.append(session_id, "answer", answer(rng))
+                samples[which].append((time.perf_counter() - t) * 1000)
+                target.append(session_id, "restart", {})
+
+        first_open = []
+        for session_id in rng.sample(ids, min(args.iterations, len(ids))):
+            t = time.perf_counter()
+            service.report(session_id)
+            first_open.append((time.perf_counter() - t) * 1000)
+        cached_id = ids[0]
+        service.report(cached_id)
+
+        service.cohort_view()  # first call pays NumPy's one-off setup
+        report = {
+            "sessions": args.sessions,
+            "fill_seconds": round(fill_seconds, 2),
+            "append_plain": percentiles(samples["plain"]),
+            "append_with_reports": percentiles(samples["with_reports"]),
+            "report_first_open": percentiles(first_open),
+            "report_cached": percentiles(time_calls(lambda: service.report(cached_id), args.iterations)),
+            "cohort_all": percentiles(time_calls(lambda: service.cohort_view(limit=20), args.iterations)),
+            "cohort_topic": percentiles(time_calls(lambda: service.cohort_view("Python", limit=20), args.iterations)),
+            "cohort_all_naive": percentiles(time_calls(lambda: naive_cohort(store, ids, None, 20),
+                                                       args.baseline_iterations)),
+        }
+
+        # Same answers either way
+        fast = service.cohort_view(limit=20)
+        slow = naive_cohort(store, ids, None, 20)
+        report["leaderboard_matches"] = ([r["session_id"] for r in fast["leaderboard"]]
+                                         == [r[2] for r in slow["leaderboard"]])
+
+        start = time.perf_counter()
+        cold = ReportService(SQLiteSessionStore(path), path)
+        report["cold_start"] = {"seconds": round(time.perf_counter() - start, 3), "sessions": cold.cohort.size}
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
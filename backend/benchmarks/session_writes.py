@@ -0,0 +1,71 @@
+# Append throughput of the SQLite session store with many concurrent sessions, each writing a
+# created record followed by answer records, from a pool of client threads. The report service
+# is subscribed as in main.py, so every append pays for its listener like a served one does.
+#
+#   cd backend && python -m benchmarks.session_writes --sessions 500 --answers 10
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services.session_store import SQLiteSessionStore
+from services.report_service import ReportService
+from benchmarks.common import percentiles, print_report
+
+FEEDBACK = "Score: 7/10. The answer covers the main idea but misses edge cases."
+
+
+def run_session(store, index, answers, latencies):
+    start = time.perf_counter()
+    state = store.create(f"candidate-{index}", "Python", [f"Question {i}" for i in range(answers)])
+    latencies.append((time.perf_counter() - start) * 1000)
+    for i in range(answers):
+        start = time.perf_counter()
+        store.append(state.session_id, "answer", {
+            "answer": f"answer {i}", "feedback": FEEDBACK, "score": 7,
+            "emotion": {"emotion": "neutral", "confidence": 81.5}, "flags": [],
+        })
+        latencies.append((time.perf_counter() - start) * 1000)
+    return state.session_id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--answers", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "sessions.db")
+        store = SQLiteSessionStore(path)
+        service = ReportService(store, path)
+        latencies = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            futures = [pool.submit(run_session, store, index, args.answers, latencies)
+                       for index in range(args.sessions)]
+        session_ids = [future.result() for future in futures][:100]
+        elapsed = time.perf_counter() - start
+
+        # Cold reads replay the log from disk
+        cold = SQLiteSessionStore(path)
+        start = time.perf_counter()
+        for session_id in session_ids:
+            cold.get(session_id)
+        replay_ms = (time.perf_counter() - start) * 1000 / max(len(session_ids), 1)
+
+        print_report({
+            "sessions": args.sessions,
+            "records": len(latencies),
+            "records_per_s": round(len(latencies) / elapsed, 1),
+            "append_latency": percentiles(latencies),
+            "cold_replay_ms_per_session": round(replay_ms, 3),
+            "cohort_sessions": service.cohort.size,
+            "db_bytes": os.path.getsize(path),
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Measures how long the backend modules take to import and how long after process start each
+# endpoint first answers successfully.
+#
+#   cd backend && python -m benchmarks.startup --image face.jpg
+
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from benchmarks.common import multipart_body, print_report
+
+MODULES = ["api.auth", "api.face", "api.live_monitor", "main"]
+
+
+def import_time(module):
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return round(float(out.stdout.strip().splitlines()[-1]), 3)
+
+
+def endpoint_requests(base_url, image):
+    image_b64 = base64.b64encode(image).decode("utf-8")
+    body, content_type = multipart_body({"user_id": "bench-startup"}, {"file": ("frame.jpg", image, "image/jpeg")})
+    return {
+        "/health/": urllib.request.Request(f"{base_url}/health/"),
+        "/login/": urllib.request.Request(
+            f"{base_url}/login/", data=json.dumps({"username": "bench"}).encode(),
+            headers={"Content-Type": "application/json"}),
+        "/verify_face/": urllib.request.Request(
+            f"{base_url}/verify_face/",
+            data=json.dumps({"user_id": "bench-startup", "registered_image": image_b64,
+                             "captured_image": image_b64}).encode(),
+            headers={"Content-Type": "application/json"}),
+        "/analyze_frame/": urllib.request.Request(
+            f"{base_url}/analyze_frame/", data=body, headers={"Content-Type": content_type}),
+    }
+
+
+def first_success(request, started, timeout):
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if response.status == 200:
+                    return round(time.perf_counter() - started, 3)
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", required=True, help="JPEG containing one face")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    report = {"import_seconds": {module: import_time(module) for module in MODULES}}
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=dict(os.environ),
+    )
+    try:
+        image = open(args.image, "rb").read()
+        report["first_success_seconds"] = {
+            path: first_success(request, started, args.timeout)
+            for path, request in endpoint_requests(base_url, image).items()
+        }
+        ready = urllib.request.Request(f"{base_url}/health/ready/")
+        report["first_success_seconds"]["/health/ready/"] = first_success(ready, started, args.timeout)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
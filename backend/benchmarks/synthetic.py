@@ -0,0 +1,64 @@
+# Synthetic candidates for offline benchmarks: a drawn face (skin ellipse, eyes, brows, mouth)
+# whose position, size and expression drift a little from frame to frame, standing in for
+# webcam captures. Every candidate is seeded, so runs are reproducible.
+
+import glob
+import os
+import cv2
+import numpy as np
+
+
+def draw_face(rng, width=640, height=480, center=None, scale=1.0, smile=0.0):
+    frame = np.full((height, width, 3), rng.integers(90, 160), dtype=np.uint8)
+    frame += rng.integers(0, 12, size=frame.shape, dtype=np.uint8)
+    cx, cy = center or (width // 2, height // 2)
+    rx, ry = int(80 * scale), int(105 * scale)
+    skin = tuple(int(v) for v in rng.integers([120, 150, 190], [160, 190, 235]))
+    cv2.ellipse(frame, (cx, cy), (rx, ry), 0, 0, 360, skin, -1)
+    for side in (-1, 1):
+        eye = (cx + side * int(32 * scale), cy - int(25 * scale))
+        cv2.ellipse(frame, eye, (int(16 * scale), int(8 * scale)), 0, 0, 360, (245, 245, 245), -1)
+        cv2.circle(frame, eye, int(6 * scale), (40, 30, 20), -1)
+        cv2.line(frame, (eye[0] - int(18 * scale), eye[1] - int(18 * scale)),
+                 (eye[0] + int(18 * scale), eye[1] - int(20 * scale)), (50, 40, 30), max(2, int(4 * scale)))
+    cv2.line(frame, (cx, cy - int(10 * scale)), (cx - int(6 * scale), cy + int(20 * scale)), (90, 110, 150), 2)
+    mouth = (cx, cy + int(50 * scale))
+    cv2.ellipse(frame, mouth, (int(30 * scale), max(2, int((4 + 14 * smile) * scale))), 0, 0, 180, (60, 60, 150), -1)
+    return frame
+
+
+def encode_jpeg(frame, quality=85):
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return buffer.tobytes()
+
+
+class SyntheticCandidate:
+    def __init__(self, index, width=640, height=480):
+        self.rng = np.random.default_rng(index)
+        self.width, self.height = width, height
+        self.center = np.array([width / 2, height / 2]) + self.rng.normal(0, 20, 2)
+        self.scale = float(self.rng.uniform(0.8, 1.2))
+        self.seed_face = draw_face(np.random.default_rng(index), width, height,
+                                   tuple(int(v) for v in self.center), self.scale)
+
+    def enrollment_image(self):
+        return encode_jpeg(self.seed_face)
+
+    def frames(self, count):
+        # A short "recording": small head motion and a slowly changing expression
+        center, smile = self.center.copy(), 0.0
+        for _ in range(count):
+            center = np.clip(center + self.rng.normal(0, 3, 2), [100, 120], [self.width - 100, self.height - 120])
+            smile = float(np.clip(smile + self.rng.normal(0, 0.1), 0.0, 1.0))
+            yield encode_jpeg(draw_face(self.rng, self.width, self.height,
+                                        tuple(int(v) for v in center), self.scale, smile))
+
+
+def recorded_frames(folder):
+    # A real frame sequence exported from a session: every JPEG/PNG in the folder, in name order
+    paths = sorted(glob.glob(os.path.join(folder, "*.jpg")) + glob.glob(os.path.join(folder, "*.png")))
+    if not paths:
+        raise FileNotFoundError(f"No .jpg/.png frames in {folder}")
+    return [open(path, "rb").read() for path in paths]
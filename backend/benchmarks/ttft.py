@@ -0,0 +1,67 @@
+# Time-to-first-token versus total generation time for streamed answer feedback, either
+# in-process or against a running server's /evaluate/stream/ endpoint.
+#
+#   cd backend && python -m benchmarks.ttft --submissions 20
+#   python -m benchmarks.ttft --url http://127.0.0.1:8000 --submissions 20
+
+import argparse
+import json
+import time
+import urllib.request
+from benchmarks.common import percentiles, print_report
+from benchmarks.eval_throughput import submissions
+
+
+def stream_in_process(question, answer):
+    from services.interview_bot import stream_evaluate_answer
+    return stream_evaluate_answer(question, answer)
+
+
+def stream_http(url, question, answer):
+    request = urllib.request.Request(f"{url}/evaluate/stream/",
+                                     data=json.dumps({"question": question, "answer": answer}).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=300) as response:
+        event = None
+        for raw in response:
+            line = raw.decode("utf-8").rstrip("\n")
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event == "token":
+                yield json.loads(line[len("data: "):])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="benchmark a running server instead of calling the service directly")
+    parser.add_argument("--submissions", type=int, default=20)
+    args = parser.parse_args()
+
+    if not args.url:
+        from services.model_registry import registry
+        registry.get("qa_pipeline")
+
+    ttft, total = [], []
+    # The run id keeps answers unique so the result cache never short-cuts generation
+    run_id = int(time.time())
+    for question, answer in submissions(args.submissions):
+        answer = f"{answer} [{run_id}]"
+        stream = stream_http(args.url, question, answer) if args.url else stream_in_process(question, answer)
+        start = time.perf_counter()
+        first = None
+        for _ in stream:
+            if first is None:
+                first = (time.perf_counter() - start) * 1000
+        total.append((time.perf_counter() - start) * 1000)
+        if first is not None:
+            ttft.append(first)
+
+    print_report({
+        "mode": "http" if args.url else "in_process",
+        "time_to_first_token": percentiles(ttft),
+        "total_generation": percentiles(total),
+    })
+
+
+if __name__ == "__main__":
+    main()
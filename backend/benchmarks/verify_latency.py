@@ -0,0 +1,58 @@
+# Compares the original verification path (base64 -> imdecode -> imwrite -> DeepFace.verify on files)
+# against the in-memory path (raw bytes -> ndarray -> cached registered embedding + one embedding).
+#
+#   cd backend && python -m benchmarks.verify_latency --registered reg.jpg --captured cap.jpg
+
+import argparse
+import base64
+import os
+import tempfile
+import cv2
+import numpy as np
+from deepface import DeepFace
+from services.face_verification import verify_face_bytes, verify_faces
+from benchmarks.common import percentiles, time_calls, print_report
+
+
+def legacy_verify(folder, registered_b64, captured_b64):
+    reg_path = os.path.join(folder, "registered.jpg")
+    cap_path = os.path.join(folder, "captured.jpg")
+    reg_img = cv2.imdecode(np.frombuffer(base64.b64decode(registered_b64), np.uint8), cv2.IMREAD_COLOR)
+    cap_img = cv2.imdecode(np.frombuffer(base64.b64decode(captured_b64), np.uint8), cv2.IMREAD_COLOR)
+    cv2.imwrite(reg_path, reg_img)
+    cv2.imwrite(cap_path, cap_img)
+    return DeepFace.verify(img1_path=reg_path, img2_path=cap_path, model_name="VGG-Face")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registered", required=True)
+    parser.add_argument("--captured", required=True)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+
+    registered_raw = open(args.registered, "rb").read()
+    captured_raw = open(args.captured, "rb").read()
+    registered_b64 = base64.b64encode(registered_raw).decode("utf-8")
+    captured_b64 = base64.b64encode(captured_raw).decode("utf-8")
+    user_id = "bench-verify"
+
+    with tempfile.TemporaryDirectory() as folder:
+        legacy = time_calls(lambda: legacy_verify(folder, registered_b64, captured_b64),
+                            args.iterations, args.warmup)
+
+    in_memory_b64 = time_calls(lambda: verify_faces(user_id, registered_b64, captured_b64),
+                               args.iterations, args.warmup)
+    in_memory_raw = time_calls(lambda: verify_face_bytes(user_id, None, captured_raw),
+                               args.iterations, args.warmup)
+
+    print_report({
+        "legacy_disk_roundtrip": percentiles(legacy),
+        "in_memory_base64": percentiles(in_memory_b64),
+        "in_memory_raw_bytes": percentiles(in_memory_raw),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Memory of a multi-worker deployment, with and without model preloading. For each worker
+# count it starts gunicorn (gunicorn.conf.py), waits until every worker reports ready, sends
+# a little traffic (inference touches pages, which is when copy-on-write sharing erodes),
+# then reads /proc/<pid>/smaps_rollup for the master and each worker:
+#
+#   rss_mb   resident, counting shared pages in full
+#   pss_mb   shared pages split between the processes sharing them; the sum is the true total
+#   uss_mb   pages only this process has (Private_Clean + Private_Dirty)
+#
+#   cd backend && python -m benchmarks.worker_memory --workers 1 4 8
+#   python -m benchmarks.worker_memory --mode stub   # plumbing check without real models
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from benchmarks.common import multipart_body, print_report
+from benchmarks.synthetic import SyntheticCandidate
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def smaps(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "uss_mb": round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1),
+    }
+
+
+def children(pid):
+    found = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # The ppid is the 2nd field after the parenthesised command name
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        found.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return found
+
+
+def mem_available_mb():
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def wait_for_workers(url, workers, timeout):
+    # /health/ reports the answering worker's pid; done once every worker has answered ready
+    ready, deadline = set(), time.perf_counter() + timeout
+    while len(ready) < workers and time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health/", timeout=10) as response:
+                health = json.loads(response.read())
+            if health["ready"]:
+                ready.add(health["pid"])
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    if len(ready) < workers:
+        raise TimeoutError(f"only {len(ready)}/{workers} workers became ready")
+
+
+def send_traffic(url, requests):
+    frame = next(SyntheticCandidate(0).frames(1))
+    body, content_type = multipart_body({"user_id": "bench-memory"}, {"file": ("frame.jpg", frame, "image/jpeg")})
+    for i in range(requests):
+        for request in (
+            urllib.request.Request(f"{url}/analyze_frame/", data=body, headers={"Content-Type": content_type}),
+            urllib.request.Request(f"{url}/questions/?topic=Python&count=3&difficulty=beginner"),
+        ):
+            try:
+                urllib.request.urlopen(request, timeout=120).read()
+            except Exception:
+                pass
+
+
+def measure(workers, preload, args, workdir):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PRELOAD_MODELS="1" if preload else "0",
+               BIND=f"127.0.0.1:{args.port}", MODEL_MODE=args.mode, QUESTION_BANK_PREFILL="0",
+               QUESTION_BANK_PATH=os.path.join(workdir, "question_bank.json"),
+               SESSION_STORE_PATH=os.path.join(workdir, "sessions.db"))
+    before = mem_available_mb()
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(BACKEND_DIR, "gunicorn.conf.py"),
+         "--pythonpath", BACKEND_DIR, "main:app"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        started = time.perf_counter()
+        wait_for_workers(url, workers, args.timeout)
+        ready_seconds = time.perf_counter() - started
+        send_traffic(url, args.traffic)
+        processes = {"master": smaps(master.pid)}
+        for i, pid in enumerate(sorted(children(master.pid))):
+            processes[f"worker-{i}"] = smaps(pid)
+        worker_stats = [v for k, v in processes.items() if k != "master"]
+        return {
+            "workers": workers,
+            "preload": preload,
+            "ready_seconds": round(ready_seconds, 1),
+            "total_pss_mb": round(sum(p["pss_mb"] for p in processes.values()), 1),
+            "total_rss_mb": round(sum(p["rss_mb"] for p in processes.values()), 1),
+            "mean_worker_uss_mb": round(sum(p["uss_mb"] for p in worker_stats) / max(len(worker_stats), 1), 1),
+            "node_used_mb": round(before - mem_available_mb(), 1),
+            "processes": processes,
+        }
+    finally:
+        master.terminate()
+        master.wait()
+        time.sleep(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--mode", choices=["real", "stub"], default="real")
+    parser.add_argument("--traffic", type=int, default=20, help="requests per endpoint before measuring")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--timeout", type=float, default=900)
+    parser.add_argument("--no-baseline", action="store_true", help="skip the PRELOAD_MODELS=0 runs")
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for workers in args.workers:
+            for preload in ([True] if args.no_baseline else [False, True]):
+                runs.append(measure(workers, preload, args, workdir))
+    print_report({"mode": args.mode, "runs": runs})
+
+
+if __name__ == "__main__":
+    main()
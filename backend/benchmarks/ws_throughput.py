@@ -0,0 +1,98 @@
+# Sends the same frames over per-frame multipart POSTs and over one persistent WebSocket and
+# compares frames/s, per-frame latency and (with --server-pid) server CPU milliseconds per frame.
+#
+#   cd backend && uvicorn main:app & echo $!
+#   python -m benchmarks.ws_throughput --image frame.jpg --frames 500 --server-pid <pid>
+
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+import websocket
+from benchmarks.common import multipart_body, percentiles, print_report
+
+
+def server_cpu_seconds(pid):
+    if pid is None:
+        return None
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def run_post(base_url, image, frames):
+    latencies = []
+    for _ in range(frames):
+        body, content_type = multipart_body({"user_id": "bench-post"}, {"file": ("frame.jpg", image, "image/jpeg")})
+        request = urllib.request.Request(f"{base_url}/analyze_frame/", data=body,
+                                         headers={"Content-Type": content_type})
+        start = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_websocket(base_url, image, frames, rate):
+    ws = websocket.create_connection(base_url.replace("http", "ws", 1) + "/ws/monitor/bench-ws")
+    sent_at, latencies, done = {}, [], threading.Event()
+
+    def reader():
+        received = 0
+        while received < frames:
+            message = json.loads(ws.recv())
+            received += 1
+            if message["type"] == "result":
+                latencies.append((time.perf_counter() - sent_at[message["seq"]]) * 1000)
+        done.set()
+
+    threading.Thread(target=reader, daemon=True).start()
+    interval = 1.0 / rate if rate else 0.0
+    for seq in range(1, frames + 1):
+        sent_at[seq] = time.perf_counter()
+        ws.send_binary(image)
+        if interval:
+            time.sleep(interval)
+    # Dropped frames never get a reply, so don't wait forever for all of them
+    done.wait(timeout=30)
+    ws.close()
+    return latencies
+
+
+def measure(name, fn, frames, pid):
+    cpu_before = server_cpu_seconds(pid)
+    start = time.perf_counter()
+    latencies = fn()
+    elapsed = time.perf_counter() - start
+    report = {
+        "frames_sent": frames,
+        "frames_answered": len(latencies),
+        "frames_per_s": round(len(latencies) / elapsed, 2),
+        "latency": percentiles(latencies),
+    }
+    if cpu_before is not None and latencies:
+        report["server_cpu_ms_per_frame"] = round((server_cpu_seconds(pid) - cpu_before) * 1000 / len(latencies), 3)
+    return name, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--ws-rate", type=float, default=0.0, help="frames/s on the socket, 0 = as fast as possible")
+    parser.add_argument("--server-pid", type=int)
+    args = parser.parse_args()
+
+    image = open(args.image, "rb").read()
+    print_report(dict([
+        measure("multipart_post", lambda: run_post(args.url, image, args.frames), args.frames, args.server_pid),
+        measure("websocket", lambda: run_websocket(args.url, image, args.frames, args.ws_rate),
+                args.frames, args.server_pid),
+    ]))
+
+
+if __name__ == "__main__":
+    main()
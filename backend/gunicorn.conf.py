@@ -0,0 +1,42 @@
+import gc
+import os
+import sys
+
+# Multi-worker deployment that shares model weights between workers:
+#
+#   cd backend && WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py main:app
+#
+# Session state, live readings, evaluation jobs and monitor summaries are shared between
+# workers through SQLite, but in-flight work (micro-batches, websocket streams, the sandbox
+# pool) stays in the worker that accepted it. WEB_CONCURRENCY defaults to 1; when raising it,
+# keep data/ on a local filesystem (SQLite WAL doesn't work over network mounts).
+#
+# With preload_app the master imports main.py once; PRELOAD_MODELS makes that import load the
+# models, then each worker is forked from the master and shares the weight pages copy-on-write.
+# Set PRELOAD_MODELS=0 to get the old behaviour (every worker loads its own models).
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", "300"))
+preload_app = os.getenv("PRELOAD_MODELS", "1") == "1"
+os.environ["PRELOAD_MODELS"] = "1" if preload_app else "0"
+
+
+def pre_fork(server, worker):
+    # Everything allocated so far (models included) moves to a permanent generation the
+    # collector never scans, so a collection in a worker doesn't write to, and copy, shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    # SQLite connections must not be shared across fork()
+    from services.sqlite_db import reopen_all
+    reopen_all()
+    # Split the cores between workers instead of every worker starting one thread per core
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
@@ -1,12 +1,102 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from api import auth, face
-from api import live_monitor
+from api import live_monitor, interview, sessions, batch, code, reports
+from services.executor import PoolSaturated, pool_stats, shutdown_pools
+from services.model_registry import registry
+from services.question_bank import question_bank
+from services.frame_analysis import frame_batcher
+from services.evaluation_queue import evaluation_queue
+from services.interview_bot import evaluation_cache
+from services.face_index import face_index
+from services.code_sandbox import sandbox_pool, SandboxUnavailable
+from services.report_service import report_service
+from services.metrics import metrics, MetricsMiddleware
 
-app = FastAPI()
+# MODEL_MODE=stub swaps every model for a tiny local stand-in (offline benchmarks, development)
+MODEL_MODE = os.getenv("MODEL_MODE", "real")
+if MODEL_MODE == "stub":
+    from services.stub_models import install_stub_models
+    install_stub_models()
+
+# PRELOAD_MODELS=1 (set by gunicorn.conf.py together with preload_app) loads the models here, at
+# import time in the gunicorn master, so forked workers share the weights copy-on-write instead
+# of each loading its own copy. PRELOAD_MODEL_NAMES limits it to some models (comma-separated);
+# the rest still load per worker. Nothing runs inference in the master.
+if os.getenv("PRELOAD_MODELS", "0") == "1":
+    registry.warm_up([n for n in os.getenv("PRELOAD_MODEL_NAMES", "").split(",") if n] or None)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Models load on a background thread so the server accepts traffic (and liveness probes) immediately
+    if os.getenv("MODEL_WARMUP", "1") == "1":
+        registry.start_background_warm_up()
+    if os.getenv("QUESTION_BANK_PREFILL", "1") == "1":
+        question_bank.start()
+    if os.getenv("SANDBOX_PREFORK", "1") == "1":
+        try:
+            sandbox_pool.start()
+        except SandboxUnavailable as e:
+            # The API still serves everything else; /code/ answers 503
+            print(f"[Sandbox] disabled: {e}")
+    yield
+    sandbox_pool.shutdown()
+    shutdown_pools()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 app.include_router(auth.router)
 app.include_router(face.router)
 app.include_router(live_monitor.router)
+app.include_router(interview.router)
+app.include_router(sessions.router)
+app.include_router(batch.router)
+app.include_router(code.router)
+app.include_router(reports.router)
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(SandboxUnavailable)
+async def sandbox_unavailable_handler(request: Request, exc: SandboxUnavailable):
+    return JSONResponse(status_code=503, content={"detail": f"Code execution is unavailable: {exc}"})
+
+# Gauges are evaluated only when /metrics is scraped
+metrics.gauge_callback("model_load_seconds", "Model load time", ["model"],
+                       lambda: {(name,): s["load_seconds"] for name, s in registry.status().items()})
+metrics.gauge_callback("model_ready", "1 once the model is loaded", ["model"],
+                       lambda: {(name,): float(s["state"] == "ready") for name, s in registry.status().items()})
+metrics.gauge_callback("pool_pending", "Tasks queued or running per executor pool", ["pool"],
+                       lambda: {(name,): s["pending"] for name, s in pool_stats().items()})
+metrics.gauge_callback("pool_rejected", "Tasks rejected by a saturated pool", ["pool"],
+                       lambda: {(name,): s["rejected"] for name, s in pool_stats().items()})
+metrics.gauge_callback("batch_queue_depth", "Items waiting for a micro-batch", ["batcher"],
+                       lambda: {(b.name,): b.queue_depth() for b in (frame_batcher, evaluation_queue.batcher)})
+metrics.gauge_callback("evaluation_cache_lookups", "Evaluation cache lookups by outcome", ["outcome"],
+                       lambda: {(k,): v for k, v in evaluation_cache.stats().items()
+                                if k in ("hits", "disk_hits", "misses", "short_circuits")})
+metrics.gauge_callback("face_index_users", "Enrolled faces in the 1:N index", [],
+                       lambda: {(): len(face_index)})
+metrics.gauge_callback("sandbox_idle_workers", "Pre-forked code sandbox workers ready", [],
+                       lambda: {(): sandbox_pool.stats()["idle"]})
+metrics.gauge_callback("report_sessions", "Sessions in the report cohort table", [],
+                       lambda: {(): report_service.cohort.size})
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return metrics.render()
 
 @app.get("/health/")
 def health_check():
-    return {"status": "OK"}
+    return {"status": "OK", "mode": MODEL_MODE, "pid": os.getpid(), "ready": registry.ready(), "models": registry.status(), "pools": pool_stats()}
+
+@app.get("/health/ready/")
+def readiness_check():
+    ready = registry.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "loading", "models": registry.status()},
+    )
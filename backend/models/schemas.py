@@ -1,9 +1,13 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 class UserLogin(BaseModel):
     username: str
 
+class FaceEnrollmentRequest(BaseModel):
+    user_id: str
+    registered_image: str  # base64-encoded
+
 class FaceVerificationRequest(BaseModel):
     user_id: str
     registered_image: str  # base64-encoded
@@ -13,3 +17,93 @@ class FaceVerificationResponse(BaseModel):
     status: str
     confidence: Optional[float]
     message: Optional[str]
+
+class FaceMatch(BaseModel):
+    user_id: str
+    distance: float
+    match: bool
+
+class FaceIdentificationResponse(BaseModel):
+    matches: List[FaceMatch]
+    proxy_suspected: bool = False
+    message: Optional[str] = None
+
+class QuestionSet(BaseModel):
+    topic: str
+    difficulty: str
+    questions: List[str]
+
+class EvaluationRequest(BaseModel):
+    question: str
+    answer: str
+
+class EvaluationJobResponse(BaseModel):
+    job_id: str
+    status: str
+    score: Optional[int] = None
+    feedback: Optional[str] = None
+    error: Optional[str] = None
+
+class SessionCreateRequest(BaseModel):
+    user_id: str
+    topic: str = "Python"
+    count: int = 3
+    difficulty: str = "beginner"
+
+class AnswerRecord(BaseModel):
+    answer: str
+    q_index: int
+
+class LiveReading(BaseModel):
+    emotion: str
+    confidence: float
+    flags: List[str] = []
+    scores: Dict[str, float] = {}  # all emotion classes, percentages
+    face_count: int = 1
+
+class SessionStateResponse(BaseModel):
+    session_id: str
+    user_id: Optional[str]
+    topic: Optional[str]
+    questions: List[str]
+    q_index: int
+    scores: List[int]
+    feedbacks: List[str]
+    emotions: List[dict]
+    emotion_summaries: List[Optional[dict]]
+    flags: List[List[str]]
+    completed: bool
+    version: int
+
+class BatchJobRequest(BaseModel):
+    paths: List[str]  # relative to RECORDINGS_DIR: session folders, frame folders or video files
+    stride: int = 1
+    fps: float = 10.0
+    workers: Optional[int] = None
+
+class BatchJobResponse(BaseModel):
+    job_id: str
+    status: str
+    error: Optional[str] = None
+    output_dir: str
+    sources_done: int
+    sources_total: int
+    current: Optional[str] = None
+    frames: int
+    frames_resumed: int
+    seconds: float
+    fps: float
+    errors: List[str] = []
+
+class CodeSubmission(BaseModel):
+    problem_id: str
+    code: str
+    user_id: Optional[str] = None
+
+class CodeEvaluationResponse(BaseModel):
+    problem_id: str
+    passed: int
+    total: int
+    results: List[dict]
+    error: Optional[str] = None
+    duration_ms: Optional[float] = None
@@ -0,0 +1,445 @@
+import os
+import glob
+import json
+import time
+import uuid
+import queue
+import shutil
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from .emotion_analysis import EMOTION_LABELS
+from .sqlite_db import open_database
+
+# Offline re-analysis of recorded sessions. A source is a directory of frame images or a video
+# file; its frames are decoded on a prefetch thread into fixed-size chunks (a bounded queue, so
+# decoding never runs far ahead), chunks fan out over a spawned process pool whose workers load
+# the models once, and every finished chunk is written as its own NPZ shard. A rerun skips the
+# shards that exist, and once a source is complete the shards are merged into {source}.npz with
+# one column per field. Results keep the full emotion probabilities, so flagging thresholds can
+# be re-tuned without another pass.
+#
+# Jobs run on the gunicorn worker that accepted them (one at a time per worker). Their status
+# and progress are written to SQLite after every shard, so a poll or cancel served by any
+# worker sees them; a cancel for a job running elsewhere is a flag its worker reads at the next
+# shard.
+#
+#   BATCH_JOBS_PATH   SQLite file holding batch job status (data/batch_jobs.db)
+
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "data/recordings")
+BATCH_OUTPUT_DIR = os.getenv("BATCH_OUTPUT_DIR", "data/reanalysis")
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "64"))
+# Frames are downscaled before crossing the process boundary; detection works at 320px anyway
+BATCH_MAX_WIDTH = int(os.getenv("BATCH_MAX_WIDTH", "640"))
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".avi", ".mkv", ".mov")
+
+
+# ---------------- SOURCES ---------------- #
+
+def find_sources(paths):
+    # Video files, and directories that directly contain frame images; other directories are searched
+    sources = []
+    for path in paths:
+        if os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS):
+            sources.append(path)
+        elif os.path.isdir(path):
+            entries = sorted(os.listdir(path))
+            if any(e.lower().endswith(IMAGE_EXTENSIONS) for e in entries):
+                sources.append(path)
+            else:
+                sources.extend(find_sources([os.path.join(path, e) for e in entries]))
+    return sources
+
+
+def source_name(source):
+    name = os.path.splitext(os.path.normpath(source))[0] if os.path.isfile(source) else os.path.normpath(source)
+    return name.strip(os.sep).replace(os.sep, "__").replace(":", "")
+
+
+def _fit(frame, max_width=BATCH_MAX_WIDTH):
+    height, width = frame.shape[:2]
+    if width <= max_width:
+        return frame
+    return cv2.resize(frame, (max_width, int(height * max_width / width)), interpolation=cv2.INTER_AREA)
+
+
+def iter_chunks(source, chunk_size, stride=1, fps=10.0, done=frozenset()):
+    # Yields (start, frame_indices, timestamps, frames); chunks in `done` are skipped without decoding
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, "*")) if p.lower().endswith(IMAGE_EXTENSIONS))
+        indices = list(range(0, len(paths), stride))
+        for start in range(0, len(indices), chunk_size):
+            if start in done:
+                continue
+            chunk = indices[start:start + chunk_size]
+            frames = [cv2.imread(paths[i], cv2.IMREAD_COLOR) for i in chunk]
+            kept = [(i, f) for i, f in zip(chunk, frames) if f is not None]
+            yield (start, [i for i, _ in kept], [i / fps for i, _ in kept], [_fit(f) for _, f in kept])
+        return
+
+    capture = cv2.VideoCapture(source)
+    video_fps = capture.get(cv2.CAP_PROP_FPS) or fps
+    try:
+        position, start = 0, 0
+        while True:
+            chunk_indices, timestamps, frames = [], [], []
+            skip = start in done
+            while len(chunk_indices) < chunk_size:
+                # grab() only demuxes; frames that are skipped or strided over are never decoded
+                if not capture.grab():
+                    break
+                if position % stride == 0:
+                    chunk_indices.append(position)
+                    timestamps.append(position / video_fps)
+                    if not skip:
+                        ok, frame = capture.retrieve()
+                        frames.append(_fit(frame) if ok else None)
+                position += 1
+            if not chunk_indices:
+                return
+            if not skip:
+                kept = [k for k, f in enumerate(frames) if f is not None]
+                yield (start, [chunk_indices[k] for k in kept], [timestamps[k] for k in kept],
+                       [frames[k] for k in kept])
+            start += chunk_size
+    finally:
+        capture.release()
+
+
+def prefetch(iterable, depth):
+    # Runs the generator on a thread, at most `depth` items ahead of the consumer. When the
+    # consumer stops early (a cancelled job), the thread is told to stop, closes the generator
+    # (releasing its capture) and is joined
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    end = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fill():
+        try:
+            for item in iterable:
+                if not put(item):
+                    break
+        except Exception as e:
+            put(e)
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+        put(end)
+
+    thread = threading.Thread(target=fill, name="batch-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is end:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+# ---------------- WORKERS ---------------- #
+
+def _init_worker():
+    # Runs once per pool process: models are loaded here, not per chunk
+    cv2.setNumThreads(1)
+    from .model_registry import registry
+    if os.getenv("MODEL_MODE", "real") == "stub":
+        from .stub_models import install_stub_models
+        install_stub_models()
+    registry.warm_up(["emotion_classifier"])
+
+
+def _analyze_chunk(frames):
+    from .frame_analysis import analyze_frames
+    results = analyze_frames(frames)
+    probs = np.zeros((len(results), len(EMOTION_LABELS)), dtype=np.float32)
+    boxes = np.full((len(results), 4), -1, dtype=np.int32)
+    for i, result in enumerate(results):
+        scores = result["emotion"]["scores"] if result["emotion"] else {}
+        probs[i] = [scores.get(label, 0.0) for label in EMOTION_LABELS]
+        if result["faces"]:
+            boxes[i] = result["faces"][0]["box"]
+    return {
+        "face_count": np.array([r["face_count"] for r in results], dtype=np.uint8),
+        "probs": probs,
+        "primary_box": boxes,
+    }
+
+
+# ---------------- RUNNER ---------------- #
+
+class BatchRunner:
+    def __init__(self, output_dir=BATCH_OUTPUT_DIR, workers=BATCH_WORKERS, chunk_size=BATCH_CHUNK_SIZE,
+                 stride=1, fps=10.0, prefetch_depth=None):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.stride = stride
+        self.fps = fps
+        self.prefetch_depth = prefetch_depth or workers * 2
+        self.frames_done = 0
+        self.frames_resumed = 0
+        self.sources_done = 0
+        self.sources_total = 0
+        self.current = None
+        self.started = None
+        self.errors = []
+        self.cancelled = threading.Event()
+        # Called after every shard and source, on the job's thread
+        self.on_progress = None
+
+    def progress(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return {
+            "sources_done": self.sources_done,
+            "sources_total": self.sources_total,
+            "current": self.current,
+            "frames": self.frames_done,
+            "frames_resumed": self.frames_resumed,
+            "seconds": round(elapsed, 1),
+            "fps": round(self.frames_done / elapsed, 1) if elapsed else 0.0,
+            "errors": self.errors[-10:],
+        }
+
+    def run(self, paths):
+        sources = find_sources(paths)
+        self.sources_total = len(sources)
+        self.started = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker) as pool:
+            for source in sources:
+                if self.cancelled.is_set():
+                    break
+                self.current = source
+                try:
+                    self._run_source(pool, source)
+                except Exception as e:
+                    self.errors.append(f"{source}: {e}")
+                self.sources_done += 1
+                self._report()
+        self.current = None
+        return self.progress()
+
+    def _run_source(self, pool, source):
+        name = source_name(source)
+        final_path = os.path.join(self.output_dir, f"{name}.npz")
+        if os.path.exists(final_path):
+            return
+        parts_dir = os.path.join(self.output_dir, f"{name}.parts")
+        os.makedirs(parts_dir, exist_ok=True)
+        chunk_size, stride = self._settings(parts_dir)
+        done = set(self._shards(parts_dir))
+        self.frames_resumed += sum(int(np.load(os.path.join(parts_dir, f"{s:08d}.npz"))["frame_index"].size)
+                                   for s in done)
+
+        in_flight = deque()
+        chunks = prefetch(iter_chunks(source, chunk_size, stride, self.fps, done), self.prefetch_depth)
+        try:
+            for start, indices, timestamps, frames in chunks:
+                if self.cancelled.is_set():
+                    break
+                in_flight.append((start, indices, timestamps, pool.submit(_analyze_chunk, frames)))
+                if len(in_flight) >= self.workers * 2:
+                    self._write_shard(parts_dir, *in_flight.popleft())
+        finally:
+            # Stops and joins the prefetch thread when the loop ends early (a cancelled job)
+            chunks.close()
+        while in_flight:
+            self._write_shard(parts_dir, *in_flight.popleft())
+        if not self.cancelled.is_set():
+            self._merge(parts_dir, final_path, stride)
+
+    def _settings(self, parts_dir):
+        # The first run's chunking is kept so shard boundaries line up on resume
+        meta_path = os.path.join(parts_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            return meta["chunk_size"], meta["stride"]
+        with open(meta_path, "w") as f:
+            json.dump({"chunk_size": self.chunk_size, "stride": self.stride}, f)
+        return self.chunk_size, self.stride
+
+    @staticmethod
+    def _shards(parts_dir):
+        # Chunk starts with a finished shard; half-written .tmp.npz files don't count
+        names = (os.path.basename(p)[:-len(".npz")] for p in glob.glob(os.path.join(parts_dir, "*.npz")))
+        return [int(name) for name in names if name.isdigit()]
+
+    def _write_shard(self, parts_dir, start, indices, timestamps, future):
+        columns = future.result()
+        tmp_path = os.path.join(parts_dir, f"{start:08d}.tmp.npz")
+        np.savez(tmp_path, frame_index=np.asarray(indices, dtype=np.int64),
+                 timestamp=np.asarray(timestamps, dtype=np.float64), **columns)
+        os.replace(tmp_path, os.path.join(parts_dir, f"{start:08d}.npz"))
+        self.frames_done += len(indices)
+        self._report()
+
+    def _report(self):
+        if self.on_progress is not None:
+            self.on_progress()
+
+    def _merge(self, parts_dir, final_path, stride):
+        loaded = [np.load(os.path.join(parts_dir, f"{start:08d}.npz")) for start in sorted(self._shards(parts_dir))]
+        columns = {key: np.concatenate([shard[key] for shard in loaded]) for key in loaded[0].files} if loaded else {}
+        probs = columns.get("probs", np.zeros((0, len(EMOTION_LABELS)), dtype=np.float32))
+        face_count = columns.get("face_count", np.zeros(0, dtype=np.uint8))
+        tmp_path = final_path[:-len(".npz")] + ".tmp.npz"
+        np.savez(tmp_path, **columns,
+                 emotion=probs.argmax(axis=1).astype(np.uint8) if len(probs) else np.zeros(0, dtype=np.uint8),
+                 confidence=probs.max(axis=1) if len(probs) else np.zeros(0, dtype=np.float32),
+                 multiple_faces=face_count > 1, no_face=face_count == 0,
+                 labels=np.array(EMOTION_LABELS), stride=np.int64(stride))
+        os.replace(tmp_path, final_path)
+        shutil.rmtree(parts_dir)
+
+
+# ---------------- JOBS ---------------- #
+
+class BatchJob:
+    def __init__(self, paths, runner):
+        self.job_id = uuid.uuid4().hex
+        self.paths = paths
+        self.runner = runner
+        self.status = "queued"
+        self.error = None
+        self.created_at = time.time()
+
+    def to_dict(self):
+        return {"job_id": self.job_id, "status": self.status, "error": self.error,
+                "output_dir": self.runner.output_dir, **self.runner.progress()}
+
+
+class BatchJobs:
+    # One job runs at a time (each already uses every worker); later ones wait their turn
+    def __init__(self, path):
+        # Jobs accepted by this worker; others are only known through the table
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.db = open_database(
+            path,
+            "CREATE TABLE IF NOT EXISTS batch_jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0, payload TEXT NOT NULL)",
+        )
+
+    def _save(self, job):
+        # Keeps a cancel requested by another worker
+        self.db.execute(
+            "INSERT INTO batch_jobs (job_id, status, payload) VALUES (?, ?, ?) ON CONFLICT (job_id) "
+            "DO UPDATE SET status = excluded.status, payload = excluded.payload",
+            (job.job_id, job.status, json.dumps(job.to_dict()))
+        )
+
+    def _load(self, job_id):
+        row = self.db.query_one("SELECT status, payload FROM batch_jobs WHERE job_id = ?", (job_id,))
+        return dict(json.loads(row[1]), status=row[0]) if row else None
+
+    def _cancel_requested(self, job):
+        row = self.db.query_one("SELECT cancel_requested FROM batch_jobs WHERE job_id = ?", (job.job_id,))
+        return bool(row and row[0])
+
+    def submit(self, paths, **runner_options):
+        job = BatchJob(paths, BatchRunner(**runner_options))
+        job.runner.on_progress = lambda: self._progress(job)
+        self._jobs[job.job_id] = job
+        self._save(job)
+        self._queue.put(job)
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="batch-jobs", daemon=True)
+                self._worker.start()
+        return job.to_dict()
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job is not None else self._load(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            # Accepted by another worker, which sees the flag at its next shard
+            self.db.execute("UPDATE batch_jobs SET cancel_requested = 1, status = CASE status WHEN 'queued' "
+                            "THEN 'cancelled' ELSE status END WHERE job_id = ? AND status IN ('queued', 'running')",
+                            (job_id,))
+            return self._load(job_id)
+        if job.status in ("queued", "running"):
+            job.runner.cancelled.set()
+            job.status = "cancelled" if job.status == "queued" else job.status
+            self._save(job)
+        return job.to_dict()
+
+    def _progress(self, job):
+        if self._cancel_requested(job):
+            job.runner.cancelled.set()
+        self._save(job)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job.runner.cancelled.is_set() or self._cancel_requested(job):
+                job.status = "cancelled"
+                self._save(job)
+                continue
+            job.status = "running"
+            self._save(job)
+            try:
+                job.runner.run(job.paths)
+                job.status = "cancelled" if job.runner.cancelled.is_set() else "done"
+            except Exception as e:
+                job.status, job.error = "failed", str(e)
+            self._save(job)
+
+
+batch_jobs = BatchJobs(os.getenv("BATCH_JOBS_PATH", "data/batch_jobs.db"))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Re-run frame analysis over recorded sessions")
+    parser.add_argument("paths", nargs="+", help="video files or frame directories (searched recursively)")
+    parser.add_argument("--out", default=BATCH_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--chunk", type=int, default=BATCH_CHUNK_SIZE)
+    parser.add_argument("--stride", type=int, default=1, help="analyze every n-th frame")
+    parser.add_argument("--fps", type=float, default=10.0, help="capture rate of frame directories")
+    args = parser.parse_args()
+
+    runner = BatchRunner(args.out, args.workers, args.chunk, args.stride, args.fps)
+    reporter_done = threading.Event()
+
+    def report():
+        while not reporter_done.wait(10):
+            p = runner.progress()
+            print(f"[batch] {p['sources_done']}/{p['sources_total']} sources, {p['frames']} frames, {p['fps']} fps")
+
+    threading.Thread(target=report, daemon=True).start()
+    try:
+        summary = runner.run(args.paths)
+    except KeyboardInterrupt:
+        runner.cancelled.set()
+        summary = runner.progress()
+        print("[batch] interrupted; rerun the same command to resume")
+    reporter_done.set()
+    print(json.dumps(summary, indent=2))
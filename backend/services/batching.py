@@ -0,0 +1,139 @@
+import asyncio
+import time
+import threading
+from collections import Counter, deque
+import numpy as np
+from .executor import PoolSaturated, inference_pool
+from .metrics import BATCH_SIZE, QUEUE_WAIT_SECONDS, record_error
+
+# Dynamic micro-batching: callers await submit(item), a single consumer task groups pending
+# items into batches bounded by max_batch_size and max_wait_ms and runs process_batch(items)
+# once per batch on the given BoundedPool. process_batch must return one result per item.
+# submit() raises PoolSaturated once max_queue items are waiting.
+
+
+class BatcherMetrics:
+    def __init__(self, window=1024):
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.batch_sizes = Counter()
+        self.queue_wait_ms = deque(maxlen=window)
+        self.batch_ms = deque(maxlen=window)
+        self._completed = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, size, waits_ms, batch_ms):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.batch_sizes[size] += 1
+            self.queue_wait_ms.extend(waits_ms)
+            self.batch_ms.append(batch_ms)
+            self._completed.append((time.monotonic(), size))
+
+    def snapshot(self, queue_depth=0):
+        with self._lock:
+            waits = np.asarray(self.queue_wait_ms, dtype=np.float64)
+            durations = np.asarray(self.batch_ms, dtype=np.float64)
+            completed = list(self._completed)
+            sizes = dict(sorted(self.batch_sizes.items()))
+        throughput = 0.0
+        if len(completed) > 1:
+            span = completed[-1][0] - completed[0][0]
+            if span > 0:
+                throughput = sum(n for _, n in completed[1:]) / span
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "queue_depth": queue_depth,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": sizes,
+            "queue_wait_p50_ms": round(float(np.percentile(waits, 50)), 3) if waits.size else 0.0,
+            "queue_wait_p99_ms": round(float(np.percentile(waits, 99)), 3) if waits.size else 0.0,
+            "batch_p50_ms": round(float(np.percentile(durations, 50)), 3) if durations.size else 0.0,
+            "throughput_per_s": round(throughput, 2),
+        }
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size=16, max_wait_ms=20, max_queue=256,
+                 pool=inference_pool, name="batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.pool = pool
+        self.name = name
+        self.metrics = BatcherMetrics()
+        self._queue = None
+        self._worker = None
+
+    async def submit(self, item):
+        self._ensure_worker()
+        if self.saturated():
+            raise PoolSaturated(self.name, self._queue.qsize())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    def saturated(self):
+        return self._queue is not None and self._queue.qsize() >= self.max_queue
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self):
+        return self.metrics.snapshot(self.queue_depth())
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run(), name=self.name)
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _execute(self, items):
+        # Batches are already admitted, so wait for a pool slot instead of failing them
+        while True:
+            try:
+                return await self.pool.run(self.process_batch, items)
+            except PoolSaturated:
+                await asyncio.sleep(self.max_wait or 0.005)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            waits_ms = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+            items = [item for item, _, _ in batch]
+            try:
+                results = await self._execute(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name}: expected {len(items)} results, got {len(results)}")
+            except Exception as e:
+                self.metrics.errors += 1
+                record_error(self.name, e)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.metrics.record(len(items), waits_ms, (time.perf_counter() - started) * 1000)
+            BATCH_SIZE.observe(len(items), batcher=self.name)
+            for wait_ms in waits_ms:
+                QUEUE_WAIT_SECONDS.observe(wait_ms / 1000, batcher=self.name)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,24 @@
+import os
+import json
+
+# Coding problems for the Code Evaluation page. Tests marked "hidden" are never sent to the
+# client, and the sandbox doesn't echo their return values either.
+
+CODE_PROBLEMS_PATH = os.getenv("CODE_PROBLEMS_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "code_problems.json"))
+
+with open(CODE_PROBLEMS_PATH, encoding="utf-8") as f:
+    PROBLEMS = json.load(f)
+
+
+def public_problem(problem_id):
+    problem = PROBLEMS[problem_id]
+    return {
+        "problem_id": problem_id,
+        "title": problem["title"],
+        "entry_point": problem["entry_point"],
+        "prompt": problem["prompt"],
+        "starter": problem.get("starter", ""),
+        "examples": [{"index": i, "args": t["args"], "expected": t["expected"]}
+                     for i, t in enumerate(problem["tests"]) if not t.get("hidden")],
+        "test_count": len(problem["tests"]),
+    }
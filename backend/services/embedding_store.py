@@ -0,0 +1,122 @@
+import os
+import re
+import glob
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Registered-face embeddings keyed by (user_id, sha256 of the registered image).
+# Hot entries live in an in-process LRU, every entry is also persisted as a raw
+# float32 vector under user_data/{user_id}/ so restarts don't re-embed. Which embedding is
+# the user's enrolled one is recorded in a pointer file next to them (not in memory), so every
+# gunicorn worker sees a re-enrollment as soon as it is written; only enrollment moves it, an
+# image that was only verified against is cached but never becomes the reference. A user_id
+# outside [A-Za-z0-9_-] is stored under a hash of it, so no id can leave the store's root.
+
+SAFE_USER_ID = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def image_digest(data: bytes):
+    return hashlib.sha256(data).hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, root="user_data", capacity=1024, namespace=""):
+        self.root = root
+        self.namespace = namespace
+        self.capacity = capacity
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _user_dir(self, user_id):
+        user_id = str(user_id)
+        if not SAFE_USER_ID.fullmatch(user_id):
+            # "@" is outside the safe set, so a hashed id never collides with a literal one
+            user_id = "@" + hashlib.sha256(user_id.encode()).hexdigest()
+        return os.path.join(self.root, user_id, self.namespace)
+
+    def _path(self, user_id, digest):
+        return os.path.join(self._user_dir(user_id), f"embedding_{digest[:32]}.f32")
+
+    def _latest_path(self, user_id):
+        return os.path.join(self._user_dir(user_id), "latest_embedding")
+
+    def _write_atomic(self, path, write):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def get(self, user_id, digest):
+        key = (user_id, digest)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        path = self._path(user_id, digest)
+        if not os.path.exists(path):
+            return None
+        vector = np.fromfile(path, dtype=np.float32)
+        self._remember(key, vector)
+        return vector
+
+    def latest(self, user_id):
+        # Most recently enrolled embedding for a user, used when a request only carries the live capture
+        try:
+            with open(self._latest_path(user_id)) as f:
+                digest = f.read().strip()
+        except FileNotFoundError:
+            digest = None
+        if digest:
+            vector = self.get(user_id, digest)
+            if vector is not None:
+                return vector
+
+        # Enrolled before pointer files existed: the newest embedding becomes the pointer, so
+        # images verified from now on can't take its place
+        paths = glob.glob(os.path.join(self._user_dir(user_id), "embedding_*.f32"))
+        if not paths:
+            return None
+        path = max(paths, key=os.path.getmtime)
+        digest = os.path.basename(path)[len("embedding_"):-len(".f32")]
+        self.set_latest(user_id, digest)
+        return self.get(user_id, digest)
+
+    def put(self, user_id, digest, vector):
+        vector = np.ascontiguousarray(vector, dtype=np.float32).ravel()
+        path = self._path(user_id, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_atomic(path, vector.tofile)
+        self._remember((user_id, digest), vector)
+        return vector
+
+    def set_latest(self, user_id, digest):
+        # Called on enrollment only
+        def write_digest(tmp_path):
+            with open(tmp_path, "w") as f:
+                f.write(digest)
+        self._write_atomic(self._latest_path(user_id), write_digest)
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+
+
+def cosine_distance(a, b):
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    if denom == 0:
+        return 1.0
+    return float(1.0 - np.dot(a, b) / denom)
+
+
+# Embeddings from different inference backends (or the stub models) aren't comparable, so each
+# keeps its own files
+_backend = "stub" if os.getenv("MODEL_MODE", "real") == "stub" else os.getenv("INFERENCE_BACKEND", "default")
+embedding_store = EmbeddingStore(capacity=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+                                 namespace="" if _backend == "default" else _backend)
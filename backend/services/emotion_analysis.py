@@ -1,9 +1,57 @@
-from deepface import DeepFace
+import cv2
 import numpy as np
+from .model_registry import registry, build_deepface_model
+from .inference_backends import load_keras
+from .metrics import timed
+
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+def _load_emotion_model():
+    from deepface import DeepFace
+    build_deepface_model("Emotion", "facial_attribute")
+    return DeepFace
+
+def _load_emotion_classifier():
+    # The bare network behind DeepFace's Emotion client (Keras or ONNX, per INFERENCE_BACKEND),
+    # so whole batches go through one call
+    return load_keras("emotion")
+
+# Only the frontend's legacy analyze_emotion() uses the full DeepFace client; the backend serves
+# emotions through emotion_classifier
+registry.register("emotion", _load_emotion_model, lazy=True)
+registry.register("emotion_classifier", _load_emotion_classifier)
+
+def preprocess_faces(faces):
+    batch = np.empty((len(faces), 48, 48, 1), dtype=np.float32)
+    for i, face in enumerate(faces):
+        gray = face if face.ndim == 2 else cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+        batch[i, :, :, 0] = cv2.resize(gray, (48, 48), interpolation=cv2.INTER_AREA)
+    batch /= 255.0
+    return batch
+
+def classify_emotions(faces):
+    # Returns an (N, 7) array of percentages in EMOTION_LABELS order
+    if len(faces) == 0:
+        return np.zeros((0, len(EMOTION_LABELS)), dtype=np.float32)
+    classifier = registry.get("emotion_classifier")
+    batch = preprocess_faces(faces)
+    with timed("classify"):
+        predictions = np.asarray(classifier.predict_on_batch(batch))
+    totals = predictions.sum(axis=1, keepdims=True)
+    totals[totals == 0] = 1.0
+    return (100.0 * predictions / totals).astype(np.float32)
+
+def emotion_summary(probs):
+    dominant = int(np.argmax(probs))
+    return {
+        "emotion": EMOTION_LABELS[dominant],
+        "confidence": float(probs[dominant]),
+        "scores": {label: round(float(p), 3) for label, p in zip(EMOTION_LABELS, probs)},
+    }
 
 def analyze_emotion(frame: np.ndarray):
     try:
-        result = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
+        result = registry.get("emotion").analyze(frame, actions=['emotion'], enforce_detection=False)
         dominant = result[0]['dominant_emotion']
         confidence = result[0]['emotion'][dominant]
         return {
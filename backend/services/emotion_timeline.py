@@ -0,0 +1,110 @@
+import struct
+import numpy as np
+from .emotion_analysis import EMOTION_LABELS
+
+# Every analyzed frame of a session as one row of a per-session ring in the session store
+# (shared by all gunicorn workers, since consecutive readings of one session land on
+# different workers):
+#
+#   slot        INTEGER                    frame number modulo EMOTION_TIMELINE_CAPACITY
+#   ts          REAL                       8 bytes
+#   probs       BLOB, float32 x 7         28 bytes  (all DeepFace emotion classes, percentages)
+#   face_count  INTEGER                    1 byte
+#
+# 37 bytes of frame data per row (plus SQLite's row overhead). A new frame overwrites the
+# slot of the frame CAPACITY frames before it, so a session never holds more than CAPACITY
+# rows however long a question runs. The open question's aggregate (mean, max, dwell time
+# per dominant emotion, face stats) is a single row too, updated with O(1) work on every
+# frame and read back when the answer is recorded; ring overwrites don't affect it.
+
+N_EMOTIONS = len(EMOTION_LABELS)
+FRAME_BYTES = 8 + 4 * N_EMOTIONS + 1
+MAX_GAP_SECONDS = 5.0
+
+# frames, max_face_count, multi_face_frames, no_face_frames, last_dominant, first_ts, last_ts
+_HEADER = struct.Struct("<qqqqqdd")
+
+
+class QuestionAggregate:
+    def __init__(self, max_gap=MAX_GAP_SECONDS):
+        self.max_gap = max_gap
+        self.frames = 0
+        self.sum = np.zeros(N_EMOTIONS, dtype=np.float64)
+        self.max = np.zeros(N_EMOTIONS, dtype=np.float32)
+        self.dwell = np.zeros(N_EMOTIONS, dtype=np.float64)
+        self.max_face_count = 0
+        self.multi_face_frames = 0
+        self.no_face_frames = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.last_dominant = None
+
+    def add(self, ts, probs, face_count):
+        if self.last_ts is not None:
+            # Time since the previous frame is credited to the emotion that was showing
+            self.dwell[self.last_dominant] += min(max(ts - self.last_ts, 0.0), self.max_gap)
+        else:
+            self.first_ts = ts
+        self.frames += 1
+        self.sum += probs
+        np.maximum(self.max, probs, out=self.max)
+        self.max_face_count = max(self.max_face_count, face_count)
+        self.multi_face_frames += face_count > 1
+        self.no_face_frames += face_count == 0
+        self.last_ts = ts
+        self.last_dominant = int(np.argmax(probs))
+
+    def summary(self):
+        if self.frames == 0:
+            return {"frames": 0, "dominant": "unknown"}
+        mean = self.sum / self.frames
+        dominant = int(np.argmax(self.dwell)) if self.dwell.any() else int(np.argmax(mean))
+        return {
+            "frames": self.frames,
+            "duration_s": round(self.last_ts - self.first_ts, 3),
+            "dominant": EMOTION_LABELS[dominant],
+            "mean": {label: round(float(v), 3) for label, v in zip(EMOTION_LABELS, mean)},
+            "max": {label: round(float(v), 3) for label, v in zip(EMOTION_LABELS, self.max)},
+            "dwell_s": {label: round(float(v), 3) for label, v in zip(EMOTION_LABELS, self.dwell)},
+            "max_face_count": self.max_face_count,
+            "multi_face_frames": int(self.multi_face_frames),
+            "no_face_frames": int(self.no_face_frames),
+        }
+
+    def to_bytes(self):
+        header = _HEADER.pack(self.frames, self.max_face_count, int(self.multi_face_frames),
+                              int(self.no_face_frames), -1 if self.last_dominant is None else self.last_dominant,
+                              self.first_ts or 0.0, self.last_ts or 0.0)
+        return header + self.sum.tobytes() + self.max.tobytes() + self.dwell.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, max_gap=MAX_GAP_SECONDS):
+        aggregate = cls(max_gap)
+        (aggregate.frames, aggregate.max_face_count, aggregate.multi_face_frames, aggregate.no_face_frames,
+         last_dominant, first_ts, last_ts) = _HEADER.unpack_from(data)
+        if aggregate.frames:
+            aggregate.last_dominant, aggregate.first_ts, aggregate.last_ts = last_dominant, first_ts, last_ts
+        offset = _HEADER.size
+        aggregate.sum = np.frombuffer(data, np.float64, N_EMOTIONS, offset).copy()
+        offset += aggregate.sum.nbytes
+        aggregate.max = np.frombuffer(data, np.float32, N_EMOTIONS, offset).copy()
+        offset += aggregate.max.nbytes
+        aggregate.dwell = np.frombuffer(data, np.float64, N_EMOTIONS, offset).copy()
+        return aggregate
+
+
+def frame_columns(rows):
+    # rows: (ts, probs blob, face_count) in chronological order
+    if not rows:
+        return {"ts": np.zeros(0), "probs": np.zeros((0, N_EMOTIONS), dtype=np.float32),
+                "face_count": np.zeros(0, dtype=np.uint8)}
+    ts, blobs, face_count = zip(*rows)
+    return {
+        "ts": np.asarray(ts, dtype=np.float64),
+        "probs": np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(rows), N_EMOTIONS),
+        "face_count": np.minimum(np.asarray(face_count), 255).astype(np.uint8),
+    }
+
+
+def probs_from_scores(scores):
+    return np.fromiter((scores.get(label, 0.0) for label in EMOTION_LABELS), dtype=np.float32, count=N_EMOTIONS)
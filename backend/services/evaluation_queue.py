@@ -0,0 +1,178 @@
+import os
+import time
+import uuid
+import asyncio
+from functools import partial
+from .sqlite_db import open_database
+from .batching import MicroBatcher
+from .executor import PoolSaturated, inference_pool
+from .interview_bot import cached_evaluation, evaluate_answers, evaluation_cache, parse_score
+
+# Answer evaluation as jobs: submit() returns a job id immediately, submissions arriving
+# together are coalesced by a MicroBatcher into padded text2text-generation batches, and
+# callers long-poll wait() for the scored result. Job status is written to SQLite so a poll
+# that lands on another gunicorn worker still finds the job; that worker polls the row until
+# the job finishes or the wait runs out. Every SQLite write (and the cache lookup, which may
+# read SQLite) runs on the inference pool, never on the event loop; a job is marked running
+# when the batcher hands its batch to a pool thread, not when it is queued.
+#
+#   EVAL_JOBS_PATH      SQLite file holding job status (data/evaluation_jobs.db)
+#   EVAL_JOBS_POLL_MS   how often a job submitted to another worker is re-read while waiting (250)
+
+EVAL_BATCH_SIZE = int(os.getenv("EVAL_BATCH_SIZE", "8"))
+
+
+class EvaluationJob:
+    def __init__(self, question, answer):
+        self.job_id = uuid.uuid4().hex
+        self.question = question
+        self.answer = answer
+        self.status = "queued"
+        self.feedback = None
+        self.score = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    @classmethod
+    def from_row(cls, row):
+        job = cls.__new__(cls)
+        (job.job_id, job.status, job.feedback, job.score, job.error, job.created_at, job.finished_at) = row
+        job.question = job.answer = job.done = None
+        return job
+
+    def to_row(self):
+        return (self.job_id, self.status, self.feedback, self.score, self.error, self.created_at, self.finished_at)
+
+    def to_dict(self):
+        return {"job_id": self.job_id, "status": self.status, "score": self.score,
+                "feedback": self.feedback, "error": self.error}
+
+
+class EvaluationQueue:
+    def __init__(self, path, max_batch_size=EVAL_BATCH_SIZE, max_wait_ms=50, max_queue=512, job_ttl=3600,
+                 poll_ms=250):
+        self.batcher = MicroBatcher(self._evaluate_batch, max_batch_size=max_batch_size,
+                                    max_wait_ms=max_wait_ms, max_queue=max_queue, name="eval-batcher")
+        self.job_ttl = job_ttl
+        self.poll_interval = poll_ms / 1000
+        # Jobs submitted to this worker; others are only known through the table
+        self._jobs = {}
+        self._tasks = set()
+        self.db = open_database(
+            path,
+            "CREATE TABLE IF NOT EXISTS evaluation_jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, feedback TEXT, score REAL, error TEXT, "
+            "created_at REAL NOT NULL, finished_at REAL)",
+        )
+
+    def _save(self, *jobs):
+        with self.db.transaction():
+            for job in jobs:
+                self.db.execute("INSERT OR REPLACE INTO evaluation_jobs VALUES (?, ?, ?, ?, ?, ?, ?)", job.to_row())
+
+    def _load(self, job_id):
+        row = self.db.query_one("SELECT job_id, status, feedback, score, error, created_at, finished_at "
+                                "FROM evaluation_jobs WHERE job_id = ?", (job_id,))
+        return EvaluationJob.from_row(row) if row else None
+
+    async def submit(self, question, answer):
+        self._expire()
+        if self.batcher.saturated():
+            raise PoolSaturated(self.batcher.name, self.batcher.max_queue)
+        job = EvaluationJob(question, answer)
+        await inference_pool.run(self._admit, job)
+        self._jobs[job.job_id] = job
+        if job.status == "done":
+            job.done.set()
+            return job
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _admit(self, job):
+        cutoff = time.time() - self.job_ttl
+        self.db.execute("DELETE FROM evaluation_jobs WHERE finished_at < ?", (cutoff,))
+        feedback = cached_evaluation(job.question, job.answer)
+        if feedback is not None:
+            self._finish(job, feedback=feedback)
+        self._save(job)
+
+    def _finish(self, job, feedback=None, error=None):
+        if error is None:
+            job.feedback = feedback
+            job.score = parse_score(feedback)
+            job.status = "done"
+        else:
+            job.error = error
+            job.status = "failed"
+        job.finished_at = time.time()
+
+    def _evaluate_batch(self, jobs):
+        # On a pool thread, once the batcher has taken the batch: only now are its jobs running.
+        # Every job already missed the cache in submit()
+        for job in jobs:
+            job.status = "running"
+        self._save(*jobs)
+        try:
+            feedbacks = evaluate_answers([(job.question, job.answer) for job in jobs],
+                                         batch_size=EVAL_BATCH_SIZE, lookup=False)
+        except Exception as e:
+            for job in jobs:
+                self._finish(job, error=str(e))
+            self._save(*jobs)
+            raise
+        for job, feedback in zip(jobs, feedbacks):
+            self._finish(job, feedback=feedback)
+        self._save(*jobs)
+        return jobs
+
+    async def _run(self, job):
+        try:
+            await self.batcher.submit(job)
+        except Exception as e:
+            if job.finished_at is None:
+                # Failed before reaching a pool thread (the batcher's queue was full). Already
+                # admitted, so the write skips the pool's admission check
+                self._finish(job, error=str(e))
+                await asyncio.get_running_loop().run_in_executor(inference_pool.executor, partial(self._save, job))
+        finally:
+            job.done.set()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id) or self._load(job_id)
+
+    async def wait(self, job_id, timeout):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return job
+        # Submitted to another worker: re-read its row until it finishes
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await inference_pool.run(self._load, job_id)
+            if job is None or job.status in ("done", "failed") or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0.0)))
+
+    def _expire(self):
+        # This worker's jobs; _admit expires the table's rows
+        cutoff = time.time() - self.job_ttl
+        for job_id in [j for j, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        return {"jobs": len(self._jobs), "batching": self.batcher.stats(), "cache": evaluation_cache.stats()}
+
+
+evaluation_queue = EvaluationQueue(
+    os.getenv("EVAL_JOBS_PATH", "data/evaluation_jobs.db"),
+    max_wait_ms=float(os.getenv("EVAL_BATCH_WAIT_MS", "50")),
+    max_queue=int(os.getenv("EVAL_MAX_QUEUE", "512")),
+    poll_ms=float(os.getenv("EVAL_JOBS_POLL_MS", "250")),
+)
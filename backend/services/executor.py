@@ -0,0 +1,118 @@
+import os
+import asyncio
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Bounded pools for CPU-heavy work so model calls never run on the event loop and never
+# queue without limit. Once max_pending calls are in flight or queued, run() raises
+# PoolSaturated and the app answers 503 instead of letting /health/ and /login/ starve.
+#
+#   INFERENCE_THREADS / INFERENCE_MAX_PENDING  thread pool for model inference (TF/torch release the GIL)
+#   CPU_PROCESSES / CPU_MAX_PENDING            process pool for picklable CPU-bound work (0 disables it)
+#   FACE_VERIFY_POOL                           "inference" (default) or "cpu"
+
+
+class PoolSaturated(Exception):
+    def __init__(self, pool_name, pending):
+        super().__init__(f"{pool_name} pool saturated ({pending} pending)")
+        self.pool_name = pool_name
+        self.pending = pending
+
+
+class BoundedPool:
+    def __init__(self, name, make_executor, max_pending):
+        self.name = name
+        self.max_pending = max_pending
+        self._make_executor = make_executor
+        self._executor = None
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._make_executor()
+            return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PoolSaturated(self.name, self._pending)
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        self._acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, partial(fn, *args, **kwargs))
+        finally:
+            self._release()
+
+    def reserve(self):
+        # Counts work the caller runs itself (a streamed generation) against max_pending; the
+        # returned release() may be called more than once
+        self._acquire()
+        released = threading.Event()
+
+        def release():
+            with self._lock:
+                if released.is_set():
+                    return
+                released.set()
+                self._pending -= 1
+        return release
+
+    def stats(self):
+        return {"pending": self._pending, "max_pending": self.max_pending, "rejected": self._rejected}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def _cpu_count():
+    return os.cpu_count() or 1
+
+
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", str(min(4, _cpu_count()))))
+CPU_PROCESSES = int(os.getenv("CPU_PROCESSES", "0"))
+
+inference_pool = BoundedPool(
+    "inference",
+    lambda: ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference"),
+    max_pending=int(os.getenv("INFERENCE_MAX_PENDING", str(INFERENCE_THREADS * 8))),
+)
+
+cpu_pool = BoundedPool(
+    "cpu",
+    lambda: ProcessPoolExecutor(max_workers=CPU_PROCESSES),
+    max_pending=int(os.getenv("CPU_MAX_PENDING", str(max(CPU_PROCESSES, 1) * 8))),
+) if CPU_PROCESSES > 0 else None
+
+
+def get_pool(name):
+    if name == "cpu" and cpu_pool is not None:
+        return cpu_pool
+    return inference_pool
+
+
+def pool_stats():
+    stats = {"inference": inference_pool.stats()}
+    if cpu_pool is not None:
+        stats["cpu"] = cpu_pool.stats()
+    return stats
+
+
+def shutdown_pools():
+    inference_pool.shutdown()
+    if cpu_pool is not None:
+        cpu_pool.shutdown()
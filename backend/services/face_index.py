@@ -0,0 +1,245 @@
+import os
+import glob
+import json
+import fcntl
+import threading
+from contextlib import contextmanager
+import numpy as np
+from .embedding_store import embedding_store
+
+# 1:N index over enrolled face embeddings, one row per user (their latest enrollment).
+# Rows are L2-normalized float32, so cosine similarity against every enrolled user is a
+# single matrix-vector product. Full VGG-Face vectors are thousands of floats, so a search
+# first scores a fixed random projection (PROJECTION_DIM columns, ~50 MB at 100k users),
+# then re-ranks the best RERANK candidates with the full vectors. With a path the matrices
+# are memory-mapped files: they open instantly, and workers share them through the page cache.
+# Updates from different processes are serialized by an flock on index.lock, held from the
+# reload through the row writes to the new meta.json.
+
+PROJECTION_DIM = int(os.getenv("FACE_INDEX_PROJECTION_DIM", "256"))
+RERANK = int(os.getenv("FACE_INDEX_RERANK", "128"))
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def projection_matrix(dim, projection_dim, seed=0):
+    # Orthonormal random projection; seeded, so every process derives the same matrix
+    if dim <= projection_dim:
+        return None
+    q, _ = np.linalg.qr(np.random.default_rng(seed).standard_normal((dim, projection_dim)))
+    return q.astype(np.float32)
+
+
+class FaceIndex:
+    def __init__(self, path=None, projection_dim=PROJECTION_DIM, rerank=RERANK):
+        self.path = path
+        self.projection_dim = projection_dim
+        self.rerank = rerank
+        self.dim = None
+        self._projection = None
+        self._ids = []
+        self._rows = {}
+        self._full = None
+        self._projected = None
+        self._meta_mtime = None
+        self._lock = threading.RLock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._reload()
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ---------------- storage ---------------- #
+
+    def _meta_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    @contextmanager
+    def _synced(self, operation=fcntl.LOCK_EX):
+        # Holds the index lock and picks up other processes' changes first (no-op in memory)
+        if not self.path:
+            yield
+            return
+        with open(os.path.join(self.path, "index.lock"), "a") as f:
+            fcntl.flock(f, operation)
+            try:
+                self._reload()
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _reload(self):
+        meta_path = self._meta_path()
+        if not os.path.exists(meta_path):
+            return
+        mtime = os.stat(meta_path).st_mtime_ns
+        if mtime == self._meta_mtime:
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        self._set_dim(meta["dim"])
+        self._ids = meta["ids"]
+        self._rows = {user_id: row for row, user_id in enumerate(self._ids)}
+        self._full = self._open("vectors.f32", self.dim)
+        self._projected = self._open("projected.f32", self._width()) if self._projection is not None else None
+        self._meta_mtime = mtime
+
+    def _save_meta(self):
+        tmp_path = f"{self._meta_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "ids": self._ids}, f)
+        os.replace(tmp_path, self._meta_path())
+        self._meta_mtime = os.stat(self._meta_path()).st_mtime_ns
+
+    def _open(self, name, width, capacity=None):
+        file_path = os.path.join(self.path, name)
+        row_bytes = width * 4
+        current = os.path.getsize(file_path) // row_bytes if os.path.exists(file_path) else 0
+        capacity = max(capacity or 0, current, 1)
+        if capacity > current:
+            with open(file_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        return np.memmap(file_path, dtype=np.float32, mode="r+", shape=(capacity, width))
+
+    def _set_dim(self, dim):
+        if self.dim is None:
+            self.dim = int(dim)
+            self._projection = projection_matrix(self.dim, self.projection_dim)
+        elif self.dim != dim:
+            raise ValueError(f"Embedding has {dim} dimensions, index expects {self.dim}")
+
+    def _width(self):
+        return self._projection.shape[1] if self._projection is not None else self.dim
+
+    def _reserve(self, rows):
+        capacity = len(self._full) if self._full is not None else 0
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 1024)
+        if self.path:
+            self._full = self._open("vectors.f32", self.dim, capacity)
+            if self._projection is not None:
+                self._projected = self._open("projected.f32", self._width(), capacity)
+            return
+        full = np.zeros((capacity, self.dim), dtype=np.float32)
+        if self._full is not None:
+            full[:len(self._ids)] = self._full[:len(self._ids)]
+        self._full = full
+        if self._projection is not None:
+            projected = np.zeros((capacity, self._width()), dtype=np.float32)
+            if self._projected is not None:
+                projected[:len(self._ids)] = self._projected[:len(self._ids)]
+            self._projected = projected
+
+    # ---------------- updates ---------------- #
+
+    def add_many(self, user_ids, vectors):
+        # Adds or replaces one row per user
+        vectors = _normalize(vectors)
+        with self._lock, self._synced():
+            self._set_dim(vectors.shape[1])
+            new_ids = [u for u in dict.fromkeys(user_ids) if u not in self._rows]
+            self._reserve(len(self._ids) + len(new_ids))
+            for user_id in new_ids:
+                self._rows[user_id] = len(self._ids)
+                self._ids.append(user_id)
+            rows = np.fromiter((self._rows[u] for u in user_ids), dtype=np.int64, count=len(user_ids))
+            self._full[rows] = vectors
+            if self._projection is not None:
+                self._projected[rows] = _normalize(vectors @ self._projection)
+            if self.path:
+                self._save_meta()
+
+    def add(self, user_id, vector):
+        self.add_many([user_id], vector)
+
+    def remove(self, user_id):
+        # Moves the last row into the freed slot, so rows stay contiguous
+        with self._lock, self._synced():
+            row = self._rows.pop(user_id, None)
+            if row is None:
+                return False
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._full[row] = self._full[last]
+                if self._projection is not None:
+                    self._projected[row] = self._projected[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._ids.pop()
+            if self.path:
+                self._save_meta()
+            return True
+
+    # ---------------- search ---------------- #
+
+    def search_many(self, queries, k=5):
+        # queries: (m, dim) -> per query, up to k {"user_id", "distance"} closest first
+        queries = _normalize(queries)
+        # Shared lock: concurrent searches proceed, an update in another process waits for them
+        with self._lock, self._synced(fcntl.LOCK_SH):
+            count = len(self._ids)
+            if count == 0:
+                return [[] for _ in queries]
+            self._set_dim(queries.shape[1])
+            k = min(k, count)
+            full = self._full[:count]
+            results = []
+            if self._projection is None or count <= self.rerank:
+                for scores in queries @ full.T:
+                    top = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+                    top = top[np.argsort(-scores[top])]
+                    results.append(self._matches(top, scores[top]))
+                return results
+            approx = _normalize(queries @ self._projection) @ self._projected[:count].T
+            candidates = np.argpartition(-approx, self.rerank - 1, axis=1)[:, :self.rerank]
+            for query, rows in zip(queries, candidates):
+                rows = np.sort(rows)  # ascending rows read the memmap front to back
+                exact = full[rows] @ query
+                top = np.argsort(-exact)[:k]
+                results.append(self._matches(rows[top], exact[top]))
+            return results
+
+    def _matches(self, rows, scores):
+        return [{"user_id": self._ids[row], "distance": round(float(1.0 - score), 4)} for row, score in zip(rows, scores)]
+
+    def search(self, vector, k=5):
+        return self.search_many(vector, k)[0]
+
+    def stats(self):
+        return {"users": len(self._ids), "dim": self.dim, "projection_dim": self._width() if self.dim else None,
+                "memory_mapped": self.path is not None}
+
+
+def rebuild_from_store(index, store=embedding_store):
+    # Backfills the index from every user's latest persisted enrollment
+    user_ids, vectors = [], []
+    for user_dir in sorted(glob.glob(os.path.join(store.root, "*"))):
+        user_id = os.path.basename(user_dir)
+        vector = store.latest(user_id)
+        if vector is not None:
+            user_ids.append(user_id)
+            vectors.append(vector)
+    if user_ids:
+        index.add_many(user_ids, np.stack(vectors))
+    return len(user_ids)
+
+
+face_index = FaceIndex(os.path.join(os.getenv("FACE_INDEX_DIR", "data/face_index"), embedding_store.namespace or "default"))
+
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["rebuild"]:
+        print(f"Indexed {rebuild_from_store(face_index)} enrolled users")
+    elif sys.argv[1:2] == ["remove"] and len(sys.argv) == 3:
+        print("removed" if face_index.remove(sys.argv[2]) else "not indexed")
+    else:
+        print("usage: python -m services.face_index rebuild | remove <user_id>")
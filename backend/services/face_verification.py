@@ -1,30 +1,124 @@
-import os, base64, cv2
+import base64, cv2
 import numpy as np
-from deepface import DeepFace
+from .embedding_store import embedding_store, image_digest, cosine_distance
+from .model_registry import registry
+from .inference_backends import load_keras, selected_backend
+from .metrics import timed, record_error
+from .face_index import face_index
+
+MODEL_NAME = "VGG-Face"
+# DeepFace's cosine threshold for VGG-Face
+DISTANCE_THRESHOLD = 0.68
+
+# DeepFace.represent's defaults: OpenCV detector, eye alignment, resize with zero padding
+DETECTOR_BACKEND = "opencv"
+INPUT_SIZE = 224
+
+def _pad_resize(face, size=INPUT_SIZE):
+    # Keeps the aspect ratio and pads to a square, the way DeepFace resizes detected faces
+    factor = min(size / face.shape[0], size / face.shape[1])
+    resized = cv2.resize(face, (max(1, int(face.shape[1] * factor)), max(1, int(face.shape[0] * factor))))
+    dy, dx = size - resized.shape[0], size - resized.shape[1]
+    padded = np.pad(resized, ((dy // 2, dy - dy // 2), (dx // 2, dx - dx // 2), (0, 0)), "constant")
+    return padded.astype(np.float32)
+
+def _vgg_input(img):
+    # Largest detected and aligned face, RGB, 224x224, scaled to [0, 1]. Every backend embeds
+    # this same tensor, so converted models are compared on identical input.
+    from deepface import DeepFace
+    faces = DeepFace.extract_faces(img_path=img, detector_backend=DETECTOR_BACKEND, align=True,
+                                   enforce_detection=True)
+    largest = max(faces, key=lambda f: f["facial_area"]["w"] * f["facial_area"]["h"])
+    return _pad_resize(largest["face"])[np.newaxis]
+
+def make_face_embedder(backend=None):
+    # The bare VGG-Face network (DeepFace's own Keras model by default), fed by _vgg_input
+    model = load_keras("vgg_face", backend or selected_backend())
+    return lambda img: model.predict_on_batch(_vgg_input(img))[0]
+
+registry.register("face_embedder", make_face_embedder)
+
+def decode_bytes(raw):
+    with timed("decode"):
+        img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image")
+    return img
 
 def decode_image(b64_string):
-    return cv2.imdecode(np.frombuffer(base64.b64decode(b64_string), np.uint8), cv2.IMREAD_COLOR)
+    return decode_bytes(base64.b64decode(b64_string))
 
-def verify_faces(user_id, registered_b64, captured_b64):
+def embed_face(img: np.ndarray):
+    embedder = registry.get("face_embedder")
+    with timed("embed"):
+        return np.asarray(embedder(img), dtype=np.float32).ravel()
+
+def registered_embedding(user_id, registered_raw, enroll=False):
+    # Only enrollment makes the image the user's reference; verification just caches its embedding
+    digest = image_digest(registered_raw)
+    embedding = embedding_store.get(user_id, digest)
+    if embedding is None:
+        embedding = embedding_store.put(user_id, digest, embed_face(decode_bytes(registered_raw)))
+    if enroll:
+        embedding_store.set_latest(user_id, digest)
+    return embedding
+
+def compare_embeddings(reg_embedding, cap_img):
+    distance = cosine_distance(reg_embedding, embed_face(cap_img))
+    verified = distance <= DISTANCE_THRESHOLD
+    return {
+        "status": "verified" if verified else "not_verified",
+        "confidence": 1 - distance,
+        "message": "Match success" if verified else "Face mismatch",
+        "success": True
+    }
+
+def enroll_face_bytes(user_id, registered_raw):
     try:
-        user_folder = f"user_data/{user_id}"
-        os.makedirs(user_folder, exist_ok=True)
-        reg_path = os.path.join(user_folder, "registered.jpg")
-        cap_path = os.path.join(user_folder, "captured.jpg")
+        face_index.add(user_id, registered_embedding(user_id, registered_raw, enroll=True))
+        return {"status": "enrolled", "confidence": None, "message": "Face enrolled", "success": True}
+    except Exception as e:
+        record_error("face_verification", e)
+        return {"success": False, "message": str(e)}
 
-        reg_img = decode_image(registered_b64)
-        cap_img = decode_image(captured_b64)
+def enroll_face(user_id, registered_b64):
+    try:
+        return enroll_face_bytes(user_id, base64.b64decode(registered_b64))
+    except Exception as e:
+        record_error("face_verification", e)
+        return {"success": False, "message": str(e)}
 
-        cv2.imwrite(reg_path, reg_img)
-        cv2.imwrite(cap_path, cap_img)
+def verify_face_bytes(user_id, registered_raw, captured_raw):
+    # registered_raw may be None, in which case the user's enrolled embedding is used
+    try:
+        if registered_raw is None:
+            reg_embedding = embedding_store.latest(user_id)
+            if reg_embedding is None:
+                return {"success": False, "message": f"No enrolled face for user '{user_id}'"}
+        else:
+            reg_embedding = registered_embedding(user_id, registered_raw)
+        return compare_embeddings(reg_embedding, decode_bytes(captured_raw))
+    except Exception as e:
+        record_error("face_verification", e)
+        return {"success": False, "message": str(e)}
 
-        result = DeepFace.verify(img1_path=reg_path, img2_path=cap_path, model_name="VGG-Face")
-        return {
-            "status": "verified" if result["verified"] else "not_verified",
-            "confidence": 1 - result["distance"],
-            "message": "Match success" if result["verified"] else "Face mismatch",
-            "success": True
-        }
+def verify_faces(user_id, registered_b64, captured_b64):
+    try:
+        return verify_face_bytes(user_id, base64.b64decode(registered_b64), base64.b64decode(captured_b64))
+    except Exception as e:
+        record_error("face_verification", e)
+        return {"success": False, "message": str(e)}
 
+def identify_face_bytes(captured_raw, k=5, user_id=None):
+    # 1:N search over every enrolled face. With user_id, a close match to anyone else is
+    # flagged: the same person enrolled under another id, or a proxy sitting the interview.
+    try:
+        matches = face_index.search(embed_face(decode_bytes(captured_raw)), k)
+        for match in matches:
+            match["match"] = match["distance"] <= DISTANCE_THRESHOLD
+        others = [m["user_id"] for m in matches if m["match"] and m["user_id"] != user_id]
+        return {"success": True, "matches": matches,
+                "proxy_suspected": bool(user_id) and bool(others), "message": None}
     except Exception as e:
+        record_error("face_identification", e)
         return {"success": False, "message": str(e)}
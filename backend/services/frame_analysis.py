@@ -0,0 +1,95 @@
+import os
+import datetime
+import threading
+import cv2
+import numpy as np
+from .batching import MicroBatcher
+from .emotion_analysis import classify_emotions, emotion_summary
+from .metrics import timed
+
+# Single detection pass per frame: faces are found once on a downscaled grayscale copy, the
+# boxes are mapped back to full resolution, and those crops feed one batched emotion call
+# for the whole batch (no second detector inside DeepFace). Face count, boxes and the
+# multiple_faces / no_face flags all come from the same pass.
+
+DETECT_MAX_WIDTH = int(os.getenv("DETECT_MAX_WIDTH", "320"))
+CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+
+_local = threading.local()
+
+def _cascade():
+    # CascadeClassifier isn't safe to share across threads, keep one per worker thread
+    cascade = getattr(_local, "cascade", None)
+    if cascade is None:
+        cascade = _local.cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    return cascade
+
+def detect_faces(frame, max_width=DETECT_MAX_WIDTH):
+    # Returns an (N, 4) int array of x, y, w, h boxes in full-resolution coordinates
+    height, width = frame.shape[:2]
+    scale = min(1.0, max_width / float(width))
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if scale < 1.0:
+        gray = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    with timed("detect"):
+        boxes = _cascade().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+    if len(boxes) == 0:
+        return np.zeros((0, 4), dtype=np.int32)
+    boxes = np.round(np.asarray(boxes, dtype=np.float32) / scale).astype(np.int32)
+    # Largest face first, it's treated as the candidate
+    return boxes[np.argsort(-(boxes[:, 2] * boxes[:, 3]))]
+
+def crop(frame, box):
+    x, y, w, h = box
+    return frame[max(y, 0):y + h, max(x, 0):x + w]
+
+def _flag(name, detected, confidence, timestamp):
+    return {"flag": name, "detected": bool(detected), "confidence": confidence if detected else 0.0,
+            "timestamp": timestamp}
+
+def analyze_frames(frames):
+    boxes_per_frame = [detect_faces(frame) for frame in frames]
+
+    # Frames without a detected face fall back to the whole frame, like enforce_detection=False did
+    crops, owners = [], []
+    for i, (frame, boxes) in enumerate(zip(frames, boxes_per_frame)):
+        if len(boxes) == 0:
+            crops.append(frame)
+            owners.append(i)
+        for box in boxes:
+            crops.append(crop(frame, box))
+            owners.append(i)
+    probs = classify_emotions(crops)
+
+    timestamp = datetime.datetime.now().isoformat()
+    results = [{"frame_count": 1, "face_count": int(len(boxes)), "faces": [], "emotion": None}
+               for boxes in boxes_per_frame]
+    box_iter = {i: iter(boxes) for i, boxes in enumerate(boxes_per_frame)}
+    for owner, face_probs in zip(owners, probs):
+        summary = emotion_summary(face_probs)
+        result = results[owner]
+        if result["emotion"] is None:
+            result["emotion"] = summary
+        box = next(box_iter[owner], None)
+        if box is not None:
+            result["faces"].append({"box": [int(v) for v in box], "emotion": summary["emotion"],
+                                    "confidence": summary["confidence"]})
+
+    for result in results:
+        face_count = result["face_count"]
+        result["detections"] = [
+            _flag("multiple_faces", face_count > 1, 1.0, timestamp),
+            _flag("no_face", face_count == 0, 1.0, timestamp),
+        ]
+    return results
+
+def analyze_frame(frame):
+    return analyze_frames([frame])[0]
+
+frame_batcher = MicroBatcher(
+    analyze_frames,
+    max_batch_size=int(os.getenv("FRAME_BATCH_SIZE", "16")),
+    max_wait_ms=float(os.getenv("FRAME_BATCH_WAIT_MS", "25")),
+    max_queue=int(os.getenv("FRAME_MAX_QUEUE", "256")),
+    name="frame-batcher",
+)
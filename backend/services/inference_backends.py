@@ -0,0 +1,138 @@
+import os
+import argparse
+import numpy as np
+from .model_registry import build_deepface_model
+
+# Selectable CPU inference backends behind one interface. Services ask for a text2text
+# pipeline or a Keras network by name and get back something with the same call surface
+# (a transformers pipeline, or an object with predict_on_batch) regardless of backend:
+#
+#   default  full-precision PyTorch / TensorFlow, as shipped
+#   int8     torch dynamic int8 quantization for flan-t5, ONNX Runtime int8 for Keras nets
+#   onnx     ONNX Runtime fp32 export of every model
+#
+# Converted artifacts are cached under MODEL_ARTIFACT_DIR and built on first use, or up
+# front with:
+#
+#   cd backend && python -m services.inference_backends convert --backend onnx
+
+BACKENDS = ("default", "int8", "onnx")
+ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", "model_cache")
+
+KERAS_MODELS = {
+    "vgg_face": ("VGG-Face", "facial_recognition"),
+    "emotion": ("Emotion", "facial_attribute"),
+}
+
+
+def selected_backend():
+    backend = os.getenv("INFERENCE_BACKEND", "default")
+    if backend not in BACKENDS:
+        raise ValueError(f"INFERENCE_BACKEND must be one of {BACKENDS}, got '{backend}'")
+    return backend
+
+
+def _artifact_path(*parts):
+    path = os.path.join(ARTIFACT_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+# ---------------- TEXT2TEXT (flan-t5) ---------------- #
+
+def _int8_seq2seq(model_id):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+    path = _artifact_path("int8", f"{model_id.replace('/', '__')}.pt")
+    if os.path.exists(path):
+        return torch.load(path, weights_only=False)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_id).eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    torch.save(model, path)
+    return model
+
+
+def _onnx_seq2seq(model_id):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    path = os.path.join(ARTIFACT_DIR, "onnx", model_id.replace("/", "__"))
+    if os.path.isdir(path):
+        return ORTModelForSeq2SeqLM.from_pretrained(path)
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True)
+    model.save_pretrained(path)
+    return model
+
+
+def load_text2text(model_id, backend=None):
+    from transformers import AutoTokenizer, pipeline
+    backend = backend or selected_backend()
+    if backend == "default":
+        return pipeline("text2text-generation", model=model_id)
+    model = _int8_seq2seq(model_id) if backend == "int8" else _onnx_seq2seq(model_id)
+    return pipeline("text2text-generation", model=model, tokenizer=AutoTokenizer.from_pretrained(model_id))
+
+
+# ---------------- KERAS NETWORKS (DeepFace) ---------------- #
+
+class OnnxModel:
+    def __init__(self, path):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict_on_batch(self, batch):
+        return self.session.run(None, {self.input_name: np.asarray(batch, dtype=np.float32)})[0]
+
+
+def keras_model(name):
+    model_name, task = KERAS_MODELS[name]
+    client = build_deepface_model(model_name, task)
+    return getattr(client, "model", client)
+
+
+def _export_onnx(name):
+    path = _artifact_path("onnx", f"{name}.onnx")
+    if not os.path.exists(path):
+        import tensorflow as tf
+        import tf2onnx
+        model = keras_model(name)
+        spec = [tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="input")]
+        tf2onnx.convert.from_keras(model, input_signature=spec, output_path=path)
+    return path
+
+
+def _export_onnx_int8(name):
+    path = _artifact_path("int8", f"{name}.onnx")
+    if not os.path.exists(path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(_export_onnx(name), path, weight_type=QuantType.QInt8)
+    return path
+
+
+def load_keras(name, backend=None):
+    backend = backend or selected_backend()
+    if backend == "default":
+        return keras_model(name)
+    return OnnxModel(_export_onnx_int8(name) if backend == "int8" else _export_onnx(name))
+
+
+def convert(backend, model_id):
+    if backend == "default":
+        return
+    print(f"[{backend}] {model_id}")
+    load_text2text(model_id, backend)
+    for name in KERAS_MODELS:
+        print(f"[{backend}] {name}")
+        load_keras(name, backend)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build cached artifacts for the int8/onnx inference backends")
+    parser.add_argument("command", choices=["convert"])
+    parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "default"], nargs="+",
+                        default=["int8", "onnx"])
+    parser.add_argument("--model-id", default="google/flan-t5-base")
+    args = parser.parse_args()
+    for backend in args.backend:
+        convert(backend, args.model_id)
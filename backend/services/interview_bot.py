@@ -1,23 +1,158 @@
-from transformers import pipeline
+import os
+import re
+import threading
+import time
+from .model_registry import registry
+from .inference_backends import load_text2text, selected_backend
+from .result_cache import ResultCache, cache_key, normalize_text
+from .metrics import STAGE_SECONDS, timed
 
 # ✅ Light model that works well for text-generation + instruction
-qa_pipeline = pipeline("text2text-generation", model="google/flan-t5-base")
+MODEL_ID = "google/flan-t5-base"
+GENERATION_KWARGS = {"max_length": 256, "do_sample": False}
 
-def generate_questions(topic="Python", count=3):
-    prompt = f"List {count} beginner-level interview questions on the topic '{topic}'."
-    result = qa_pipeline(prompt, max_length=256, do_sample=False)
-    
-    # Extract questions from generated text
-    questions_raw = result[0]["generated_text"]
+def _load_qa_pipeline():
+    return load_text2text(MODEL_ID)
+
+registry.register("qa_pipeline", _load_qa_pipeline)
+
+# Identical (question, answer) pairs always produce the same feedback, so results are memoized.
+# EVAL_CACHE_DB enables the SQLite tier that survives restarts.
+evaluation_cache = ResultCache(
+    capacity=int(os.getenv("EVAL_CACHE_SIZE", "4096")),
+    sqlite_path=os.getenv("EVAL_CACHE_DB") or None,
+)
+
+NON_ANSWERS = {"", "i don't know", "i dont know", "i do not know", "idk", "dont know", "don't know",
+               "no idea", "not sure", "i'm not sure", "pass", "skip", "n/a", "na", "none", "-", "?"}
+NON_ANSWER_FEEDBACK = "Score: 0/10. No answer was given, so there is nothing to evaluate."
+
+def question_prompt(topic, count, difficulty="beginner"):
+    return f"List {count} {difficulty}-level interview questions on the topic '{topic}'."
+
+def parse_questions(questions_raw, count):
     questions = [q.strip("- ").strip() for q in questions_raw.strip().split("\n") if q.strip()]
-    
     return questions[:count]
 
-def evaluate_answer(question, answer):
-    prompt = (
+def generate_question_sets(requests, batch_size=8):
+    # requests: list of (topic, difficulty, count); one batched pipeline call for all of them
+    if not requests:
+        return []
+    qa_pipeline = registry.get("qa_pipeline")
+    prompts = [question_prompt(topic, count, difficulty) for topic, difficulty, count in requests]
+    with timed("generate"):
+        results = qa_pipeline(prompts, batch_size=batch_size, **GENERATION_KWARGS)
+    return [parse_questions(result[0]["generated_text"] if isinstance(result, list) else result["generated_text"], count)
+            for result, (_, _, count) in zip(results, requests)]
+
+def generate_questions(topic="Python", count=3, difficulty="beginner"):
+    qa_pipeline = registry.get("qa_pipeline")
+    prompt = question_prompt(topic, count, difficulty)
+    with timed("generate"):
+        result = qa_pipeline(prompt, **GENERATION_KWARGS)
+    
+    # Extract questions from generated text
+    return parse_questions(result[0]["generated_text"], count)
+
+def evaluation_prompt(question, answer):
+    return (
         f"Evaluate this answer to the interview question.\n\n"
         f"Question: {question}\nAnswer: {answer}\n\n"
         f"Give a score from 0 to 10 with brief feedback."
     )
-    result = qa_pipeline(prompt, max_length=256, do_sample=False)
-    return result[0]["generated_text"]
+
+_SCORE_PATTERNS = [
+    re.compile(r"(\d+(?:\.\d+)?)\s*(?:/|out of)\s*10\b", re.IGNORECASE),
+    re.compile(r"score\D{0,10}?(\d+(?:\.\d+)?)", re.IGNORECASE),
+    re.compile(r"\b(\d+(?:\.\d+)?)\b"),
+]
+
+def parse_score(feedback):
+    # First "N/10", then "score ... N", then any bare number; values outside 0-10 are skipped
+    for pattern in _SCORE_PATTERNS:
+        for match in pattern.finditer(feedback):
+            value = float(match.group(1))
+            if 0 <= value <= 10:
+                return int(round(value))
+    return 0
+
+def _evaluation_key(question, answer):
+    return cache_key(question, answer, MODEL_ID, selected_backend(), GENERATION_KWARGS)
+
+def cached_evaluation(question, answer):
+    # Feedback without touching the model: non-answers short-circuit, repeats hit the cache
+    if normalize_text(answer).strip(".!") in NON_ANSWERS:
+        evaluation_cache.short_circuits += 1
+        return NON_ANSWER_FEEDBACK
+    return evaluation_cache.get(_evaluation_key(question, answer))
+
+def evaluate_answers(pairs, batch_size=8, lookup=True):
+    # pairs: list of (question, answer); the pipeline pads each batch to its longest prompt.
+    # lookup=False when the caller already missed the cache on every pair, so each miss is counted once
+    feedbacks = [cached_evaluation(question, answer) if lookup else None for question, answer in pairs]
+    pending = [i for i, feedback in enumerate(feedbacks) if feedback is None]
+    if not pending:
+        return feedbacks
+    qa_pipeline = registry.get("qa_pipeline")
+    prompts = [evaluation_prompt(*pairs[i]) for i in pending]
+    with timed("generate"):
+        results = qa_pipeline(prompts, batch_size=batch_size, **GENERATION_KWARGS)
+    for i, result in zip(pending, results):
+        feedbacks[i] = (result[0] if isinstance(result, list) else result)["generated_text"]
+        evaluation_cache.put(_evaluation_key(*pairs[i]), feedbacks[i])
+    return feedbacks
+
+def evaluate_answer(question, answer):
+    feedback = cached_evaluation(question, answer)
+    if feedback is not None:
+        return feedback
+    qa_pipeline = registry.get("qa_pipeline")
+    with timed("generate"):
+        result = qa_pipeline(evaluation_prompt(question, answer), **GENERATION_KWARGS)
+    feedback = result[0]["generated_text"]
+    evaluation_cache.put(_evaluation_key(question, answer), feedback)
+    return feedback
+
+def _stop_when_set(event):
+    from transformers import StoppingCriteria, StoppingCriteriaList
+    import torch
+
+    class StopWhenSet(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full((input_ids.shape[0],), event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+    return StoppingCriteriaList([StopWhenSet()])
+
+def stream_evaluate_answer(question, answer, cancelled=None):
+    # Yields feedback text as tokens are decoded; the full text is cached once generation ends.
+    # Setting `cancelled` (a threading.Event) stops generation at the next token.
+    feedback = cached_evaluation(question, answer)
+    if feedback is not None:
+        yield feedback
+        return
+
+    from transformers import TextIteratorStreamer
+    cancelled = cancelled or threading.Event()
+    qa_pipeline = registry.get("qa_pipeline")
+    tokenizer = qa_pipeline.tokenizer
+    inputs = tokenizer(evaluation_prompt(question, answer), return_tensors="pt")
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True)
+    generation = threading.Thread(
+        target=qa_pipeline.model.generate,
+        kwargs=dict(**inputs, streamer=streamer, stopping_criteria=_stop_when_set(cancelled), **GENERATION_KWARGS),
+        name="evaluate-stream",
+        daemon=True,
+    )
+    generation.start()
+
+    parts = []
+    started = time.perf_counter()
+    for text in streamer:
+        if text:
+            parts.append(text)
+            yield text
+    generation.join()
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage="generate_stream")
+    # Cut-off feedback is never cached
+    if not cancelled.is_set():
+        evaluation_cache.put(_evaluation_key(question, answer), "".join(parts))
@@ -0,0 +1,215 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Minimal Prometheus-style instrumentation with no dependencies. Counters and histograms
+# are plain dicts keyed by label tuples behind one lock (an observe() is a bisect plus two
+# additions, a few µs); gauges for queue depths and model state are read from callbacks only
+# when /metrics is scraped, so they cost nothing on the request path.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[n]) for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _labels(self.label_names, k), v) for k, v in self._values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[n]) for n in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        out = []
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append((f"{self.name}_bucket", _labels(self.label_names, key, [("le", le)]), cumulative))
+            out.append((f"{self.name}_sum", _labels(self.label_names, key), total))
+            out.append((f"{self.name}_count", _labels(self.label_names, key), count))
+        return out
+
+
+class CallbackGauge:
+    kind = "gauge"
+
+    def __init__(self, name, help, labels, callback):
+        # callback() returns {label_values_tuple: value}
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.callback = callback
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception:
+            return []
+        return [(self.name, _labels(self.label_names, k), v) for k, v in values.items() if v is not None]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _add(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge_callback(self, name, help, labels, callback):
+        self._metrics[name] = CallbackGauge(name, help, labels, callback)
+        return self._metrics[name]
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {float(value):.6g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram("stage_duration_seconds", "Time spent per pipeline stage", ["stage"])
+ERRORS = metrics.counter("errors_total", "Errors by location and exception type", ["where", "kind"])
+REQUEST_SECONDS = metrics.histogram("http_request_duration_seconds", "HTTP request latency",
+                                    ["method", "route", "status"])
+BATCH_SIZE = metrics.histogram("batch_size", "Items per micro-batch", ["batcher"],
+                               buckets=(1, 2, 4, 8, 16, 32, 64))
+QUEUE_WAIT_SECONDS = metrics.histogram("batch_queue_wait_seconds", "Time items wait before their batch runs",
+                                       ["batcher"])
+
+
+@contextmanager
+def timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def record_error(where, exc):
+    ERRORS.inc(where=where, kind=type(exc).__name__)
+
+
+# ---------------- ASGI MIDDLEWARE ---------------- #
+# Times every HTTP request by route template and status. With PROFILING_ENABLED=1 a request
+# carrying "X-Profile: 1" is run under pyinstrument (speedscope JSON, for flame graphs) or
+# cProfile if pyinstrument isn't installed, written to PROFILE_DIR.
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+
+def _profile_requested(scope):
+    return PROFILING_ENABLED and (b"x-profile", b"1") in scope.get("headers", [])
+
+
+class _Profiler:
+    def __init__(self, label):
+        self.label = label.strip("/").replace("/", "_") or "root"
+        try:
+            from pyinstrument import Profiler
+            self._impl, self._kind = Profiler(async_mode="enabled"), "pyinstrument"
+        except ImportError:
+            import cProfile
+            self._impl, self._kind = cProfile.Profile(), "cprofile"
+
+    def __enter__(self):
+        self._impl.enable() if self._kind == "cprofile" else self._impl.start()
+        return self
+
+    def __exit__(self, *exc):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stem = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.label}")
+        if self._kind == "cprofile":
+            self._impl.disable()
+            self._impl.dump_stats(f"{stem}.prof")
+        else:
+            from pyinstrument.renderers import SpeedscopeRenderer
+            self._impl.stop()
+            with open(f"{stem}.speedscope.json", "w") as f:
+                f.write(self._impl.output(renderer=SpeedscopeRenderer()))
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            if _profile_requested(scope):
+                with _Profiler(scope["path"]):
+                    await self.app(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            record_error("http", e)
+            raise
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route,
+                                    status=status["code"])
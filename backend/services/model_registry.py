@@ -0,0 +1,99 @@
+import threading
+import time
+from .metrics import record_error
+
+# Central place where heavy models are loaded. Services register a loader at import time
+# (cheap: no transformers/TensorFlow import happens until the loader runs), the FastAPI
+# lifespan warms everything on a background thread, and get() loads lazily if a request
+# arrives before warm-up reached that model. A model registered lazy=True isn't served by any
+# endpoint: it is only loaded by get(), and readiness doesn't wait for it.
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._state = {}
+        self._errors = {}
+        self._load_times = {}
+        self._locks = {}
+        self._lazy = set()
+        self._lock = threading.Lock()
+        self._warm_thread = None
+
+    def register(self, name, loader, lazy=False):
+        with self._lock:
+            self._loaders[name] = loader
+            self._state.setdefault(name, PENDING)
+            self._locks.setdefault(name, threading.Lock())
+            if lazy:
+                self._lazy.add(name)
+            else:
+                self._lazy.discard(name)
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            self._state[name] = LOADING
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._state[name] = FAILED
+                self._errors[name] = str(e)
+                record_error(f"model_load:{name}", e)
+                raise
+            self._load_times[name] = time.perf_counter() - start
+            self._models[name] = model
+            self._state[name] = READY
+            self._errors.pop(name, None)
+            return model
+
+    def warm_up(self, names=None):
+        for name in list(names or [n for n in self._loaders if n not in self._lazy]):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"[ModelRegistry] failed to load {name}: {e}")
+
+    def start_background_warm_up(self, names=None):
+        if self._warm_thread is None or not self._warm_thread.is_alive():
+            self._warm_thread = threading.Thread(target=self.warm_up, args=(names,),
+                                                 name="model-warmup", daemon=True)
+            self._warm_thread.start()
+        return self._warm_thread
+
+    def ready(self):
+        served = [name for name in self._loaders if name not in self._lazy]
+        return bool(served) and all(self._state[name] == READY for name in served)
+
+    def status(self):
+        return {
+            name: {
+                "state": self._state[name],
+                "load_seconds": round(self._load_times[name], 3) if name in self._load_times else None,
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+
+def build_deepface_model(model_name, task):
+    from deepface import DeepFace
+    try:
+        return DeepFace.build_model(model_name, task=task)
+    except TypeError:
+        # deepface < 0.0.90 has no task argument
+        return DeepFace.build_model(model_name)
+
+
+registry = ModelRegistry()
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from .sqlite_db import open_database
+
+# Server-side state for live monitoring streams, one entry per connected session. A stream
+# lives on the worker that accepted its websocket; its summary is published to SQLite (on open,
+# then at most once per MONITOR_PUBLISH_MS) and removed on close, so a status request served by
+# any gunicorn worker sees it. The writes run on one writer thread, off the event loop and in
+# the order they were issued, so a stream's last publish can't land after its close.
+#
+#   MONITOR_STATE_PATH   SQLite file holding the published summaries (data/monitor.db)
+#   MONITOR_PUBLISH_MS   minimum interval between publishes of one session (1000)
+
+
+class MonitorSession:
+    def __init__(self, user_id, max_in_flight=2):
+        self.user_id = user_id
+        self.max_in_flight = max_in_flight
+        self.started_at = time.time()
+        self.frames_received = 0
+        self.frames_analyzed = 0
+        self.frames_dropped = 0
+        self.in_flight = 0
+        self.flag_counts = Counter()
+        self.last_result = None
+        self.published_at = 0.0
+        self.closed = False
+
+    def admit(self):
+        # Drop frames instead of queueing when the client sends faster than we analyze
+        self.frames_received += 1
+        if self.in_flight >= self.max_in_flight:
+            self.frames_dropped += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def complete(self, result):
+        self.in_flight -= 1
+        if result is None:
+            return
+        self.frames_analyzed += 1
+        self.last_result = result
+        for detection in result.get("detections", []):
+            if detection.get("detected"):
+                self.flag_counts[detection["flag"]] += 1
+
+    def summary(self):
+        return {
+            "user_id": self.user_id,
+            "started_at": self.started_at,
+            "frames_received": self.frames_received,
+            "frames_analyzed": self.frames_analyzed,
+            "frames_dropped": self.frames_dropped,
+            "flag_counts": dict(self.flag_counts),
+        }
+
+
+class MonitorSessions:
+    def __init__(self, path, publish_ms=1000):
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.publish_interval = publish_ms / 1000
+        self.db = open_database(
+            path, "CREATE TABLE IF NOT EXISTS monitor_sessions (user_id TEXT PRIMARY KEY, summary TEXT NOT NULL)"
+        )
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="monitor-writer")
+
+    async def _write(self, sql, params):
+        await asyncio.get_running_loop().run_in_executor(self._writer, partial(self.db.execute, sql, params))
+
+    async def open(self, user_id, max_in_flight=2):
+        with self._lock:
+            session = MonitorSession(user_id, max_in_flight)
+            self._sessions[user_id] = session
+        await self.publish(session, force=True)
+        return session
+
+    async def publish(self, session, force=False):
+        now = time.monotonic()
+        if session.closed or (not force and now - session.published_at < self.publish_interval):
+            return
+        session.published_at = now
+        await self._write("INSERT OR REPLACE INTO monitor_sessions VALUES (?, ?)",
+                          (session.user_id, json.dumps(session.summary())))
+
+    async def close(self, user_id):
+        with self._lock:
+            session = self._sessions.pop(user_id, None)
+        # A newer stream for the same user may have replaced this one on another worker; only
+        # drop the row if it is still ours
+        if session is not None:
+            session.closed = True
+            await self._write("DELETE FROM monitor_sessions WHERE user_id = ? AND json_extract(summary, "
+                              "'$.started_at') = ?", (user_id, session.started_at))
+        return session
+
+    def get(self, user_id):
+        row = self.db.query_one("SELECT summary FROM monitor_sessions WHERE user_id = ?", (user_id,))
+        return json.loads(row[0]) if row else None
+
+
+monitor_sessions = MonitorSessions(
+    os.getenv("MONITOR_STATE_PATH", "data/monitor.db"),
+    publish_ms=float(os.getenv("MONITOR_PUBLISH_MS", "1000")),
+)
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import OrderedDict
+from .interview_bot import generate_question_sets
+
+# Pre-generated interview questions per (topic, difficulty). Generation is deterministic
+# (do_sample=False), so the bank is filled in batched pipeline calls at build/startup time,
+# persisted to JSON, and served through a small LRU with a TTL. Entries older than
+# QUESTION_BANK_REFRESH_S are served as-is while a background thread regenerates them.
+# Only QUESTION_TOPICS are served, so the bank holds at most topics x difficulties entries;
+# concurrent misses on one entry share a single inline generation.
+#
+#   cd backend && python -m services.question_bank   # pre-generate the bank at build time
+
+TOPICS = [t.strip() for t in os.getenv("QUESTION_TOPICS", "Python,SQL,Machine Learning,Data Structures").split(",")
+          if t.strip()]
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+BANK_SIZE = int(os.getenv("QUESTION_BANK_SIZE", "5"))
+MAX_COUNT = 20
+
+
+class QuestionBank:
+    def __init__(self, path, bank_size=BANK_SIZE, cache_size=256, cache_ttl=600,
+                 refresh_after=86400, batch_size=8):
+        self.path = path
+        self.bank_size = bank_size
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.refresh_after = refresh_after
+        self.batch_size = batch_size
+        self._bank = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._refill_queue = queue.Queue()
+        self._queued = set()
+        self._filling = {}
+        self._worker = None
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def _key(topic, difficulty):
+        return f"{topic}|{difficulty}"
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self._bank = json.load(f)
+
+    def save(self):
+        with self._lock:
+            snapshot = json.dumps(self._bank, indent=2)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+    def get(self, topic, difficulty="beginner", count=3):
+        if topic not in TOPICS or difficulty not in DIFFICULTIES or not 1 <= count <= MAX_COUNT:
+            raise ValueError(f"No questions for {topic!r} ({difficulty}, {count})")
+        cache_key = (topic, difficulty, count)
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None and cached[1] > now:
+                self._cache.move_to_end(cache_key)
+                self.hits += 1
+                return list(cached[0])
+            self.misses += 1
+            entry = self._bank.get(self._key(topic, difficulty))
+
+        if entry is None or len(entry["questions"]) < count:
+            # Not banked yet or a larger set than banked: generate inline once, then it's banked
+            entry = self._fill_once(topic, difficulty, max(count, self.bank_size))
+        elif now - entry["generated_at"] > self.refresh_after:
+            self.schedule_refill(topic, difficulty)
+
+        questions = entry["questions"][:count]
+        with self._lock:
+            self._cache[cache_key] = (questions, now + self.cache_ttl)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(questions)
+
+    def fill(self, pairs, count=None):
+        count = count or self.bank_size
+        for start in range(0, len(pairs), self.batch_size):
+            chunk = pairs[start:start + self.batch_size]
+            question_sets = generate_question_sets([(t, d, count) for t, d in chunk], self.batch_size)
+            now = time.time()
+            with self._lock:
+                for (topic, difficulty), questions in zip(chunk, question_sets):
+                    self._bank[self._key(topic, difficulty)] = {"questions": questions, "generated_at": now}
+                    for cache_key in [k for k in self._cache if k[:2] == (topic, difficulty)]:
+                        del self._cache[cache_key]
+        self.save()
+
+    def _fill_once(self, topic, difficulty, count):
+        # The first caller generates; concurrent callers for the same entry wait for its result
+        key = self._key(topic, difficulty)
+        while True:
+            with self._lock:
+                entry = self._bank.get(key)
+                if entry is not None and len(entry["questions"]) >= count:
+                    return entry
+                done = self._filling.get(key)
+                leader = done is None
+                if leader:
+                    done = self._filling[key] = threading.Event()
+            if not leader:
+                done.wait()
+                continue
+            try:
+                self.fill([(topic, difficulty)], count)
+            finally:
+                with self._lock:
+                    del self._filling[key]
+                done.set()
+            with self._lock:
+                return self._bank[key]
+
+    def missing(self, topics=TOPICS, difficulties=DIFFICULTIES):
+        return [(t, d) for t in topics for d in difficulties if self._key(t, d) not in self._bank]
+
+    def schedule_refill(self, topic, difficulty):
+        with self._lock:
+            if (topic, difficulty) in self._queued:
+                return
+            self._queued.add((topic, difficulty))
+        self._refill_queue.put((topic, difficulty))
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._refill_loop, name="question-bank-refill", daemon=True)
+            self._worker.start()
+
+    def _refill_loop(self):
+        while True:
+            pairs = [self._refill_queue.get()]
+            while len(pairs) < self.batch_size:
+                try:
+                    pairs.append(self._refill_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.fill(pairs)
+            except Exception as e:
+                print(f"[QuestionBank] refill failed: {e}")
+            finally:
+                with self._lock:
+                    self._queued.difference_update(pairs)
+
+    def start(self):
+        for topic, difficulty in self.missing():
+            self.schedule_refill(topic, difficulty)
+
+    def stats(self):
+        return {"entries": len(self._bank), "hits": self.hits, "misses": self.misses,
+                "refill_pending": self._refill_queue.qsize()}
+
+
+question_bank = QuestionBank(
+    os.getenv("QUESTION_BANK_PATH", "data/question_bank.json"),
+    cache_ttl=float(os.getenv("QUESTION_CACHE_TTL_S", "600")),
+    refresh_after=float(os.getenv("QUESTION_BANK_REFRESH_S", "86400")),
+)
+
+
+if __name__ == "__main__":
+    pending = question_bank.missing()
+    print(f"Generating {len(pending)} question sets...")
+    question_bank.fill(pending)
+    print(json.dumps(question_bank.stats(), indent=2))
@@ -0,0 +1,396 @@
+import os
+import json
+import threading
+import numpy as np
+from .metrics import timed, record_error
+from .result_cache import ResultCache
+from .sqlite_db import open_database
+from .session_store import session_store
+
+# Final reports and cohort rankings without replaying sessions.
+#
+# Every record appended to the session store updates that session's SessionAggregate in O(1)
+# (score sum/min/max, dominant emotion per answer, flag counts, face stats) and upserts it into
+# a session_reports table. Cohort queries run over a CohortTable: one NumPy column per metric
+# and one row per session, so percentiles, ranks and leaderboards are masks, partitions and
+# sorts over arrays rather than loops over dicts. Rendered report documents are cached under
+# (session_id, version); any new record bumps the version, so nothing needs invalidating.
+# Every upsert gets a new AUTOINCREMENT seq, so sync() picks up rows written by other gunicorn
+# workers with one range query over the primary key.
+#
+#   REPORT_STORE_PATH    SQLite file for the aggregates (defaults to SESSION_STORE_PATH)
+#   REPORT_CACHE_SIZE    rendered reports kept in memory (1024)
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class SessionAggregate:
+    __slots__ = ("session_id", "user_id", "topic", "created_at", "updated_at", "version", "question_count",
+                 "answered", "score_sum", "score_min", "score_max", "emotions", "flags",
+                 "multi_face_frames", "no_face_frames")
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.user_id = None
+        self.topic = None
+        self.created_at = None
+        self.updated_at = None
+        self.version = 0
+        self.question_count = 0
+        self._reset()
+
+    def _reset(self):
+        self.answered = 0
+        self.score_sum = 0
+        self.score_min = None
+        self.score_max = None
+        self.emotions = {}  # dominant emotion per answer -> answers
+        self.flags = {}     # flag -> answers it was raised on
+        self.multi_face_frames = 0
+        self.no_face_frames = 0
+
+    def apply(self, kind, payload, ts):
+        if kind == "created":
+            self.user_id = payload["user_id"]
+            self.topic = payload["topic"]
+            self.question_count = len(payload["questions"])
+            self.created_at = ts
+        elif kind == "answer":
+            score = payload["score"]
+            self.answered += 1
+            self.score_sum += score
+            self.score_min = score if self.score_min is None else min(self.score_min, score)
+            self.score_max = score if self.score_max is None else max(self.score_max, score)
+            summary = payload.get("emotion_summary")
+            if summary and summary["frames"]:
+                dominant = summary["dominant"]
+                self.multi_face_frames += summary["multi_face_frames"]
+                self.no_face_frames += summary["no_face_frames"]
+            else:
+                dominant = payload["emotion"]["emotion"]
+            self.emotions[dominant] = self.emotions.get(dominant, 0) + 1
+            for flag in payload["flags"]:
+                self.flags[flag] = self.flags.get(flag, 0) + 1
+        elif kind == "restart":
+            if "questions" in payload:
+                self.question_count = len(payload["questions"])
+            self._reset()
+        self.version += 1
+        self.updated_at = ts
+
+    @property
+    def completed(self):
+        return self.question_count > 0 and self.answered >= self.question_count
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.answered if self.answered else None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregate = cls(data["session_id"])
+        for name in cls.__slots__:
+            setattr(aggregate, name, data[name])
+        return aggregate
+
+
+class CohortTable:
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.session_ids = []
+        self._rows = {}
+        self._users = {}
+        self._topics = {}
+        self._columns = {
+            "mean_score": np.full(capacity, np.nan, dtype=np.float32),
+            "answered": np.zeros(capacity, dtype=np.int32),
+            "question_count": np.zeros(capacity, dtype=np.int32),
+            "completed": np.zeros(capacity, dtype=bool),
+            "flag_total": np.zeros(capacity, dtype=np.int32),
+            "multi_face_frames": np.zeros(capacity, dtype=np.int32),
+            "created_at": np.zeros(capacity, dtype=np.float64),
+            "user": np.zeros(capacity, dtype=np.int32),
+            "topic": np.zeros(capacity, dtype=np.int32),
+        }
+
+    def __getitem__(self, name):
+        return self._columns[name][:self.size]
+
+    def _row(self, session_id):
+        row = self._rows.get(session_id)
+        if row is None:
+            if self.size == len(self._columns["answered"]):
+                # Capacity doubles, so appending stays amortized O(1)
+                for name, column in self._columns.items():
+                    grown = np.zeros(2 * len(column), dtype=column.dtype)
+                    grown[:len(column)] = column
+                    self._columns[name] = grown
+            row = self._rows[session_id] = self.size
+            self.session_ids.append(session_id)
+            self.size += 1
+        return row
+
+    @staticmethod
+    def _code(codes, value):
+        return codes.setdefault(value, len(codes))
+
+    def update(self, aggregate):
+        row = self._row(aggregate.session_id)
+        columns = self._columns
+        mean = aggregate.mean_score
+        columns["mean_score"][row] = np.nan if mean is None else mean
+        columns["answered"][row] = aggregate.answered
+        columns["question_count"][row] = aggregate.question_count
+        columns["completed"][row] = aggregate.completed
+        columns["flag_total"][row] = sum(aggregate.flags.values())
+        columns["multi_face_frames"][row] = aggregate.multi_face_frames
+        columns["created_at"][row] = aggregate.created_at or 0.0
+        columns["user"][row] = self._code(self._users, aggregate.user_id)
+        columns["topic"][row] = self._code(self._topics, aggregate.topic)
+
+    def mask(self, topic=None, completed_only=True):
+        # Sessions with at least one scored answer, optionally one topic / finished interviews only
+        mask = ~np.isnan(self["mean_score"])
+        if completed_only:
+            mask &= self["completed"]
+        if topic is not None:
+            code = self._topics.get(topic)
+            if code is None:
+                return np.zeros_like(mask)
+            mask &= self["topic"] == code
+        return mask
+
+    def standing(self, session_id, topic=None):
+        row = self._rows.get(session_id)
+        if row is None or np.isnan(self["mean_score"][row]):
+            return None
+        scores = self["mean_score"][self.mask(topic, completed_only=True)]
+        score = self["mean_score"][row]
+        # Compared against finished interviews; an unfinished one is counted in as if it were
+        unfinished = not self["completed"][row]
+        below = int(np.count_nonzero(scores < score))
+        equal = int(np.count_nonzero(scores == score)) + unfinished
+        size = scores.size + unfinished
+        return {"rank": size - below - equal + 1, "of": size,
+                "percentile": round(100.0 * (below + 0.5 * equal) / size, 1)}
+
+    def leaderboard(self, mask, limit):
+        rows = np.flatnonzero(mask)
+        scores = self["mean_score"][rows]
+        if rows.size > limit:
+            # Only the rows that can make the top `limit` get sorted
+            kth = np.partition(scores, rows.size - limit)[rows.size - limit]
+            keep = scores >= kth
+            rows, scores = rows[keep], scores[keep]
+        # Highest mean score first, earlier interview first on ties
+        order = np.lexsort((self["created_at"][rows], -scores))[:limit]
+        # Competition ranking (ties share the better rank); every higher score survived the partition
+        ranks = np.searchsorted(np.sort(-scores), -scores[order], side="left") + 1
+        return rows[order], ranks
+
+    def rows_for_user(self, user_id):
+        code = self._users.get(user_id)
+        if code is None:
+            return np.zeros(0, dtype=np.intp)
+        rows = np.flatnonzero(self["user"] == code)
+        return rows[np.argsort(-self["created_at"][rows], kind="stable")]
+
+
+def render_markdown(report):
+    lines = [f"# Interview Report: {report['user_id']}", "",
+             f"- Topic: {report['topic']}",
+             f"- Answered: {report['answered']} / {report['question_count']}"]
+    if report["mean_score"] is not None:
+        lines.append(f"- Average score: {report['mean_score']:.1f} / 10 "
+                     f"(min {report['score_min']}, max {report['score_max']})")
+    if report["emotions"]:
+        lines.append("- Dominant emotions: " + ", ".join(f"{e} x{n}" for e, n in report["emotions"].items()))
+    if report["flags"]:
+        lines.append("- Flags: " + ", ".join(f"{f} x{n}" for f, n in report["flags"].items()))
+    for item in report["questions"]:
+        lines += ["", f"## Q{item['index'] + 1}: {item['question']}", "",
+                  f"**Score:** {item['score']}/10  ", f"**Emotion:** {item['emotion']}", "",
+                  "**Answer:**", "", item["answer"], "", "**Feedback:**", "", item["feedback"]]
+    return "\n".join(lines) + "\n"
+
+
+class ReportService:
+    def __init__(self, store, path, cache_size=1024):
+        self.store = store
+        self.path = path
+        self.cohort = CohortTable()
+        self._aggregates = {}
+        self._lock = threading.Lock()
+        self._reports = ResultCache(capacity=cache_size)
+        self._synced_seq = 0
+        self.db = open_database(
+            path,
+            "CREATE TABLE IF NOT EXISTS session_reports (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "session_id TEXT NOT NULL UNIQUE, version INTEGER NOT NULL, payload TEXT NOT NULL)",
+        )
+        self.load()
+        store.subscribe(self.on_record)
+
+    def load(self):
+        # Stored aggregates first; sessions recorded before this table existed (or whose last
+        # upsert was lost) are replayed from the event log once and written back
+        self.sync()
+        stale = [sid for sid, version in self.store.versions().items()
+                 if sid not in self._aggregates or self._aggregates[sid].version < version]
+        for session_id in stale:
+            aggregate = SessionAggregate(session_id)
+            for kind, ts, payload in self.store.records(session_id):
+                aggregate.apply(kind, payload, ts)
+            self._save(aggregate)
+            with self._lock:
+                self._remember(aggregate)
+
+    def sync(self):
+        rows = self.db.query("SELECT seq, payload FROM session_reports WHERE seq > ? ORDER BY seq",
+                             (self._synced_seq,))
+        if not rows:
+            return
+        with self._lock:
+            for seq, payload in rows:
+                aggregate = SessionAggregate.from_dict(json.loads(payload))
+                current = self._aggregates.get(aggregate.session_id)
+                if current is None or current.version < aggregate.version:
+                    self._remember(aggregate)
+                self._synced_seq = max(self._synced_seq, seq)
+
+    def _remember(self, aggregate):
+        self._aggregates[aggregate.session_id] = aggregate
+        self.cohort.update(aggregate)
+
+    def _save(self, aggregate):
+        with self.db.lock:
+            seq = self.db.execute(
+                "INSERT OR REPLACE INTO session_reports (session_id, version, payload) VALUES (?, ?, ?)",
+                (aggregate.session_id, aggregate.version, json.dumps(aggregate.to_dict(), separators=(",", ":")))
+            ).lastrowid
+            # Nothing from another worker in between: no need to read our own row back in sync()
+            if seq == self._synced_seq + 1:
+                self._synced_seq = seq
+
+    def on_record(self, state, kind, payload, ts):
+        # The record is already stored; a failure here must not fail the request that wrote it
+        try:
+            with self._lock:
+                aggregate = self._aggregates.get(state.session_id) or SessionAggregate(state.session_id)
+                if aggregate.version != state.version - 1:
+                    # Out of step (another worker wrote records since the last sync): start over
+                    aggregate = SessionAggregate(state.session_id)
+                    for record in self.store.records(state.session_id):
+                        aggregate.apply(*record)
+                else:
+                    aggregate.apply(kind, payload, ts)
+                self._remember(aggregate)
+            self._save(aggregate)
+        except Exception as e:
+            record_error("report_service", e)
+            print("[Report Error]", e)
+
+    def report(self, session_id):
+        with timed("report"):
+            state = self.store.get(session_id)
+            if state is None:
+                return None
+            self.sync()
+            key = f"{session_id}:{state.version}"
+            document = self._reports.get(key)
+            if document is None:
+                document = self._render(state)
+                self._reports.put(key, document)
+            with self._lock:
+                standing = {"overall": self.cohort.standing(session_id),
+                            "topic": self.cohort.standing(session_id, state.topic)}
+            return {**document, "standing": standing}
+
+    def _render(self, state):
+        aggregate = self._aggregates.get(state.session_id)
+        if aggregate is None or aggregate.version != state.version:
+            aggregate = SessionAggregate(state.session_id)
+            for record in self.store.records(state.session_id):
+                aggregate.apply(*record)
+        mean = aggregate.mean_score
+        report = {
+            "session_id": state.session_id,
+            "user_id": state.user_id,
+            "topic": state.topic,
+            "version": state.version,
+            "completed": state.completed,
+            "answered": aggregate.answered,
+            "question_count": aggregate.question_count,
+            "mean_score": None if mean is None else round(mean, 2),
+            "score_min": aggregate.score_min,
+            "score_max": aggregate.score_max,
+            "emotions": aggregate.emotions,
+            "flags": aggregate.flags,
+            "multi_face_frames": aggregate.multi_face_frames,
+            "no_face_frames": aggregate.no_face_frames,
+            "questions": [
+                {"index": i, "question": question, "answer": answer, "feedback": feedback, "score": score,
+                 "emotion": summary["dominant"] if summary and summary["frames"] else emotion["emotion"],
+                 "emotion_summary": summary, "flags": flags}
+                for i, (question, answer, feedback, score, emotion, summary, flags) in enumerate(zip(
+                    state.questions, state.answers, state.feedbacks, state.scores, state.emotions,
+                    state.emotion_summaries, state.flags))
+            ],
+        }
+        report["markdown"] = render_markdown(report)
+        return report
+
+    def cohort_view(self, topic=None, limit=20, completed_only=True):
+        with timed("cohort"):
+            self.sync()
+            with self._lock:
+                cohort = self.cohort
+                mask = cohort.mask(topic, completed_only)
+                scores = cohort["mean_score"][mask]
+                rows, ranks = cohort.leaderboard(mask, limit)
+                leaderboard = [{"rank": int(rank), **self._row_summary(row)} for row, rank in zip(rows, ranks)]
+                sessions = int(scores.size)
+                return {
+                    "topic": topic,
+                    "sessions": sessions,
+                    "mean_score": round(float(scores.mean()), 2) if sessions else None,
+                    "percentiles": ({f"p{p}": round(float(v), 2) for p, v in
+                                     zip(PERCENTILES, np.percentile(scores, PERCENTILES))} if sessions else {}),
+                    "score_histogram": np.bincount(np.rint(scores).astype(np.int64), minlength=11)[:11].tolist(),
+                    "flag_rate": round(float(np.count_nonzero(cohort["flag_total"][mask]) / sessions), 3) if sessions else 0.0,
+                    "topics": sorted(t for t in cohort._topics if t is not None),
+                    "leaderboard": leaderboard,
+                }
+
+    def sessions_for_user(self, user_id):
+        self.sync()
+        with self._lock:
+            return [self._row_summary(row) for row in self.cohort.rows_for_user(user_id)]
+
+    def _row_summary(self, row):
+        aggregate = self._aggregates[self.cohort.session_ids[row]]
+        mean = aggregate.mean_score
+        return {
+            "session_id": aggregate.session_id,
+            "user_id": aggregate.user_id,
+            "topic": aggregate.topic,
+            "created_at": aggregate.created_at,
+            "answered": aggregate.answered,
+            "question_count": aggregate.question_count,
+            "completed": aggregate.completed,
+            "mean_score": None if mean is None else round(mean, 2),
+            "flags": sum(aggregate.flags.values()),
+        }
+
+    def stats(self):
+        return {"sessions": self.cohort.size, "cache": self._reports.stats(), "synced_seq": self._synced_seq}
+
+
+report_service = ReportService(
+    session_store,
+    os.getenv("REPORT_STORE_PATH", session_store.path),
+    cache_size=int(os.getenv("REPORT_CACHE_SIZE", "1024")),
+)
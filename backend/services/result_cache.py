@@ -0,0 +1,79 @@
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from .sqlite_db import open_database
+
+# Memoization for deterministic model output. Keys are a SHA-256 over normalized inputs plus
+# everything that changes the output (model id, backend, generation params). Lookups go to a
+# bounded in-memory LRU first, then to an optional SQLite table that survives restarts.
+
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def cache_key(*parts):
+    payload = json.dumps([normalize_text(p) if isinstance(p, str) else p for p in parts],
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, capacity=4096, sqlite_path=None):
+        self.capacity = capacity
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.sqlite_path = sqlite_path
+        self._db = open_database(
+            sqlite_path,
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)",
+        ) if sqlite_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.short_circuits = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return self._lru[key]
+            row = None
+            if self._db is not None:
+                row = self._db.query_one("SELECT value FROM results WHERE key = ?", (key,))
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                                 (key, json.dumps(value), time.time()))
+
+    def _remember(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "short_circuits": self.short_circuits,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "persistent": self._db is not None,
+        }
@@ -0,0 +1,331 @@
+import os
+import abc
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from .sqlite_db import open_database
+from .emotion_timeline import QuestionAggregate, frame_columns
+
+# Interview progress kept server-side instead of in st.session_state. Every change is an
+# append-only record (created / answer / restart) with a compact JSON payload; the current
+# state is the replay of those records, kept materialized in memory and brought up to date
+# with the records stored since (one indexed query) before every read or append, so gunicorn
+# workers never act on each other's stale state. An append assigns its seq inside the write
+# transaction. The latest live emotion reading, a bounded ring of analyzed frames and the open
+# question's emotion aggregate are stored too (see emotion_timeline), since consecutive
+# readings of one session can land on different workers. Listeners registered
+# with subscribe() see every record after it is applied (the report service keeps its
+# aggregates current this way). Only the most recently used states stay materialized (an
+# evicted one is replayed from its records on next use), and a session's live reading and
+# emotion data are deleted once its last answer is recorded.
+#
+#   SESSION_STORE_PATH          SQLite file for the default store (data/sessions.db)
+#   SESSION_STATE_CACHE         materialized session states kept per worker (1024)
+#   EMOTION_TIMELINE_CAPACITY   frames kept per session (18000, one hour at 5 frames/s)
+
+class SessionConflict(Exception):
+    pass
+
+
+NO_READING = {"emotion": {"emotion": "unknown", "confidence": 0.0}, "flags": []}
+
+
+def _compact(payload):
+    return json.dumps(payload, separators=(",", ":"))
+
+
+class SessionState:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.user_id = None
+        self.topic = None
+        self.created_at = None
+        self.questions = []
+        self.q_index = 0
+        self.scores = []
+        self.feedbacks = []
+        self.answers = []
+        self.emotions = []
+        self.emotion_summaries = []
+        self.flags = []
+        self.version = 0
+
+    def apply(self, kind, payload, ts):
+        if kind == "created":
+            self.user_id = payload["user_id"]
+            self.topic = payload["topic"]
+            self.questions = payload["questions"]
+            self.created_at = ts
+        elif kind == "answer":
+            self.answers.append(payload["answer"])
+            self.feedbacks.append(payload["feedback"])
+            self.scores.append(payload["score"])
+            self.emotions.append(payload["emotion"])
+            self.emotion_summaries.append(payload.get("emotion_summary"))
+            self.flags.append(payload["flags"])
+            self.q_index += 1
+        elif kind == "restart":
+            self.questions = payload.get("questions", self.questions)
+            self.q_index = 0
+            self.scores, self.feedbacks, self.answers, self.emotions, self.flags = [], [], [], [], []
+            self.emotion_summaries = []
+        self.version += 1
+
+    @property
+    def completed(self):
+        return bool(self.questions) and self.q_index >= len(self.questions)
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "topic": self.topic,
+            "questions": self.questions,
+            "q_index": self.q_index,
+            "scores": self.scores,
+            "feedbacks": self.feedbacks,
+            "emotions": self.emotions,
+            "emotion_summaries": self.emotion_summaries,
+            "flags": self.flags,
+            "completed": self.completed,
+            "version": self.version,
+        }
+
+
+class SessionStore(abc.ABC):
+    def __init__(self, timeline_capacity=18000, state_capacity=1024):
+        self._states = OrderedDict()
+        self._state_lock = threading.Lock()
+        self._listeners = []
+        self.timeline_capacity = timeline_capacity
+        self.state_capacity = state_capacity
+
+    @abc.abstractmethod
+    def _transaction(self): ...
+
+    @abc.abstractmethod
+    def _write(self, session_id, seq, kind, ts, payload): ...
+
+    @abc.abstractmethod
+    def _read(self, session_id, after=0): ...
+
+    @abc.abstractmethod
+    def versions(self): ...
+
+    @abc.abstractmethod
+    def _write_live(self, session_id, ts, reading, frames): ...
+
+    @abc.abstractmethod
+    def _read_live(self, session_id): ...
+
+    @abc.abstractmethod
+    def _frame_total(self, session_id): ...
+
+    @abc.abstractmethod
+    def _write_frame(self, session_id, slot, ts, probs, face_count): ...
+
+    @abc.abstractmethod
+    def _read_frames(self, session_id): ...
+
+    @abc.abstractmethod
+    def _read_aggregate(self, session_id): ...
+
+    @abc.abstractmethod
+    def _write_aggregate(self, session_id, data): ...
+
+    @abc.abstractmethod
+    def _delete_aggregate(self, session_id): ...
+
+    @abc.abstractmethod
+    def _delete_live(self, session_id): ...
+
+    def subscribe(self, listener):
+        # listener(state, kind, payload, ts), called once the record is committed, under the state
+        # lock so records arrive in order
+        self._listeners.append(listener)
+
+    def create(self, user_id, topic, questions):
+        session_id = uuid.uuid4().hex
+        self.append(session_id, "created", {"user_id": user_id, "topic": topic, "questions": questions})
+        return self.get(session_id)
+
+    def append(self, session_id, kind, payload, q_index=None):
+        # q_index: the question the caller acted on; a record against a session that has moved on
+        # since raises SessionConflict
+        ts = time.time()
+        with self._state_lock:
+            with self._transaction():
+                # Catching up inside the transaction makes the seq below the stored one plus one,
+                # whichever worker wrote last
+                state = self._refresh(session_id)
+                if state is None:
+                    if kind != "created":
+                        raise KeyError(session_id)
+                    state = self._cache(SessionState(session_id))
+                if q_index is not None and (state.q_index != q_index or state.completed):
+                    raise SessionConflict(f"session is at question {state.q_index}, not {q_index}")
+                if kind == "answer":
+                    # The open question's emotion aggregate closes with its answer
+                    payload = dict(payload, emotion_summary=self._take_aggregate(session_id))
+                elif kind == "restart":
+                    self._delete_aggregate(session_id)
+                seq = state.version + 1
+                self._write(session_id, seq, kind, ts, payload)
+                state.apply(kind, payload, ts)
+                if state.completed:
+                    self._delete_live(session_id)
+            # After COMMIT, so listeners writing to the database never wait on our write lock
+            for listener in self._listeners:
+                listener(state, kind, payload, ts)
+        return state
+
+    def _refresh(self, session_id):
+        state = self._states.get(session_id)
+        records = self._read(session_id, after=state.version if state else 0)
+        if state is None:
+            if not records:
+                return None
+            state = SessionState(session_id)
+        self._cache(state)
+        for kind, ts, payload in records:
+            state.apply(kind, payload, ts)
+        return state
+
+    def _cache(self, state):
+        self._states[state.session_id] = state
+        self._states.move_to_end(state.session_id)
+        while len(self._states) > self.state_capacity:
+            self._states.popitem(last=False)
+        return state
+
+    def get(self, session_id):
+        with self._state_lock:
+            return self._refresh(session_id)
+
+    def records(self, session_id, after=0):
+        # (kind, ts, payload) of every record after seq `after`, in order
+        return self._read(session_id, after)
+
+    # ---------------- LIVE READINGS ---------------- #
+    def push_live(self, session_id, emotion, flags, probs=None, face_count=1):
+        ts = time.time()
+        reading = {"emotion": emotion, "flags": flags}
+        if probs is None:
+            self._write_live(session_id, ts, reading, 0)
+            return
+        probs = probs.astype("float32")
+        with self._transaction():
+            total = self._frame_total(session_id)
+            self._write_frame(session_id, total % self.timeline_capacity, ts, probs, face_count)
+            aggregate = self._aggregate(session_id)
+            aggregate.add(ts, probs, face_count)
+            self._write_aggregate(session_id, aggregate.to_bytes())
+            self._write_live(session_id, ts, reading, 1)
+
+    def latest_live(self, session_id):
+        return self._read_live(session_id) or NO_READING
+
+    def _aggregate(self, session_id):
+        data = self._read_aggregate(session_id)
+        return QuestionAggregate.from_bytes(data) if data else QuestionAggregate()
+
+    def current_question(self, session_id):
+        return self._aggregate(session_id).summary()
+
+    def _take_aggregate(self, session_id):
+        # Aggregate of every frame analyzed while the current question was open; the next
+        # frame starts a new one. Runs inside append's transaction
+        summary = self.current_question(session_id)
+        self._delete_aggregate(session_id)
+        return summary
+
+    def frame_stats(self, session_id):
+        # (frames analyzed so far, frames still in the ring)
+        total = self._frame_total(session_id)
+        return total, min(total, self.timeline_capacity)
+
+    def timeline_columns(self, session_id):
+        # Retained frames in chronological order, as NumPy columns
+        return frame_columns(self._read_frames(session_id))
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.db = open_database(
+            path,
+            "CREATE TABLE IF NOT EXISTS session_events ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, kind TEXT NOT NULL, ts REAL NOT NULL, "
+            "payload TEXT NOT NULL, PRIMARY KEY (session_id, seq)) WITHOUT ROWID",
+            "CREATE TABLE IF NOT EXISTS live_readings ("
+            "session_id TEXT PRIMARY KEY, ts REAL NOT NULL, payload TEXT NOT NULL, frames INTEGER NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS emotion_ring ("
+            "session_id TEXT NOT NULL, slot INTEGER NOT NULL, ts REAL NOT NULL, probs BLOB NOT NULL, "
+            "face_count INTEGER NOT NULL, PRIMARY KEY (session_id, slot)) WITHOUT ROWID",
+            "CREATE TABLE IF NOT EXISTS question_aggregates (session_id TEXT PRIMARY KEY, state BLOB NOT NULL)",
+        )
+
+    def _transaction(self):
+        return self.db.transaction()
+
+    def _write(self, session_id, seq, kind, ts, payload):
+        self.db.execute("INSERT INTO session_events VALUES (?, ?, ?, ?, ?)",
+                        (session_id, seq, kind, ts, _compact(payload)))
+
+    def _read(self, session_id, after=0):
+        rows = self.db.query(
+            "SELECT kind, ts, payload FROM session_events WHERE session_id = ? AND seq > ? ORDER BY seq",
+            (session_id, after)
+        )
+        return [(kind, ts, json.loads(payload)) for kind, ts, payload in rows]
+
+    def versions(self):
+        # Latest seq (== SessionState.version) of every stored session
+        return dict(self.db.query("SELECT session_id, MAX(seq) FROM session_events GROUP BY session_id"))
+
+    def _write_live(self, session_id, ts, reading, frames):
+        self.db.execute(
+            "INSERT INTO live_readings VALUES (?, ?, ?, ?) ON CONFLICT (session_id) DO UPDATE SET "
+            "ts = excluded.ts, payload = excluded.payload, frames = frames + excluded.frames",
+            (session_id, ts, _compact(reading), frames)
+        )
+
+    def _read_live(self, session_id):
+        row = self.db.query_one("SELECT payload FROM live_readings WHERE session_id = ?", (session_id,))
+        return json.loads(row[0]) if row else None
+
+    def _frame_total(self, session_id):
+        row = self.db.query_one("SELECT frames FROM live_readings WHERE session_id = ?", (session_id,))
+        return row[0] if row else 0
+
+    def _write_frame(self, session_id, slot, ts, probs, face_count):
+        self.db.execute("INSERT OR REPLACE INTO emotion_ring VALUES (?, ?, ?, ?, ?)",
+                        (session_id, slot, ts, probs.tobytes(), int(face_count)))
+
+    def _read_frames(self, session_id):
+        return self.db.query("SELECT ts, probs, face_count FROM emotion_ring WHERE session_id = ? ORDER BY ts",
+                             (session_id,))
+
+    def _read_aggregate(self, session_id):
+        row = self.db.query_one("SELECT state FROM question_aggregates WHERE session_id = ?", (session_id,))
+        return row[0] if row else None
+
+    def _write_aggregate(self, session_id, data):
+        self.db.execute("INSERT OR REPLACE INTO question_aggregates VALUES (?, ?)", (session_id, data))
+
+    def _delete_aggregate(self, session_id):
+        self.db.execute("DELETE FROM question_aggregates WHERE session_id = ?", (session_id,))
+
+    def _delete_live(self, session_id):
+        for table in ("live_readings", "emotion_ring", "question_aggregates"):
+            self.db.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+
+session_store = SQLiteSessionStore(
+    os.getenv("SESSION_STORE_PATH", "data/sessions.db"),
+    timeline_capacity=int(os.getenv("EMOTION_TIMELINE_CAPACITY", "18000")),
+    state_capacity=int(os.getenv("SESSION_STATE_CACHE", "1024")),
+)
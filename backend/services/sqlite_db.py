@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Every SQLite file the app writes goes through one Database per path, shared by all the
+# stores in the process: an autocommit connection usable from pool threads, WAL so readers
+# never wait for the writer, and a busy timeout so a write waits out another worker's
+# transaction instead of failing with "database is locked". Connections must not cross
+# fork(), so gunicorn's post_fork calls reopen_all().
+#
+#   SQLITE_BUSY_TIMEOUT_S   how long a write waits for another connection's lock (30)
+
+BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT_S", "30"))
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+class Database:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # Reentrant: statements run inside transaction() from the same thread
+        self.lock = threading.RLock()
+        self.reopen()
+
+    def reopen(self):
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            # IMMEDIATE takes the write lock up front, so no other worker writes between our reads and writes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+
+def open_database(path, *schema):
+    # schema: CREATE ... IF NOT EXISTS statements for the caller's tables
+    key = os.path.abspath(path)
+    with _databases_lock:
+        database = _databases.get(key)
+        if database is None:
+            database = _databases[key] = Database(path)
+    for statement in schema:
+        database.execute(statement)
+    return database
+
+
+def reopen_all():
+    with _databases_lock:
+        for database in _databases.values():
+            database.reopen()
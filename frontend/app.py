@@ -1,8 +1,8 @@
 import streamlit as st
 from pages.face_verify import face_verification_page
 from pages.interview_session import interview_session_page
-#from pages.code_evaluation import code_evaluation_page
-#from pages.final_report import final_report_page
+from pages.code_evaluation import code_evaluation_page
+from pages.final_report import final_report_page
 
 # ------------------ PAGE CONFIG ------------------ #
 st.set_page_config(page_title="AI Interview Platform", layout="centered")
@@ -39,10 +39,10 @@ else:
 
     if page == "Interview Session":
         interview_session_page()
-    #elif page == "Code Evaluation":
-    #    code_evaluation_page()
-    #elif page == "Final Report":
-    #    final_report_page()
+    elif page == "Code Evaluation":
+        code_evaluation_page()
+    elif page == "Final Report":
+        final_report_page()
 
     if st.sidebar.button("Logout"):
         st.session_state.clear()
@@ -0,0 +1,103 @@
+# Frame-delivery jitter of a webrtc-style recv() loop when every sampled frame is posted to a
+# slow backend, comparing a blocking requests.post inside recv() (the old behaviour) with the
+# pooled client behind a drop-oldest BackgroundQueue. A local HTTP server that sleeps --delay
+# seconds per request stands in for the backend, so this runs offline.
+#
+#   cd frontend && python -m benchmarks.frame_jitter --fps 30 --delay 0.5 --seconds 10
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from utils.api_client import ApiClient, BackgroundQueue
+
+
+def slow_backend(delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            body = b'{"status": "ok"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(recv, fps, seconds):
+    # Drives recv() at a fixed frame rate and records when each frame is actually delivered
+    interval = 1.0 / fps
+    deliveries = []
+    next_frame = time.perf_counter()
+    end = next_frame + seconds
+    while next_frame < end:
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+        recv()
+        deliveries.append(time.perf_counter())
+        next_frame += interval
+    gaps = [(b - a) * 1000 for a, b in zip(deliveries, deliveries[1:])]
+    gaps_sorted = sorted(gaps)
+    return {
+        "frames": len(deliveries),
+        "mean_gap_ms": round(statistics.mean(gaps), 2),
+        "jitter_stdev_ms": round(statistics.pstdev(gaps), 2),
+        "p99_gap_ms": round(gaps_sorted[int(len(gaps_sorted) * 0.99) - 1], 2),
+        "max_gap_ms": round(gaps_sorted[-1], 2),
+        "late_frames": sum(gap > 2 * interval * 1000 for gap in gaps),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--delay", type=float, default=0.5, help="stand-in backend latency, seconds")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--send-every", type=int, default=3, help="post every Nth frame")
+    args = parser.parse_args()
+
+    server = slow_backend(args.delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    payload = b"\xff" * 40_000  # roughly a 640x480 JPEG
+
+    counter = {"n": 0}
+
+    def blocking_recv():
+        counter["n"] += 1
+        if counter["n"] % args.send_every == 0:
+            requests.post(f"{url}/analyze_frame/", files={"file": ("frame.jpg", payload, "image/jpeg")}, timeout=30)
+
+    client = ApiClient(url)
+    sender = BackgroundQueue(
+        lambda body: client.post("/analyze_frame/", files={"file": ("frame.jpg", body, "image/jpeg")}),
+        maxlen=1,
+    )
+
+    def queued_recv():
+        counter["n"] += 1
+        if counter["n"] % args.send_every == 0:
+            sender.submit(payload)
+
+    report = {"blocking_post": run(blocking_recv, args.fps, args.seconds)}
+    counter["n"] = 0
+    report["background_queue"] = run(queued_recv, args.fps, args.seconds)
+    report["background_queue"].update(sent=sender.processed, dropped=sender.dropped)
+    sender.close()
+    server.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
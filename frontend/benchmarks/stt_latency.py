@@ -0,0 +1,108 @@
+# Latency of the streaming transcriber on recorded WAV fixtures.
+#
+#   rtf                      engine time / audio duration, feeding as fast as possible (< 1 keeps up)
+#   end_of_speech_delay_ms   real-time feed: wall time from the moment the last voiced audio of an
+#                            utterance was fed until its final text arrived (includes the
+#                            STT_END_SILENCE_MS pause that decides the candidate stopped talking)
+#   first_partial_ms         real-time feed: from speech onset until the first partial text
+#
+#   cd frontend && python -m benchmarks.stt_latency fixtures/*.wav --engine vosk
+
+import argparse
+import json
+import time
+import wave
+import numpy as np
+from utils.transcription import (FRAME_MS, SAMPLE_RATE, StreamingTranscriber, make_engine, make_vad,
+                                 to_pcm16)
+
+
+def read_wav(path):
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        return to_pcm16(samples, f.getframerate(), f.getnchannels())
+
+
+def offline_run(pcm, engine_name, chunk):
+    transcriber = StreamingTranscriber(make_engine(engine_name), make_vad(), threaded=False)
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), chunk):
+        transcriber.feed(pcm[offset:offset + chunk])
+    transcriber.flush()
+    wall = time.perf_counter() - start
+    duration = len(pcm) / SAMPLE_RATE
+    return transcriber, {"audio_seconds": round(duration, 2), "rtf": round(transcriber.engine_seconds / duration, 4),
+                         "wall_rtf": round(wall / duration, 4)}
+
+
+def realtime_run(pcm, engine_name, chunk):
+    # Chunks are fed on the audio clock, the way the webrtc callback delivers them
+    fed_at = {}
+    finals, first_partials = [], {}
+    clock_start = time.perf_counter()
+
+    def on_partial(text):
+        # First partial of each utterance, keyed by the audio time the utterance started
+        first_partials.setdefault(transcriber.utterance_started_at, time.perf_counter() - clock_start)
+
+    def on_final(text, speech_end_audio_s):
+        finals.append((time.perf_counter() - clock_start, speech_end_audio_s, text))
+
+    transcriber = StreamingTranscriber(make_engine(engine_name), make_vad(), on_partial=on_partial,
+                                       on_final=on_final, threaded=True)
+    for offset in range(0, len(pcm), chunk):
+        target = clock_start + offset / SAMPLE_RATE
+        time.sleep(max(0.0, target - time.perf_counter()))
+        fed_at[offset + chunk] = time.perf_counter() - clock_start
+        transcriber.feed(pcm[offset:offset + chunk])
+    transcriber.flush()
+    transcriber.close(timeout=30)
+
+    def fed_time(audio_s):
+        # Wall time at which the chunk containing this audio position was fed
+        end_sample = int(audio_s * SAMPLE_RATE)
+        return min((t for sample, t in fed_at.items() if sample >= end_sample), default=audio_s)
+
+    delays = [(at - fed_time(speech_end)) * 1000 for at, speech_end, _ in finals]
+    partial_delays = [(at - fed_time(onset)) * 1000 for onset, at in sorted(first_partials.items())]
+    return {
+        "utterances": len(finals),
+        "end_of_speech_delay_ms": [round(d, 1) for d in delays],
+        "first_partial_ms": [round(d, 1) for d in partial_delays],
+        "text": " ".join(text for _, _, text in finals),
+        "overruns": transcriber.overruns,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wavs", nargs="+")
+    parser.add_argument("--engine", default=None, help="default: STT_ENGINE")
+    parser.add_argument("--chunk-ms", type=int, default=20, help="webrtc delivers 20 ms frames")
+    parser.add_argument("--no-realtime", action="store_true", help="skip the real-time paced run")
+    args = parser.parse_args()
+
+    chunk = SAMPLE_RATE * args.chunk_ms // 1000
+    report = {"frame_ms": FRAME_MS, "chunk_ms": args.chunk_ms, "fixtures": {}}
+    all_delays = []
+    for path in args.wavs:
+        pcm = read_wav(path)
+        transcriber, result = offline_run(pcm, args.engine, chunk)
+        result["offline_text"] = " ".join(transcriber.finals)
+        if not args.no_realtime:
+            result.update(realtime_run(pcm, args.engine, chunk))
+            all_delays.extend(result["end_of_speech_delay_ms"])
+        report["fixtures"][path] = result
+    if all_delays:
+        report["end_of_speech_delay_ms"] = {
+            "p50": round(float(np.percentile(all_delays, 50)), 1),
+            "p95": round(float(np.percentile(all_delays, 95)), 1),
+            "max": round(max(all_delays), 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,53 @@
-#code_evaluation...
+import streamlit as st
+from utils.helpers import fetch_code_problems, stream_code_evaluation
+
+API_URL = "http://localhost:8000"
+
+def code_evaluation_page():
+    st.title("💻 Code Evaluation")
+
+    problems = fetch_code_problems(API_URL)
+    if not problems:
+        st.error("Could not load coding problems from the server.")
+        return
+
+    titles = {p["title"]: p for p in problems}
+    problem = titles[st.selectbox("Choose a problem", list(titles))]
+    st.markdown(problem["prompt"])
+
+    if problem["examples"]:
+        st.markdown("**Examples:**")
+        for example in problem["examples"]:
+            args = ", ".join(repr(a) for a in example["args"])
+            st.code(f"{problem['entry_point']}({args}) == {example['expected']!r}", language="python")
+
+    code = st.text_area("✍️ Your solution:", value=problem["starter"], height=260,
+                        key=f"code_{problem['problem_id']}")
+
+    if st.button("▶️ Run Tests"):
+        # Rows appear as each test finishes in the sandbox
+        st.markdown("**Results:**")
+        progress = st.progress(0.0)
+        rows = st.container()
+        done = 0
+        for event, data in stream_code_evaluation(problem["problem_id"], code, API_URL,
+                                                  user_id=st.session_state.get("username")):
+            if event == "test":
+                done += 1
+                progress.progress(done / problem["test_count"])
+                label = f"Test {data['index'] + 1}"
+                detail = data["error"] or (f"returned `{data['actual']}`" if "actual" in data else "hidden test")
+                if data["passed"]:
+                    rows.success(f"✅ {label} passed ({data['duration_ms']:.1f} ms)")
+                else:
+                    rows.error(f"❌ {label} failed: {detail}")
+                if data["output"]:
+                    rows.text(data["output"])
+            elif event == "done":
+                progress.progress(1.0)
+                st.metric("Tests Passed", f"{data['passed']} / {data['total']}")
+            elif event == "error":
+                st.error("Your code could not be run:")
+                st.code(data["error"])
+                if data.get("output"):
+                    st.text(data["output"])
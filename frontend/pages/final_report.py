@@ -0,0 +1,98 @@
+import time
+import streamlit as st
+from utils.helpers import fetch_report, fetch_user_reports, fetch_cohort
+
+API_URL = "http://localhost:8000"
+
+# Reports come precomputed from the backend's report service (aggregates kept current as each
+# answer is scored, rendered documents cached per session version), so reruns stay cheap.
+
+def show_report(report):
+    cols = st.columns(3)
+    cols[0].metric("Average Score", f"{report['mean_score']:.1f} / 10" if report["mean_score"] is not None else "-")
+    cols[1].metric("Answered", f"{report['answered']} / {report['question_count']}")
+    standing = report["standing"]["topic"]
+    if standing:
+        cols[2].metric(f"{report['topic']} Percentile", f"{standing['percentile']:.0f}",
+                       help=f"Rank {standing['rank']} of {standing['of']} completed {report['topic']} interviews")
+
+    if report["flags"]:
+        st.markdown("**Flags:**")
+        for flag, count in report["flags"].items():
+            st.warning(f"{flag} (on {count} answer{'s' if count > 1 else ''})")
+
+    for item in report["questions"]:
+        with st.expander(f"Q{item['index'] + 1}: {item['question']}"):
+            st.markdown(f"**Score:** `{item['score']}/10`")
+            summary = item["emotion_summary"]
+            if summary and summary["frames"]:
+                # Aggregated over every frame analyzed while this question was open
+                st.markdown(f"**Emotion:** {summary['dominant'].title()} "
+                            f"(over {summary['frames']} frames, {summary['duration_s']:.0f}s)")
+                st.bar_chart(summary["mean"])
+            else:
+                st.markdown(f"**Emotion:** {item['emotion'].title()}")
+            for flag in item["flags"]:
+                st.warning(flag)
+            st.text(item["feedback"])
+
+    st.download_button(
+        label="📥 Download Report",
+        data=report["markdown"],
+        file_name=f"interview_report_{report['session_id'][:8]}.md",
+        mime="text/markdown",
+        key=f"download_{report['session_id']}_{report['version']}",
+    )
+
+def candidate_reports():
+    sessions = fetch_user_reports(st.session_state.username, API_URL)
+    if not sessions:
+        st.info("No interviews yet. Complete an interview session to see your report here.")
+        return
+    labels = {
+        f"{s['topic']} · {time.strftime('%Y-%m-%d %H:%M', time.localtime(s['created_at']))}"
+        f"{'' if s['completed'] else ' (in progress)'}": s["session_id"]
+        for s in sessions
+    }
+    session_id = labels[st.selectbox("Interview", list(labels))]
+    report = fetch_report(session_id, API_URL)
+    if report is None:
+        st.error("Could not load the report from the server.")
+        return
+    show_report(report)
+
+def cohort_view():
+    cohort = fetch_cohort(API_URL)
+    if cohort is None:
+        st.error("Could not load the cohort from the server.")
+        return
+    topic = st.selectbox("Topic", ["All topics"] + cohort["topics"])
+    limit = st.slider("Leaderboard size", 5, 100, 20)
+    if topic != "All topics" or limit != 20:
+        cohort = fetch_cohort(API_URL, topic=None if topic == "All topics" else topic, limit=limit)
+        if cohort is None:
+            st.error("Could not load the cohort from the server.")
+            return
+    if not cohort["sessions"]:
+        st.info("No completed interviews for this topic yet.")
+        return
+
+    cols = st.columns(3)
+    cols[0].metric("Completed Interviews", cohort["sessions"])
+    cols[1].metric("Mean Score", f"{cohort['mean_score']:.2f}")
+    cols[2].metric("Flagged", f"{cohort['flag_rate'] * 100:.0f}%")
+    st.markdown("**Score percentiles:** " + " · ".join(f"{k}: {v}" for k, v in cohort["percentiles"].items()))
+    st.bar_chart({str(score): count for score, count in enumerate(cohort["score_histogram"])})
+
+    st.markdown("**Leaderboard:**")
+    st.dataframe([{"Rank": row["rank"], "Candidate": row["user_id"], "Topic": row["topic"],
+                   "Average Score": row["mean_score"], "Flags": row["flags"]}
+                  for row in cohort["leaderboard"]], hide_index=True)
+
+def final_report_page():
+    st.title("📊 Final Report")
+    mine, cohort = st.tabs(["My Interviews", "Cohort"])
+    with mine:
+        candidate_reports()
+    with cohort:
+        cohort_view()
@@ -8,8 +8,11 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-from backend.services.interview_bot import generate_questions, evaluate_answer
 from backend.services.emotion_analysis import analyze_emotion  # You must have this service
+from backend.services.question_bank import TOPICS
+from utils.helpers import fetch_questions, evaluate_answer_remote
+
+API_URL = "http://localhost:8000"
 
 # ---- Setup session variables ----
 if "questions" not in st.session_state:
@@ -49,9 +52,9 @@ def interview_bot_page():
 
     # 🎯 Select topic and start interview
     if not st.session_state.questions:
-        topic = st.selectbox("Choose a topic", ["Python", "SQL", "Machine Learning", "Data Structures"])
+        topic = st.selectbox("Choose a topic", TOPICS)
         if st.button("Start Interview"):
-            st.session_state.questions = generate_questions(topic, count=3)
+            st.session_state.questions = fetch_questions(topic, 3, API_URL)
             st.rerun()
         return
 
@@ -75,11 +78,9 @@ def interview_bot_page():
 
         if st.button("Submit Answer"):
             with st.spinner("Evaluating your answer..."):
-                feedback = evaluate_answer(q, answer)
-                st.session_state.feedbacks.append(feedback)
-                score_line = [line for line in feedback.split("\n") if "score" in line.lower()]
-                score = int(''.join(filter(str.isdigit, score_line[0]))) if score_line else 0
-                st.session_state.scores.append(score)
+                evaluation = evaluate_answer_remote(q, answer, API_URL)
+                st.session_state.feedbacks.append(evaluation["feedback"])
+                st.session_state.scores.append(evaluation["score"])
                 st.session_state.q_index += 1
                 st.rerun()
     else:
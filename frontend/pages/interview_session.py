@@ -1,190 +1,193 @@
 import streamlit as st
-from streamlit_webrtc import webrtc_streamer, VideoTransformerBase
+from streamlit_webrtc import webrtc_streamer, VideoTransformerBase, AudioProcessorBase
 import av
-import time
-import cv2
-import threading
-from collections import deque
-import speech_recognition as sr
+import numpy as np
 import os, sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-from backend.services.interview_bot import generate_questions, evaluate_answer
-from deepface import DeepFace
+from backend.services.frame_analysis import analyze_frame
+from backend.services.question_bank import TOPICS
+from utils.frame_sampler import AdaptiveSampler
+from utils.api_client import BackgroundQueue
+from utils.transcription import StreamingTranscriber, to_pcm16
+from utils.helpers import (create_session, get_session, record_answer, stream_evaluation,
+                           push_live_reading, get_live_reading, fetch_report)
+from pages.final_report import show_report
 
-# ---------------- EMOTION QUEUE ---------------- #
-emotion_queue = deque(maxlen=1)
-flag_queue = deque(maxlen=1)
+API_URL = "http://localhost:8000"
 
 # ---------------- VIDEO MONITOR CLASS ---------------- #
+# Readings go to the backend's per-session ring buffers instead of process-wide queues,
+# so concurrent candidates in the same Streamlit process never see each other's emotions.
 class EmotionMonitor(VideoTransformerBase):
-    def __init__(self):
-        self.last_sent_time = 0
-        self.send_interval = 3
-        self.lock = threading.Lock()
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.sampler = AdaptiveSampler(min_interval=0.5, max_interval=3.0)
+        # Analysis and the backend post run on a worker thread so recv() never blocks video delivery
+        self.worker = BackgroundQueue(self._analyze, maxlen=1, name="emotion-monitor")
+
+    def _analyze(self, img):
+        try:
+            # One detection pass gives both the emotion and the face count
+            result = analyze_frame(img)
+            emotion = result["emotion"]["emotion"]
+            confidence = result["emotion"]["confidence"]
+            scores = result["emotion"]["scores"]
+            face_count = result["face_count"]
+
+            flags = []
+            if result["face_count"] > 1:
+                flags.append("⚠️ Multiple faces detected")
+            self.sampler.note_result(result["face_count"])
+        except Exception as e:
+            print("[Frame Analysis Error]", e)
+            emotion, confidence, flags = "unknown", 0.0, ["⚠️ Emotion analysis failed"]
+            scores, face_count = None, 0
+
+        push_live_reading(self.session_id, emotion, confidence, flags, API_URL,
+                          scores=scores, face_count=face_count)
 
     def recv(self, frame):
         img = frame.to_ndarray(format="bgr24")
-        current_time = time.time()
-
-        if current_time - self.last_sent_time > self.send_interval:
-            self.last_sent_time = current_time
-            try:
-                # Emotion detection
-                result = DeepFace.analyze(img, actions=['emotion'], enforce_detection=False)
-                emotion = result[0]['dominant_emotion']
-                confidence = max(result[0]['emotion'].values())
-
-                # Face count for multiple detection
-                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
-                flags = []
-                if len(faces) > 1:
-                    flags.append("⚠️ Multiple faces detected")
-
-                with self.lock:
-                    emotion_queue.append({"emotion": emotion, "confidence": confidence})
-                    flag_queue.append(flags)
-            except Exception as e:
-                print("[DeepFace Error]", e)
-                emotion_queue.append({"emotion": "unknown", "confidence": 0.0})
-                flag_queue.append(["⚠️ Emotion analysis failed"])
-
+        if self.sampler.should_analyze(img):
+            self.worker.submit(img)
         return av.VideoFrame.from_ndarray(img, format="bgr24")
 
+    def on_ended(self):
+        self.worker.close()
+
 # ---------------- SPEECH RECOGNITION ---------------- #
-def record_audio():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("🎤 Speak now...")
-        audio = r.listen(source, timeout=5)
-    try:
-        text = r.recognize_google(audio)
-        st.success("✅ Speech recognized.")
-        return text
-    except Exception as e:
-        st.error(f"Speech recognition failed: {e}")
-        return ""
+# The browser's microphone arrives over webrtc in ~20 ms frames; recv() only converts and
+# enqueues them, transcription runs locally on the transcriber's worker thread.
+class SpeechCapture(AudioProcessorBase):
+    def __init__(self):
+        self.transcriber = StreamingTranscriber()
+
+    def recv(self, frame):
+        samples = frame.to_ndarray()
+        channels = len(frame.layout.channels)
+        interleaved = samples.T.ravel() if frame.format.is_planar else samples.ravel()
+        self.transcriber.feed(to_pcm16(interleaved, frame.sample_rate, channels))
+        # Send back silence so the candidate doesn't hear themselves
+        silent = av.AudioFrame.from_ndarray(np.zeros_like(samples), format=frame.format.name, layout=frame.layout.name)
+        silent.sample_rate, silent.pts, silent.time_base = frame.sample_rate, frame.pts, frame.time_base
+        return silent
+
+    def on_ended(self):
+        self.transcriber.flush()
+        self.transcriber.close()
+
+def _use_transcript(text_key, transcriber):
+    st.session_state[text_key] = transcriber.text()
+
+# Re-runs on its own every half second, so partial text shows while the candidate is still speaking
+@st.fragment(run_every=0.5)
+def transcript_panel(speech_ctx, text_key):
+    processor = speech_ctx.audio_processor if speech_ctx and speech_ctx.state.playing else None
+    if processor is None:
+        st.caption("Press START above to answer by voice.")
+        return
+    transcriber = processor.transcriber
+    text = transcriber.text()
+    st.markdown(("🔴 " if transcriber.speaking else "🎙 ") + (text or "_Listening..._"))
+    if transcriber.overruns:
+        st.caption(f"⚠️ Transcription is running behind the microphone ({transcriber.overruns} stalls)")
+    if st.button("📝 Use transcript", key=f"use_{text_key}", disabled=not text,
+                 on_click=_use_transcript, args=(text_key, transcriber)):
+        st.rerun()
 
 # ---------------- MAIN PAGE FUNCTION ---------------- #
 def interview_session_page():
     st.title("🎤 Interview Session with Live Emotion Monitoring")
 
-    # State init
-    defaults = {
-        "questions": [],
-        "q_index": 0,
-        "scores": [],
-        "feedbacks": [],
-        "emotions": [],
-        "flags": [],
-        "last_emotion": {"emotion": "unknown", "confidence": 0.0}
-    }
-    for k, v in defaults.items():
-        if k not in st.session_state:
-            st.session_state[k] = v
+    # Only the session id lives in Streamlit; progress is stored by the backend
+    session_id = st.session_state.get("interview_session_id")
 
     # Restart button
     if st.button("🔁 Restart Interview"):
-        for key in defaults:
-            st.session_state[key] = [] if isinstance(defaults[key], list) else defaults[key]
+        st.session_state.interview_session_id = None
         st.rerun()
 
     # Start logic
-    if not st.session_state.questions:
-        topic = st.selectbox("Choose a topic", ["Python", "SQL", "Machine Learning", "Data Structures"])
+    if not session_id:
+        topic = st.selectbox("Choose a topic", TOPICS)
         if st.button("Start Interview"):
-            st.session_state.questions = generate_questions(topic, count=3)
-            st.session_state.q_index = 0
-            st.session_state.scores.clear()
-            st.session_state.feedbacks.clear()
-            st.session_state.emotions.clear()
-            st.session_state.flags.clear()
+            session = create_session(st.session_state.username, topic, API_URL, count=3)
+            if not session:
+                st.error("Could not load questions from the server. Please try again.")
+                return
+            st.session_state.interview_session_id = session["session_id"]
             st.rerun()
         return
 
+    session = get_session(session_id, API_URL)
+    if session is None:
+        st.error("Could not load your interview session from the server.")
+        return
+
     # Webcam stream
     st.markdown("### 👁 Emotion Monitoring (Live)")
     webrtc_streamer(
         key="emotion-analyzer",
-        video_processor_factory=EmotionMonitor,
+        video_processor_factory=lambda: EmotionMonitor(session_id),
         media_stream_constraints={"video": True, "audio": False},
         async_processing=True,
     )
 
-    # Live emotion readout
-    if emotion_queue:
-        current_emo = emotion_queue[-1]
-        st.session_state.last_emotion = current_emo
+    # Live emotion readout and suspicious flags
+    live = get_live_reading(session_id, API_URL)
+    if live:
+        current_emo = live["emotion"]
         st.markdown(f"**Detected Emotion:** `{current_emo['emotion']}` ({current_emo['confidence']:.1f}%)")
-
-    # Suspicious flags
-    if flag_queue and flag_queue[-1]:
-        for flag in flag_queue[-1]:
+        for flag in live["flags"]:
             st.warning(flag)
 
     # Interview questions loop
-    if st.session_state.q_index < len(st.session_state.questions):
-        idx = st.session_state.q_index
-        q = st.session_state.questions[idx]
+    if not session["completed"]:
+        idx = session["q_index"]
+        q = session["questions"][idx]
 
         st.subheader(f"Question {idx + 1}")
         st.info(q)
 
-        text_answer = st.text_area("✍️ Type your answer:",key=f"text_{idx}",value=st.session_state.get(f"mic_answer_{idx}", ""))
-
-        mic_col, submit_col = st.columns([1, 2])
-
-        with mic_col:
-            if st.button("🎙 Use Microphone"):
-                mic_answer = record_audio()
-                st.session_state[f"mic_answer_{idx}"] = mic_answer
-                st.experimental_rerun()
-
-        with submit_col:
-            if st.button("✅ Submit Answer"):
-                final_answer = st.session_state.get(f"text_{idx}", text_answer)
-                with st.spinner("Evaluating your answer..."):
-                    feedback = evaluate_answer(q, final_answer)
-                    print("Feedback:", feedback)
-
-                    score_line = [line for line in feedback.split("\n") if "score" in line.lower()]
-                    score = int(''.join(filter(str.isdigit, score_line[0]))) if score_line else 0
-
-                    st.session_state.feedbacks.append(feedback)
-                    st.session_state.scores.append(score)
-                    st.session_state.emotions.append(st.session_state.last_emotion.copy())
-                    st.session_state.flags.append(flag_queue[-1] if flag_queue else [])
-                    st.session_state.q_index += 1
-                    st.rerun()
+        text_answer = st.text_area("✍️ Type your answer:", key=f"text_{idx}")
+
+        with st.expander("🎙 Answer by voice"):
+            speech_ctx = webrtc_streamer(
+                key=f"speech-{idx}",
+                audio_processor_factory=SpeechCapture,
+                media_stream_constraints={"video": False, "audio": True},
+                async_processing=True,
+            )
+            transcript_panel(speech_ctx, f"text_{idx}")
+
+        if st.button("✅ Submit Answer"):
+            final_answer = st.session_state.get(f"text_{idx}", text_answer)
+            # Feedback is rendered token by token as the server streams it
+            st.markdown("**Feedback:**")
+            placeholder = st.empty()
+            feedback = ""
+            for event, data in stream_evaluation(q, final_answer, API_URL):
+                if event == "token":
+                    feedback += data
+                    placeholder.markdown(feedback + "▌")
+                elif event == "done":
+                    feedback = data["feedback"]
+                    placeholder.markdown(feedback)
+                elif event == "error":
+                    st.error(f"Evaluation failed: {data['error']}")
+                    return
+
+            if record_answer(session_id, idx, final_answer, API_URL) is None:
+                st.error("Could not save your answer. Please submit again.")
+                return
+            st.rerun()
 
     else:
-        # Completion screen
+        # Completion screen: the report is aggregated and rendered by the backend, once per session version
         st.success("✅ Interview Completed!")
-        avg_score = sum(st.session_state.scores) / len(st.session_state.scores)
-        st.metric("Average Score", f"{avg_score:.1f} / 10")
-
-        for i, (q, fb, emo, score, flags) in enumerate(zip(
-            st.session_state.questions,
-            st.session_state.feedbacks,
-            st.session_state.emotions,
-            st.session_state.scores,
-            st.session_state.flags
-        )):
-            with st.expander(f"Q{i+1}: {q}"):
-                st.markdown(f"**Score:** `{score}/10`")
-                st.markdown(f"**Emotion:** {emo['emotion'].title()} ({emo['confidence']:.1f}%)")
-                if flags:
-                    st.markdown("**Flags:**")
-                    for flag in flags:
-                        st.warning(flag)
-                st.text(fb)
-
-        # Download feedback
-        st.download_button(
-            label="📥 Download Feedback",
-            data="\n\n".join(st.session_state.feedbacks),
-            file_name="interview_feedback.txt",
-            mime="text/plain"
-        )
+        report = fetch_report(session_id, API_URL)
+        if report is None:
+            st.error("Could not load your report from the server.")
+            return
+        show_report(report)
@@ -2,55 +2,86 @@ import streamlit as st
 from streamlit_webrtc import webrtc_streamer, VideoTransformerBase
 import av
 import cv2
-import requests
-import time
+import json
+import threading
+import websocket
+from utils.frame_sampler import AdaptiveSampler
+from utils.api_client import BackgroundQueue
 
 API_URL = "http://localhost:8000"
+WS_URL = API_URL.replace("http", "ws", 1)
 
 class VideoAnalyzer(VideoTransformerBase):
-    def __init__(self):
-        self.last_sent_time = 0
-        self.send_interval = 3  # seconds
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.sampler = AdaptiveSampler(min_interval=0.25, max_interval=3.0)
+        self.last_analysis = None
+        self.ws = None
+        self.lock = threading.Lock()
+        # Drop-oldest queue of size 1: a slow backend only ever costs us stale frames
+        self.sender = BackgroundQueue(self._send_frame, maxlen=1, name="frame-sender")
 
-    def recv(self, frame):
-        img = frame.to_ndarray(format="bgr24")
+    def _connect(self):
+        # One persistent socket per session; results arrive on a background reader thread
+        self.ws = websocket.create_connection(f"{WS_URL}/ws/monitor/{self.user_id}", timeout=5)
+        threading.Thread(target=self._read_results, args=(self.ws,), daemon=True).start()
 
-        current_time = time.time()
-        if current_time - self.last_sent_time > self.send_interval:
-            self.last_sent_time = current_time
+    def _read_results(self, ws):
+        try:
+            while True:
+                message = json.loads(ws.recv())
+                if message["type"] == "result":
+                    result = message["result"]
+                    with self.lock:
+                        self.last_analysis = {"status": "completed", "result": result}
+                    self.sampler.note_result(result["face_count"])
+        except Exception as e:
+            print(f"Monitor stream closed: {e}")
+            if self.ws is ws:
+                self.ws = None
 
-            _, buffer = cv2.imencode(".jpg", img)
-            jpg_bytes = buffer.tobytes()
+    def _send_frame(self, img):
+        # Runs on the sender thread: JPEG encoding and network I/O never touch recv()
+        _, buffer = cv2.imencode(".jpg", img)
+        try:
+            if self.ws is None:
+                self._connect()
+            self.ws.send_binary(buffer.tobytes())
+        except Exception as e:
+            print(f"Error sending frame: {e}")
+            self.ws = None
 
-            try:
-                response = requests.post(
-                    f"{API_URL}/analyze_frame/",
-                    files={"file": ("frame.jpg", jpg_bytes, "image/jpeg")},
-                    data={"user_id": st.session_state.username}
-                )
-                if response.status_code == 200:
-                    st.session_state.last_analysis = response.json()
-            except Exception as e:
-                print(f"Error sending frame: {e}")
+    def recv(self, frame):
+        img = frame.to_ndarray(format="bgr24")
+
+        if self.sampler.should_analyze(img):
+            self.sender.submit(img)
 
         return av.VideoFrame.from_ndarray(img, format="bgr24")
 
+    def on_ended(self):
+        self.sender.close()
+        if self.ws is not None:
+            self.ws.close()
+            self.ws = None
+
 def live_analysis_page():
     st.subheader("🎥 Live Interview Monitoring")
 
-    if "last_analysis" not in st.session_state:
-        st.session_state.last_analysis = None
-
-    st.info("👁 Webcam feed is live. Analysis runs every few seconds.")
+    user_id = st.session_state.username
+    st.info("👁 Webcam feed is live. Frames are analyzed whenever the scene changes.")
 
-    webrtc_streamer(
+    ctx = webrtc_streamer(
         key="live-monitor",
-        video_processor_factory=VideoAnalyzer,
+        video_processor_factory=lambda: VideoAnalyzer(user_id),
         media_stream_constraints={"video": True, "audio": False},
         async_processing=True,
     )
 
-    result = st.session_state.last_analysis
+    result = None
+    if ctx.video_processor:
+        with ctx.video_processor.lock:
+            result = ctx.video_processor.last_analysis
     if result:
         st.markdown("### 🧠 Latest Analysis")
         if not result["result"]["detections"]:
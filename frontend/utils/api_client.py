@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP client for backend calls: one keep-alive connection pool per backend URL,
+# default timeouts, and bounded retries (connection errors for every method, 502/503/504
+# only for idempotent ones so an answer is never submitted twice).
+
+class ApiClient:
+    def __init__(self, base_url, pool_size=16, connect_timeout=3.0, read_timeout=30.0, retries=2):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries, connect=retries, read=0, status=retries,
+            backoff_factor=0.2, status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+            respect_retry_after_header=True, raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, timeout=None, **kwargs):
+        timeout = timeout if timeout is not None else self.timeout
+        return self.session.request(method, f"{self.base_url}{path}", timeout=timeout, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def client_for(base_url):
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _clients[base_url] = ApiClient(base_url)
+        return client
+
+
+# Fire-and-forget work queue for video callbacks: submit() never blocks, a single worker
+# thread drains the queue, and when the worker falls behind the oldest pending item is
+# dropped so only the freshest frames are sent. With block=True nothing is dropped: submit()
+# waits for room instead (backpressure), and `stalls` counts the submits that had to wait.
+
+class BackgroundQueue:
+    def __init__(self, handler, maxlen=2, name="background-queue", block=False):
+        self.handler = handler
+        self.block = block
+        self._items = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._drain = False
+        self.submitted = 0
+        self.dropped = 0
+        self.stalls = 0
+        self.processed = 0
+        self.failed = 0
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        with self._cond:
+            if self.block and len(self._items) == self._items.maxlen and not self._closed:
+                self.stalls += 1
+                while len(self._items) == self._items.maxlen and not self._closed:
+                    self._cond.wait()
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self.submitted += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._items and not self._closed:
+                    self._cond.wait()
+                if self._closed and not (self._drain and self._items):
+                    return
+                item = self._items.popleft()
+                if self.block:
+                    self._cond.notify_all()
+            try:
+                self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"[BackgroundQueue] {e}")
+
+    def join(self, timeout=None):
+        self._worker.join(timeout)
+
+    def close(self, drain=False):
+        # drain=True lets the worker finish what is already queued before it exits
+        with self._cond:
+            self._closed = True
+            self._drain = drain
+            self._cond.notify_all()
@@ -0,0 +1,56 @@
+import time
+import cv2
+import numpy as np
+
+# Cheap pre-filter in front of expensive frame analysis. Each candidate frame is reduced to a
+# tiny grayscale thumbnail and compared with the last analyzed one; a frame is only analyzed
+# when the scene changed meaningfully or the current interval has elapsed. The interval drops
+# to min_interval on motion or when the analysis result changes (e.g. face count) and backs
+# off towards max_interval while the scene stays static.
+
+class AdaptiveSampler:
+    def __init__(self, min_interval=0.25, max_interval=3.0, change_threshold=8.0,
+                 backoff=1.5, thumb_size=(32, 24)):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.change_threshold = change_threshold
+        self.backoff = backoff
+        self.thumb_size = thumb_size
+        self.interval = min_interval
+        self.last_checked = 0.0
+        self.last_analyzed = 0.0
+        self.last_thumb = None
+        self.last_signature = None
+
+    def _thumbnail(self, img):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        return cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def should_analyze(self, img, now=None):
+        now = time.time() if now is None else now
+        if now - self.last_checked < self.min_interval:
+            return False
+        self.last_checked = now
+
+        thumb = self._thumbnail(img)
+        if self.last_thumb is None:
+            changed = True
+        else:
+            changed = float(np.abs(thumb - self.last_thumb).mean()) >= self.change_threshold
+
+        if changed:
+            self.interval = self.min_interval
+        elif now - self.last_analyzed < self.interval:
+            return False
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+        self.last_thumb = thumb
+        self.last_analyzed = now
+        return True
+
+    def note_result(self, signature):
+        # Speed up sampling when the analysis outcome changes, e.g. a second face appears
+        if self.last_signature is not None and signature != self.last_signature:
+            self.interval = self.min_interval
+        self.last_signature = signature
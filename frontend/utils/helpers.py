@@ -1,5 +1,7 @@
 import base64
-import requests
+import json
+import time
+from utils.api_client import client_for
 
 def encode_image(file):
     return base64.b64encode(file.read()).decode("utf-8")
@@ -11,7 +13,146 @@ def send_verification_request(user_id, registered_b64, captured_b64, api_url):
         "captured_image": captured_b64
     }
     try:
-        res = requests.post(f"{api_url}/verify_face/", json=payload, timeout=30)
+        res = client_for(api_url).post("/verify_face/", json=payload)
         return res.json() if res.status_code == 200 else {"status": "error", "message": res.text}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+def fetch_questions(topic, count, api_url, difficulty="beginner"):
+    try:
+        res = client_for(api_url).get("/questions/", params={"topic": topic, "count": count, "difficulty": difficulty}, timeout=(3, 120))
+        return res.json()["questions"] if res.status_code == 200 else []
+    except Exception as e:
+        print("[Question Fetch Error]", e)
+        return []
+
+def evaluate_answer_remote(question, answer, api_url, timeout=300):
+    # Submit to the batched evaluation queue, then long-poll until the job finishes
+    try:
+        res = client_for(api_url).post("/evaluate/", json={"question": question, "answer": answer})
+        if res.status_code != 202:
+            return {"status": "error", "feedback": res.text, "score": 0}
+        job = res.json()
+        deadline = time.time() + timeout
+        while job["status"] in ("queued", "running") and time.time() < deadline:
+            res = client_for(api_url).get(f"/evaluate/{job['job_id']}", params={"wait": 25}, timeout=(3, 35))
+            job = res.json()
+        if job["status"] != "done":
+            return {"status": "error", "feedback": job.get("error") or "Evaluation timed out", "score": 0}
+        return job
+    except Exception as e:
+        return {"status": "error", "feedback": str(e), "score": 0}
+
+def stream_evaluation(question, answer, api_url):
+    # Yields ("token", text) while feedback is generated, then ("done", {"feedback", "score"})
+    try:
+        with client_for(api_url).post("/evaluate/stream/", json={"question": question, "answer": answer},
+                                      stream=True, timeout=(5, 300)) as res:
+            if res.status_code != 200:
+                yield "error", {"error": res.text}
+                return
+            event = None
+            for line in res.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    yield event, json.loads(line[len("data: "):])
+    except Exception as e:
+        yield "error", {"error": str(e)}
+
+# ---------------- INTERVIEW SESSIONS ---------------- #
+def create_session(user_id, topic, api_url, count=3):
+    try:
+        res = client_for(api_url).post("/sessions/", json={"user_id": user_id, "topic": topic, "count": count}, timeout=(3, 120))
+        return res.json() if res.status_code == 200 else None
+    except Exception as e:
+        print("[Session Error]", e)
+        return None
+
+def get_session(session_id, api_url):
+    try:
+        res = client_for(api_url).get(f"/sessions/{session_id}", timeout=(3, 10))
+        return res.json() if res.status_code == 200 else None
+    except Exception as e:
+        print("[Session Error]", e)
+        return None
+
+def record_answer(session_id, q_index, answer, api_url):
+    # The backend evaluates and scores the answer itself (a cache hit after stream_evaluation);
+    # q_index is the question answered, so a resubmit after the session moved on is rejected
+    try:
+        res = client_for(api_url).post(f"/sessions/{session_id}/answers",
+                                       json={"answer": answer, "q_index": q_index}, timeout=(3, 300))
+        return res.json() if res.status_code == 200 else None
+    except Exception as e:
+        print("[Session Error]", e)
+        return None
+
+def push_live_reading(session_id, emotion, confidence, flags, api_url, scores=None, face_count=1):
+    try:
+        client_for(api_url).post(f"/sessions/{session_id}/live",
+                                 json={"emotion": emotion, "confidence": confidence, "flags": flags,
+                                       "scores": scores or {}, "face_count": face_count}, timeout=(1, 2))
+    except Exception as e:
+        print("[Live Reading Error]", e)
+
+def get_live_reading(session_id, api_url):
+    try:
+        res = client_for(api_url).get(f"/sessions/{session_id}/live", timeout=(1, 5))
+        return res.json() if res.status_code == 200 else None
+    except Exception as e:
+        print("[Live Reading Error]", e)
+        return None
+
+# ---------------- CODE EVALUATION ---------------- #
+def fetch_code_problems(api_url):
+    try:
+        res = client_for(api_url).get("/code/problems/")
+        return res.json() if res.status_code == 200 else []
+    except Exception as e:
+        print("[Code Problems Error]", e)
+        return []
+
+def stream_code_evaluation(problem_id, code, api_url, user_id=None):
+    # Yields ("test", result) per test case as the sandbox finishes it, then ("done", totals) or ("error", details)
+    try:
+        with client_for(api_url).post("/code/evaluate/stream/",
+                                      json={"problem_id": problem_id, "code": code, "user_id": user_id},
+                                      stream=True, timeout=(5, 120)) as res:
+            if res.status_code != 200:
+                yield "error", {"error": res.text}
+                return
+            event = None
+            for line in res.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    yield event, json.loads(line[len("data: "):])
+    except Exception as e:
+        yield "error", {"error": str(e)}
+
+# ---------------- REPORTS ---------------- #
+def fetch_report(session_id, api_url):
+    try:
+        res = client_for(api_url).get(f"/reports/{session_id}", timeout=(3, 10))
+        return res.json() if res.status_code == 200 else None
+    except Exception as e:
+        print("[Report Error]", e)
+        return None
+
+def fetch_user_reports(user_id, api_url):
+    try:
+        res = client_for(api_url).get("/reports/", params={"user_id": user_id}, timeout=(3, 10))
+        return res.json() if res.status_code == 200 else []
+    except Exception as e:
+        print("[Report Error]", e)
+        return []
+
+def fetch_cohort(api_url, topic=None, limit=20, completed_only=True):
+    try:
+        res = client_for(api_url).get("/reports/cohort/", params={"topic": topic, "limit": limit,
+                                                                    "completed_only": completed_only}, timeout=(3, 10))
+        return res.json() if res.status_code == 200 else None
+    except Exception as e:
+        print("[Report Error]", e)
+        return None
@@ -0,0 +1,257 @@
+import os
+import abc
+import json
+import time
+import threading
+from collections import deque
+import numpy as np
+from utils.api_client import BackgroundQueue
+
+# Streaming speech-to-text on the local CPU. Audio arrives in small chunks (from the browser
+# via webrtc, or from a WAV file), is cut into 30 ms frames and gated by voice-activity
+# detection: only voiced frames, plus a short pre-roll and the trailing pause, ever reach the
+# engine, so silence is never transcribed. While the candidate speaks the engine's partial
+# hypothesis is published; END_SILENCE_MS of silence closes the utterance and yields its final
+# text. Engines are pluggable (see ENGINES); all run offline.
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+STT_ENGINE = os.getenv("STT_ENGINE", "vosk")
+END_SILENCE_MS = int(os.getenv("STT_END_SILENCE_MS", "600"))
+PREROLL_MS = int(os.getenv("STT_PREROLL_MS", "300"))
+PARTIAL_INTERVAL_MS = int(os.getenv("STT_PARTIAL_INTERVAL_MS", "200"))
+
+
+def to_pcm16(samples, sample_rate, channels=1):
+    # Any int16/float array (interleaved if multi-channel) -> 16 kHz mono int16
+    samples = np.asarray(samples)
+    if samples.dtype != np.int16:
+        samples = np.clip(samples.astype(np.float32) * (32767 if np.abs(samples).max(initial=0) <= 1.0 else 1),
+                          -32768, 32767).astype(np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if sample_rate != SAMPLE_RATE and len(samples):
+        positions = np.arange(0, len(samples), sample_rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples.ravel()
+
+
+# ---------------- VOICE ACTIVITY DETECTION ---------------- #
+
+class EnergyVAD:
+    # Fallback when webrtcvad isn't installed: a frame is voiced when its RMS is well above an
+    # adaptive noise floor (tracked on unvoiced frames only) and above an absolute minimum
+    def __init__(self, ratio=3.0, min_rms=200.0, adapt=0.05):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.adapt = adapt
+        self.noise_floor = min_rms / ratio
+
+    def is_speech(self, frame):
+        rms = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2)))
+        voiced = rms > max(self.noise_floor * self.ratio, self.min_rms)
+        if not voiced:
+            self.noise_floor += self.adapt * (rms - self.noise_floor)
+        return voiced
+
+
+class WebRtcVAD:
+    def __init__(self, aggressiveness=2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame):
+        return self.vad.is_speech(frame.tobytes(), SAMPLE_RATE)
+
+
+def make_vad():
+    try:
+        return WebRtcVAD(int(os.getenv("STT_VAD_AGGRESSIVENESS", "2")))
+    except ImportError:
+        return EnergyVAD()
+
+
+# ---------------- ENGINES ---------------- #
+
+class TranscriptionEngine(abc.ABC):
+    # One utterance at a time: start(), accept() per voiced frame (returns the current partial
+    # text or None), finish() returns the final text
+    @abc.abstractmethod
+    def start(self): ...
+
+    @abc.abstractmethod
+    def accept(self, pcm): ...
+
+    @abc.abstractmethod
+    def finish(self): ...
+
+
+class VoskEngine(TranscriptionEngine):
+    # Kaldi streaming recognizer; the model (~50 MB for the small English one) loads once per process
+    _model = None
+    _model_lock = threading.Lock()
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
+        self._recognizer = None
+        self._done = []
+
+    def _load(self):
+        with VoskEngine._model_lock:
+            if VoskEngine._model is None:
+                from vosk import Model, SetLogLevel
+                SetLogLevel(-1)
+                VoskEngine._model = Model(self.model_path)
+            return VoskEngine._model
+
+    def start(self):
+        from vosk import KaldiRecognizer
+        self._recognizer = KaldiRecognizer(self._load(), SAMPLE_RATE)
+        self._done = []
+
+    def accept(self, pcm):
+        if self._recognizer.AcceptWaveform(pcm.tobytes()):
+            # Vosk found an endpoint inside the utterance; keep that piece and carry on
+            text = json.loads(self._recognizer.Result())["text"]
+            if text:
+                self._done.append(text)
+            return " ".join(self._done)
+        partial = json.loads(self._recognizer.PartialResult())["partial"]
+        return " ".join(self._done + [partial] if partial else self._done)
+
+    def finish(self):
+        text = json.loads(self._recognizer.FinalResult())["text"]
+        return " ".join(self._done + [text] if text else self._done)
+
+
+ENGINES = {"vosk": VoskEngine}
+
+
+def make_engine(name=None):
+    name = name or STT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown STT engine '{name}', expected one of {sorted(ENGINES)}")
+    return ENGINES[name]()
+
+
+# ---------------- STREAMING TRANSCRIBER ---------------- #
+
+class StreamingTranscriber:
+    def __init__(self, engine=None, vad=None, on_partial=None, on_final=None, threaded=True):
+        self.engine = engine or make_engine()
+        self.vad = vad or make_vad()
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.finals = []
+        self.partial = ""
+        self.speaking = False
+        self.utterance_started_at = 0.0
+        self.audio_seconds = 0.0
+        self.engine_seconds = 0.0
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._preroll = deque(maxlen=max(1, PREROLL_MS // FRAME_MS))
+        self._silent_frames = 0
+        self._voiced_run = 0
+        self._last_voiced_at = 0.0
+        self._last_partial = 0.0
+        self._lock = threading.Lock()
+        # Capture callbacks only enqueue; VAD and decoding happen on this worker thread. Audio is
+        # never dropped: when decoding falls ~10 s behind, feed() blocks until it catches up
+        self._worker = BackgroundQueue(self._process, maxlen=512, name="transcriber", block=True) if threaded else None
+
+    def feed(self, pcm):
+        # pcm: 16 kHz mono int16 (see to_pcm16); any chunk length
+        if self._worker is not None:
+            self._worker.submit(pcm)
+        else:
+            self._process(pcm)
+
+    @property
+    def overruns(self):
+        # feed() calls that had to wait for the worker (the engine is slower than real time)
+        return self._worker.stalls if self._worker is not None else 0
+
+    def text(self):
+        with self._lock:
+            return " ".join(self.finals + ([self.partial] if self.partial else []))
+
+    def close(self, timeout=0):
+        # Queued audio is still transcribed; timeout > 0 waits for that to finish
+        if self._worker is not None:
+            self._worker.close(drain=True)
+            if timeout:
+                self._worker.join(timeout)
+
+    def flush(self):
+        # End of input (stream stopped, end of a WAV file): closes any open utterance
+        if self._worker is not None:
+            self._worker.submit(None)
+        else:
+            self._process(None)
+
+    def _process(self, pcm):
+        if pcm is None:
+            if self.speaking:
+                self._end_utterance()
+            return
+        self._pending = np.concatenate([self._pending, pcm])
+        usable = len(self._pending) - len(self._pending) % FRAME_SAMPLES
+        for start in range(0, usable, FRAME_SAMPLES):
+            self._frame(self._pending[start:start + FRAME_SAMPLES])
+        self._pending = self._pending[usable:]
+
+    def _frame(self, frame):
+        self.audio_seconds += FRAME_MS / 1000
+        voiced = self.vad.is_speech(frame)
+        if not self.speaking:
+            self._preroll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            # Two voiced frames in a row open an utterance; the pre-roll keeps its first syllable
+            if self._voiced_run >= 2:
+                self.speaking = True
+                self.utterance_started_at = self.audio_seconds - len(self._preroll) * FRAME_MS / 1000
+                self._silent_frames = 0
+                self._timed(self.engine.start)
+                for buffered in self._preroll:
+                    self._accept(buffered)
+                self._preroll.clear()
+            return
+
+        self._accept(frame)
+        if voiced:
+            self._silent_frames = 0
+            self._last_voiced_at = self.audio_seconds
+            return
+        self._silent_frames += 1
+        if self._silent_frames * FRAME_MS >= END_SILENCE_MS:
+            self._end_utterance()
+
+    def _accept(self, frame):
+        partial = self._timed(self.engine.accept, frame)
+        now = time.perf_counter()
+        if partial is not None and (now - self._last_partial) * 1000 >= PARTIAL_INTERVAL_MS:
+            self._last_partial = now
+            with self._lock:
+                self.partial = partial
+            if self.on_partial:
+                self.on_partial(partial)
+
+    def _end_utterance(self):
+        text = self._timed(self.engine.finish).strip()
+        self.speaking = False
+        self._voiced_run = 0
+        with self._lock:
+            if text:
+                self.finals.append(text)
+            self.partial = ""
+        if self.on_final:
+            # The audio time speech actually ended, so callers can measure end-of-speech delay
+            self.on_final(text, self._last_voiced_at)
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.engine_seconds += time.perf_counter() - start